@@ -235,8 +235,9 @@ class ApiClient {
         });
     }
 
-    async obtenerOpcionesPreasignadas() {
-        return await this.request('/postulaciones/preasignadas/opciones');
+    async obtenerOpcionesPreasignadas(params = {}) {
+        const query = this.buildQuery(params);
+        return await this.request(`/postulaciones/preasignadas/opciones${query}`);
     }
 
     async decidirPostulacion(convocatoriaId, postulacionId, payload = {}) {
@@ -492,9 +493,9 @@ Posibles soluciones:
         }
     },
 
-    async getPreasignadasOpciones() {
+    async getPreasignadasOpciones(params = {}) {
         try {
-            const response = await apiClient.obtenerOpcionesPreasignadas();
+            const response = await apiClient.obtenerOpcionesPreasignadas(params);
             return { success: true, data: response };
         } catch (error) {
             console.error('Error al obtener opciones de preasignación:', error);
@@ -9,8 +9,14 @@ from flask import Flask
 from .config import Config, config_by_name
 from .extensions import cors, db, jwt
 from .routes import register_blueprints
+from .services import almacenamiento, cache
+from .services.almacenamiento import migrar_soportes_base64
+from .services.descartes import migrar_reportes_legados
 from .services.bootstrap import ensure_schema_updates, seed_default_data
+from .services.busqueda import asegurar_indice_busqueda
 from .services.ia import obtener_configuracion_ia
+from .services.programador import programador
+from .services.trabajos import cola_trabajos
 
 
 def create_app(config_name: str | None = None) -> Flask:
@@ -27,20 +33,32 @@ def create_app(config_name: str | None = None) -> Flask:
 
     Path(app.instance_path).mkdir(parents=True, exist_ok=True)
 
-    cors.init_app(app, resources={r"/api/*": {"origins": "*"}})
+    cors.init_app(
+        app,
+        resources={r"/api/*": {"origins": "*"}},
+        expose_headers=["X-Next-Cursor", "Link", "Idempotent-Replayed"],
+    )
     db.init_app(app)
     jwt.init_app(app)
 
     register_blueprints(app)
+    almacenamiento.init_app(app)
 
     with app.app_context():
         from . import models  # noqa: F401 - ensure models are registered
 
         db.create_all()
         ensure_schema_updates()
+        migrar_soportes_base64()
+        migrar_reportes_legados()
+        asegurar_indice_busqueda()
         seed_default_data()
         obtener_configuracion_ia()
 
+    cache.init_app(app)
+    programador.init_app(app)
+    cola_trabajos.init_app(app)
+
     return app
 
 
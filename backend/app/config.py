@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import os
+import tempfile
 from datetime import timedelta
 from pathlib import Path
 
@@ -22,12 +23,49 @@ class Config:
     GROQ_API_KEY = os.environ.get("GROQ_API_KEY")
     GROQ_MODEL = os.environ.get("GROQ_MODEL", "mixtral-8x7b-32768")
     GROQ_TIMEOUT = float(os.environ.get("GROQ_TIMEOUT", "15"))
+    BLOB_STORAGE_PATH = os.environ.get("BLOB_STORAGE_PATH")
+    CV_MAX_BYTES = int(os.environ.get("CV_MAX_BYTES", str(5 * 1024 * 1024)))
+    CARGAS_EXPIRACION_HORAS = float(os.environ.get("CARGAS_EXPIRACION_HORAS", "24"))
+    CARGAS_MAX_ABIERTAS = int(os.environ.get("CARGAS_MAX_ABIERTAS", "5"))
+    BUSQUEDA_LIMITE = int(os.environ.get("BUSQUEDA_LIMITE", "20"))
+    IMPORTACION_TAMANO_LOTE = int(os.environ.get("IMPORTACION_TAMANO_LOTE", "500"))
+    IMPORTACION_MAX_FILAS = int(os.environ.get("IMPORTACION_MAX_FILAS", "10000"))
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get("RESPONSE_CACHE_MAX_ENTRIES", "256"))
+    RESPONSE_CACHE_TTL_SECONDS = float(os.environ.get("RESPONSE_CACHE_TTL_SECONDS", "300"))
+    ELEGIBILIDAD_CACHE_MAX_ENTRIES = int(os.environ.get("ELEGIBILIDAD_CACHE_MAX_ENTRIES", "1024"))
+    SCHEDULER_ENABLED = os.environ.get("SCHEDULER_ENABLED", "1") not in ("0", "false", "False")
+    SCHEDULER_REFRESH_SECONDS = float(os.environ.get("SCHEDULER_REFRESH_SECONDS", "60"))
+    CONVOCATORIAS_PAGE_SIZE = int(os.environ.get("CONVOCATORIAS_PAGE_SIZE", "100"))
+    CONVOCATORIAS_MAX_PAGE_SIZE = int(os.environ.get("CONVOCATORIAS_MAX_PAGE_SIZE", "500"))
+    RANKING_PAGE_SIZE = int(os.environ.get("RANKING_PAGE_SIZE", "100"))
+    RANKING_MAX_PAGE_SIZE = int(os.environ.get("RANKING_MAX_PAGE_SIZE", "500"))
+    HORAS_POR_MONITORIA = int(os.environ.get("HORAS_POR_MONITORIA", "4"))
+    DECISIONES_MAX_LOTE = int(os.environ.get("DECISIONES_MAX_LOTE", "500"))
+    SCHEDULER_LEASE_SECONDS = float(os.environ.get("SCHEDULER_LEASE_SECONDS", "30"))
+    MANTENIMIENTO_INTERVALO_SECONDS = float(os.environ.get("MANTENIMIENTO_INTERVALO_SECONDS", "3600"))
+    WORKER_ENABLED = os.environ.get("WORKER_ENABLED", "1") not in ("0", "false", "False")
+    WORKER_POLL_SECONDS = float(os.environ.get("WORKER_POLL_SECONDS", "5"))
+    WORKER_THREADS = int(os.environ.get("WORKER_THREADS", "2"))
+    WORKER_MAX_ATTEMPTS = int(os.environ.get("WORKER_MAX_ATTEMPTS", "3"))
+    WORKER_RETRY_SECONDS = float(os.environ.get("WORKER_RETRY_SECONDS", "10"))
+    WORKER_LEASE_SECONDS = float(os.environ.get("WORKER_LEASE_SECONDS", "900"))
+    POSTULACIONES_ASINCRONAS = os.environ.get("POSTULACIONES_ASINCRONAS", "1") not in ("0", "false", "False")
+    RECALCULO_TAMANO_LOTE = int(os.environ.get("RECALCULO_TAMANO_LOTE", "500"))
+    IDEMPOTENCIA_TTL_HORAS = float(os.environ.get("IDEMPOTENCIA_TTL_HORAS", "24"))
+    PREASIGNADAS_PAGE_SIZE = int(os.environ.get("PREASIGNADAS_PAGE_SIZE", "50"))
+    PREASIGNADAS_MAX_PAGE_SIZE = int(os.environ.get("PREASIGNADAS_MAX_PAGE_SIZE", "200"))
+    OPCIONES_PAGE_SIZE = int(os.environ.get("OPCIONES_PAGE_SIZE", "20"))
+    OPCIONES_MAX_PAGE_SIZE = int(os.environ.get("OPCIONES_MAX_PAGE_SIZE", "50"))
 
 
 class TestConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = "sqlite:///:memory:"
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(minutes=5)
+    SCHEDULER_ENABLED = False
+    WORKER_ENABLED = False
+    POSTULACIONES_ASINCRONAS = False
+    BLOB_STORAGE_PATH = os.path.join(tempfile.gettempdir(), "monitorias-test-blobs")
 
 
 class DevConfig(Config):
@@ -2,11 +2,16 @@
 from __future__ import annotations
 
 import enum
-from datetime import datetime, timezone
-from typing import Dict, Optional, Tuple
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import and_, case, false, literal, or_
+from sqlalchemy.ext.hybrid import hybrid_method
+from sqlalchemy.orm import validates
 
 from ..extensions import db
-from ..utils.time import COL_TZ, utc_now_naive
+from ..utils.requisitos import compilar_requisitos
+from ..utils.time import serializar_fecha, utc_now_naive
 
 
 class EstadoConvocatoria(enum.Enum):
@@ -110,6 +115,9 @@ class Convocatoria(db.Model):
     curso = db.Column(db.String(200), nullable=False)
     semestre = db.Column(db.String(20), nullable=False)
     requisitos = db.Column(db.Text, nullable=False)
+    min_semestre_req = db.Column(db.Integer)
+    min_promedio_req = db.Column(db.Float)
+    cupos = db.Column(db.Integer, nullable=False, default=1)
     fecha_apertura = db.Column(db.DateTime)
     fecha_cierre = db.Column(db.DateTime)
     estado = db.Column(db.Enum(EstadoConvocatoria), default=EstadoConvocatoria.DRAFT)
@@ -120,33 +128,92 @@ class Convocatoria(db.Model):
     archivada_at = db.Column(db.DateTime)
     inscripciones = db.relationship("InscripcionMonitoria", backref="convocatoria", lazy=True)
 
-    def to_dict(self) -> Dict[str, Optional[str]]:
-        def serialize_dt(dt: datetime | None) -> Tuple[Optional[str], Optional[str]]:
-            if not dt:
-                return None, None
-            if dt.tzinfo is None:
-                dt_utc = dt.replace(tzinfo=timezone.utc)
-            else:
-                dt_utc = dt.astimezone(timezone.utc)
-            dt_col = dt_utc.astimezone(COL_TZ)
-            return dt_col.isoformat(), dt_utc.isoformat()
-
-        fa_local, fa_utc = serialize_dt(self.fecha_apertura)
-        fc_local, fc_utc = serialize_dt(self.fecha_cierre)
-        created_local, created_utc = serialize_dt(self.created_at)
-        updated_local, updated_utc = serialize_dt(self.updated_at)
-        archivada_local, _ = serialize_dt(self.archivada_at)
+    __table_args__ = (
+        db.Index("ix_convocatoria_archivada_apertura", "archivada", "fecha_apertura"),
+        db.Index("ix_convocatoria_archivada_cierre", "archivada", "fecha_cierre"),
+        db.Index("ix_convocatoria_archivada_creacion", "archivada", "created_at", "id"),
+        db.Index("ix_convocatoria_semestre_creacion", "semestre", "created_at", "id"),
+        db.Index("ix_convocatoria_creador_creacion", "creado_por_id", "created_at", "id"),
+        db.Index("ix_convocatoria_curso", "curso"),
+        db.Index("ix_convocatoria_umbrales", "min_semestre_req", "min_promedio_req"),
+    )
+
+    @validates("requisitos")
+    def _compilar_requisitos(self, _key: str, requisitos: str) -> str:
+        self.min_semestre_req, self.min_promedio_req = compilar_requisitos(requisitos)
+        return requisitos
+
+    @classmethod
+    def condicion_elegible(cls, semestre: int, promedio: float):
+        """WHERE clause for convocatorias whose thresholds a student meets."""
+        return and_(
+            or_(cls.min_semestre_req.is_(None), cls.min_semestre_req <= semestre),
+            or_(cls.min_promedio_req.is_(None), cls.min_promedio_req <= promedio),
+        )
+
+    @hybrid_method
+    def estado_en(self, now: datetime) -> EstadoConvocatoria | None:
+        """Estado derived from the dates; falls back to the stored value."""
+        if self.archivada:
+            return EstadoConvocatoria.ARCHIVED
+        fa = self.fecha_apertura
+        fc = self.fecha_cierre
+        if fc and fc <= now:
+            return EstadoConvocatoria.CLOSED
+        if fa and fa <= now:
+            return EstadoConvocatoria.ACTIVE
+        if fa and fa > now:
+            return EstadoConvocatoria.SCHEDULED
+        return self.estado
+
+    @estado_en.expression
+    def estado_en(cls, now: datetime):
+        tipo_estado = cls.__table__.c.estado.type
+        return case(
+            (cls.archivada == True, literal(EstadoConvocatoria.ARCHIVED, tipo_estado)),  # noqa: E712
+            (cls.fecha_cierre <= now, literal(EstadoConvocatoria.CLOSED, tipo_estado)),
+            (cls.fecha_apertura <= now, literal(EstadoConvocatoria.ACTIVE, tipo_estado)),
+            (cls.fecha_apertura > now, literal(EstadoConvocatoria.SCHEDULED, tipo_estado)),
+            else_=cls.estado,
+        )
+
+    @classmethod
+    def condicion_estado(cls, estado: EstadoConvocatoria, now: datetime):
+        """Index-friendly WHERE clause equivalent to ``estado_en(now) == estado``."""
+        vigente = or_(cls.fecha_cierre.is_(None), cls.fecha_cierre > now)
+        por_fechas = {
+            EstadoConvocatoria.ARCHIVED: cls.archivada == True,  # noqa: E712
+            EstadoConvocatoria.CLOSED: and_(cls.archivada == False, cls.fecha_cierre <= now),  # noqa: E712
+            EstadoConvocatoria.ACTIVE: and_(cls.archivada == False, cls.fecha_apertura <= now, vigente),  # noqa: E712
+            EstadoConvocatoria.SCHEDULED: and_(cls.archivada == False, cls.fecha_apertura > now, vigente),  # noqa: E712
+        }
+        sin_fechas = and_(
+            cls.archivada == False,  # noqa: E712
+            cls.fecha_apertura.is_(None),
+            vigente,
+            cls.estado == estado,
+        )
+        return or_(por_fechas.get(estado, false()), sin_fechas)
+
+    def to_dict(self, now: datetime | None = None) -> Dict[str, Optional[str]]:
+        fa_local, fa_utc = serializar_fecha(self.fecha_apertura)
+        fc_local, fc_utc = serializar_fecha(self.fecha_cierre)
+        created_local, created_utc = serializar_fecha(self.created_at)
+        updated_local, updated_utc = serializar_fecha(self.updated_at)
+        archivada_local, _ = serializar_fecha(self.archivada_at)
+        estado = self.estado_en(now or utc_now_naive())
 
         return {
             "id": self.id,
             "curso": self.curso,
             "semestre": self.semestre,
             "requisitos": self.requisitos,
+            "cupos": self.cupos,
             "fecha_apertura": fa_local,
             "fecha_cierre": fc_local,
             "fecha_apertura_utc": fa_utc,
             "fecha_cierre_utc": fc_utc,
-            "estado": self.estado.value if self.estado else None,
+            "estado": estado.value if estado else None,
             "creado_por_id": self.creado_por_id,
             "created_at": created_local,
             "created_at_utc": created_utc,
@@ -195,6 +262,7 @@ class Postulacion(db.Model):
     datos_formulario = db.Column(db.JSON, default=dict)
     datos_soportes = db.Column(db.JSON, default=dict)
     preasignada = db.Column(db.Boolean, default=False, nullable=False)
+    config_version = db.Column(db.Integer)
     created_at = db.Column(db.DateTime, default=utc_now_naive)
     updated_at = db.Column(db.DateTime, default=utc_now_naive, onupdate=utc_now_naive)
 
@@ -210,6 +278,11 @@ class Postulacion(db.Model):
         foreign_keys=[creada_por_id],
     )
 
+    __table_args__ = (
+        db.Index("ix_postulacion_estudiante_convocatoria", "estudiante_id", "convocatoria_id"),
+        db.Index("ix_postulacion_ranking", "convocatoria_id", "estado", puntaje.desc(), "id"),
+    )
+
     def completar_formulario(self, datos: Dict) -> None:
         self.datos_formulario = datos or {}
 
@@ -243,8 +316,14 @@ class Postulacion(db.Model):
         if creada_por_id is not None:
             self.creada_por_id = creada_por_id
 
-    def to_dict(self) -> Dict:
-        return {
+    def to_dict(self, incluir: Optional[Iterable[str]] = None) -> Dict:
+        """Serialize the postulación.
+
+        ``incluir`` selects which of ``formulario``/``soportes`` to add; ``None``
+        keeps both. Listings pass only what they loaded so deferred columns are
+        never fetched row by row.
+        """
+        data = {
             "id": self.id,
             "estado": self.estado.value if self.estado else None,
             "puntaje": self.puntaje,
@@ -254,11 +333,14 @@ class Postulacion(db.Model):
             "estudiante_id": self.estudiante_id,
             "creada_por_id": self.creada_por_id,
             "preasignada": self.preasignada,
-            "datos_formulario": self.datos_formulario or {},
-            "datos_soportes": self.datos_soportes or {},
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None,
         }
+        if incluir is None or "formulario" in incluir:
+            data["datos_formulario"] = self.datos_formulario or {}
+        if incluir is None or "soportes" in incluir:
+            data["datos_soportes"] = self.datos_soportes or {}
+        return data
 
 
 class EvaluacionAspirante(db.Model):
@@ -321,11 +403,14 @@ class ConfiguracionIA(db.Model):
     peso_semestre = db.Column(db.Float, default=0.4)
     peso_promedio = db.Column(db.Float, default=0.6)
     peso_horas = db.Column(db.Float, default=0.2)
+    # Bumped on every change; postulaciones scored with an older version are re-scored.
+    version = db.Column(db.Integer, nullable=False, default=1)
     created_at = db.Column(db.DateTime, default=utc_now_naive)
     updated_at = db.Column(db.DateTime, default=utc_now_naive, onupdate=utc_now_naive)
 
     def to_dict(self) -> Dict[str, float]:
         return {
+            "version": self.version,
             "min_semestre": self.min_semestre,
             "min_promedio": self.min_promedio,
             "peso_semestre": self.peso_semestre,
@@ -336,24 +421,216 @@ class ConfiguracionIA(db.Model):
 
 
 class ReporteDescartes(db.Model):
+    """Monthly header of the descartes of a convocatoria; ``total`` grows with every ``Descarte``.
+
+    ``contenido`` only holds reports written before the descarte log existed
+    until ``migrar_reportes_legados`` moves them.
+    """
+
     id = db.Column(db.Integer, primary_key=True)
     convocatoria_id = db.Column(db.Integer, db.ForeignKey("convocatoria.id"), nullable=False)
     periodo = db.Column(db.String(20), nullable=False)
-    contenido = db.Column(db.JSON, default=dict)
+    total = db.Column(db.Integer, nullable=False, default=0)
+    contenido = db.Column(db.JSON(none_as_null=True))
     created_at = db.Column(db.DateTime, default=utc_now_naive)
 
     convocatoria = db.relationship("Convocatoria", backref=db.backref("reportes_descartes", lazy=True))
 
-    def generar(self, descartados: list[Dict]) -> None:
-        self.contenido = {"descartados": descartados}
+    __table_args__ = (db.Index("uq_reporte_descartes_periodo", "convocatoria_id", "periodo", unique=True),)
+
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.id,
+            "convocatoria_id": self.convocatoria_id,
+            "periodo": self.periodo,
+            "total": self.total,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+        }
+
+
+class Descarte(db.Model):
+    """One rejected postulación. Rows are only ever appended."""
+
+    id = db.Column(db.Integer, primary_key=True)
+    convocatoria_id = db.Column(db.Integer, db.ForeignKey("convocatoria.id"), nullable=False)
+    postulacion_id = db.Column(db.Integer, db.ForeignKey("postulacion.id"))
+    estudiante_id = db.Column(db.Integer, db.ForeignKey("usuario.id"))
+    periodo = db.Column(db.String(20), nullable=False)
+    created_at = db.Column(db.DateTime, default=utc_now_naive)
+
+    razones = db.relationship(
+        "DescarteRazon", lazy="selectin", order_by="DescarteRazon.id", cascade="all, delete-orphan"
+    )
+
+    __table_args__ = (db.Index("ix_descarte_convocatoria_periodo", "convocatoria_id", "periodo", "id"),)
 
     def to_dict(self) -> Dict:
         return {
             "id": self.id,
+            "postulacion_id": self.postulacion_id,
+            "estudiante_id": self.estudiante_id,
             "convocatoria_id": self.convocatoria_id,
+            "razones": [razon.texto for razon in self.razones],
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+        }
+
+
+class DescarteRazon(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    descarte_id = db.Column(db.Integer, db.ForeignKey("descarte.id"), nullable=False, index=True)
+    motivo = db.Column(db.String(120), nullable=False)
+    texto = db.Column(db.Text, nullable=False)
+
+
+class ResumenDescartes(db.Model):
+    """Descartes per reason of a convocatoria and month, incremented as they are appended."""
+
+    id = db.Column(db.Integer, primary_key=True)
+    convocatoria_id = db.Column(db.Integer, db.ForeignKey("convocatoria.id"), nullable=False)
+    periodo = db.Column(db.String(20), nullable=False)
+    motivo = db.Column(db.String(120), nullable=False)
+    total = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.Index("uq_resumen_descartes_motivo", "convocatoria_id", "periodo", "motivo", unique=True),
+    )
+
+
+class EstadoPropuesta(enum.Enum):
+    DRAFT = "borrador"
+    COMMITTED = "confirmada"
+
+
+class PropuestaAsignacion(db.Model):
+    """Monitor assignment computed for a period; applied as a whole on confirmation."""
+
+    id = db.Column(db.Integer, primary_key=True)
+    periodo = db.Column(db.String(20), nullable=False)
+    estado = db.Column(db.Enum(EstadoPropuesta), nullable=False, default=EstadoPropuesta.DRAFT)
+    puntaje_total = db.Column(db.Float, nullable=False, default=0.0)
+    asignaciones = db.Column(db.JSON, default=list)
+    resumen = db.Column(db.JSON, default=dict)
+    creada_por_id = db.Column(db.Integer, db.ForeignKey("usuario.id"))
+    created_at = db.Column(db.DateTime, default=utc_now_naive)
+    confirmada_at = db.Column(db.DateTime)
+
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.id,
             "periodo": self.periodo,
-            "contenido": self.contenido or {},
+            "estado": self.estado.value if self.estado else None,
+            "puntaje_total": self.puntaje_total,
+            "asignaciones": self.asignaciones or [],
+            "resumen": self.resumen or {},
+            "creada_por_id": self.creada_por_id,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "confirmada_at": self.confirmada_at.isoformat() if self.confirmada_at else None,
+        }
+
+
+class CandadoProgramador(db.Model):
+    """Lease row used to elect the single worker that runs scheduled transitions."""
+
+    nombre = db.Column(db.String(50), primary_key=True)
+    propietario = db.Column(db.String(120), nullable=False)
+    expira_en = db.Column(db.DateTime, nullable=False)
+
+
+class VersionDatos(db.Model):
+    """Monotonic counter bumped whenever a cached data set changes."""
+
+    nombre = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+
+class CargaArchivo(db.Model):
+    """Resumable upload in progress; bytes live in the blob store until completed."""
+
+    id = db.Column(db.String(32), primary_key=True)
+    usuario_id = db.Column(db.Integer, db.ForeignKey("usuario.id"), nullable=False, index=True)
+    nombre = db.Column(db.String(255), nullable=False)
+    tamano_total = db.Column(db.Integer, nullable=False)
+    recibido = db.Column(db.Integer, nullable=False, default=0)
+    hash = db.Column(db.String(64))
+    created_at = db.Column(db.DateTime, default=utc_now_naive)
+    updated_at = db.Column(db.DateTime, default=utc_now_naive, onupdate=utc_now_naive)
+
+    @property
+    def completa(self) -> bool:
+        return self.hash is not None
+
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.id,
+            "nombre": self.nombre,
+            "tamano_total": self.tamano_total,
+            "recibido": self.recibido,
+            "completa": self.completa,
+            "hash": self.hash,
+        }
+
+
+class RespuestaIdempotente(db.Model):
+    """Stored response for an ``Idempotency-Key``; ``codigo`` is NULL while the first request runs."""
+
+    id = db.Column(db.Integer, primary_key=True)
+    usuario_id = db.Column(db.Integer, db.ForeignKey("usuario.id"), nullable=False)
+    clave = db.Column(db.String(255), nullable=False)
+    ruta = db.Column(db.String(255), nullable=False)
+    codigo = db.Column(db.Integer)
+    cuerpo = db.Column(db.JSON)
+    created_at = db.Column(db.DateTime, default=utc_now_naive)
+
+    __table_args__ = (
+        db.UniqueConstraint("usuario_id", "clave", name="uq_respuesta_idempotente"),
+        db.Index("ix_respuesta_idempotente_creacion", "created_at"),
+    )
+
+
+class EstadoTrabajo(enum.Enum):
+    PENDING = "pendiente"
+    RUNNING = "en_curso"
+    DONE = "completado"
+    FAILED = "fallido"
+
+
+class Trabajo(db.Model):
+    """Background job processed by the worker in ``services.trabajos``."""
+
+    id = db.Column(db.Integer, primary_key=True)
+    tipo = db.Column(db.String(50), nullable=False)
+    estado = db.Column(db.Enum(EstadoTrabajo), nullable=False, default=EstadoTrabajo.PENDING)
+    parametros = db.Column(db.JSON, default=dict)
+    total = db.Column(db.Integer)
+    procesados = db.Column(db.Integer, nullable=False, default=0)
+    intentos = db.Column(db.Integer, nullable=False, default=0)
+    max_intentos = db.Column(db.Integer, nullable=False, default=1)
+    disponible_en = db.Column(db.DateTime)
+    error = db.Column(db.Text)
+    propietario = db.Column(db.String(120))
+    creado_por_id = db.Column(db.Integer, db.ForeignKey("usuario.id"))
+    created_at = db.Column(db.DateTime, default=utc_now_naive)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
+    __table_args__ = (db.Index("ix_trabajo_estado", "estado", "id"),)
+
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.id,
+            "tipo": self.tipo,
+            "estado": self.estado.value if self.estado else None,
+            "parametros": self.parametros or {},
+            "total": self.total,
+            "procesados": self.procesados,
+            "progreso": round(self.procesados / self.total, 4) if self.total else None,
+            "intentos": self.intentos,
+            "max_intentos": self.max_intentos,
+            "disponible_en": self.disponible_en.isoformat() if self.disponible_en else None,
+            "error": self.error,
             "created_at": self.created_at.isoformat() if self.created_at else None,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
         }
 
 
@@ -406,6 +683,17 @@ __all__ = [
     "EvaluacionAspirante",
     "ConfiguracionIA",
     "ReporteDescartes",
+    "Descarte",
+    "DescarteRazon",
+    "ResumenDescartes",
+    "CandadoProgramador",
+    "VersionDatos",
+    "CargaArchivo",
+    "RespuestaIdempotente",
+    "Trabajo",
+    "EstadoTrabajo",
+    "PropuestaAsignacion",
+    "EstadoPropuesta",
     "EstadoConvocatoria",
     "EstadoPostulacion",
     "TipoUsuario",
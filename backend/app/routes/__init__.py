@@ -3,7 +3,7 @@ from __future__ import annotations
 
 from flask import Flask
 
-from . import auth, convocatorias, ia, notificaciones, postulaciones, system
+from . import asignaciones, auth, convocatorias, ia, notificaciones, postulaciones, system
 
 
 def register_blueprints(app: Flask) -> None:
@@ -13,6 +13,7 @@ def register_blueprints(app: Flask) -> None:
     app.register_blueprint(ia.bp)
     app.register_blueprint(notificaciones.bp)
     app.register_blueprint(postulaciones.bp)
+    app.register_blueprint(asignaciones.bp)
 
 
 __all__ = ["register_blueprints"]
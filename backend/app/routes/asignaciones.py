@@ -0,0 +1,72 @@
+"""Monitor assignment proposals."""
+from __future__ import annotations
+
+from flask import Blueprint, jsonify, request
+from flask_jwt_extended import get_jwt_identity, jwt_required
+
+from ..extensions import db
+from ..models import PropuestaAsignacion, Usuario
+from ..services.asignacion import PropuestaObsoleta, confirmar_propuesta, proponer_asignacion
+
+
+bp = Blueprint("asignaciones", __name__, url_prefix="/api/asignaciones")
+
+
+def _coordinador_actual():
+    usuario = Usuario.query.get_or_404(int(get_jwt_identity()))
+    if not usuario.is_coordinator():
+        return usuario, (jsonify({"msg": "Solo el coordinador puede gestionar asignaciones"}), 403)
+    return usuario, None
+
+
+@bp.post("/propuestas")
+@jwt_required()
+def crear_propuesta():
+    usuario, error = _coordinador_actual()
+    if error:
+        return error
+
+    data = request.get_json() or {}
+    periodo = str(data.get("periodo") or "").strip()
+    if not periodo:
+        return jsonify({"msg": "Campo obligatorio faltante: periodo"}), 400
+
+    propuesta = proponer_asignacion(periodo, creada_por_id=usuario.id)
+    db.session.commit()
+    return jsonify(propuesta.to_dict()), 201
+
+
+@bp.get("/propuestas/<int:propuesta_id>")
+@jwt_required()
+def obtener_propuesta(propuesta_id: int):
+    _, error = _coordinador_actual()
+    if error:
+        return error
+
+    propuesta = db.session.get(PropuestaAsignacion, propuesta_id)
+    if propuesta is None:
+        return jsonify({"msg": "Propuesta no encontrada"}), 404
+    return jsonify(propuesta.to_dict()), 200
+
+
+@bp.post("/propuestas/<int:propuesta_id>/confirmar")
+@jwt_required()
+def confirmar(propuesta_id: int):
+    _, error = _coordinador_actual()
+    if error:
+        return error
+
+    propuesta = db.session.get(PropuestaAsignacion, propuesta_id)
+    if propuesta is None:
+        return jsonify({"msg": "Propuesta no encontrada"}), 404
+
+    try:
+        seleccionadas = confirmar_propuesta(propuesta)
+    except PropuestaObsoleta as exc:
+        db.session.rollback()
+        return jsonify({"msg": str(exc)}), 409
+    except ValueError as exc:
+        db.session.rollback()
+        return jsonify({"msg": str(exc)}), 400
+    db.session.commit()
+    return jsonify({"propuesta": propuesta.to_dict(), "seleccionadas": seleccionadas}), 200
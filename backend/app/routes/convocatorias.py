@@ -2,12 +2,16 @@
 from __future__ import annotations
 
 import base64
+import json
 from binascii import Error as BinasciiError
+from datetime import datetime
 from pathlib import Path
 from typing import Dict, List
 
-from flask import Blueprint, current_app, jsonify, request
+from flask import Blueprint, current_app, jsonify, request, send_file, url_for
 from flask_jwt_extended import get_jwt_identity, jwt_required
+from sqlalchemy import tuple_
+from sqlalchemy.exc import IntegrityError
 
 from ..extensions import db
 from ..models import (
@@ -15,21 +19,50 @@ from ..models import (
     EstadoConvocatoria,
     EstadoPostulacion,
     InscripcionMonitoria,
-    EvaluacionAspirante,
     Postulacion,
-    ReporteDescartes,
     TipoNotificacion,
     Usuario,
 )
+from ..services.almacenamiento import obtener_almacen, referencia_cv
+from ..services.bootstrap import unicidad_postulacion_activa
+from ..services.busqueda import filtrar_por_texto
+from ..services.cargas import (
+    EXTENSIONES_CV,
+    MARGEN_MULTIPART,
+    MIMETYPES_CV,
+    ArchivoDemasiadoGrande,
+    leer_multipart_cv,
+    limite_cv,
+    mensaje_limite,
+    soportes_desde_carga,
+)
+from ..services.cache import VERSION_CONVOCATORIAS, respuesta_cacheada
 from ..services.convocatorias import (
-    auto_archivar_convocatorias,
+    construir_convocatoria,
     debug_log,
+    leer_cupos,
     parse_datetime_or_error,
     recalcular_estado,
-    validar_requisitos_estudiante,
 )
-from ..services.ia import obtener_servicio_ia, registrar_descartes
+from ..services.decisiones import DECISIONES, aplicar_decisiones, notificacion_decision
+from ..services.descartes import reporte_descartes
+from ..services.elegibilidad import elegibilidad_cacheada
+from ..services.evaluacion import evaluar_postulacion
+from ..services.idempotencia import idempotente
+from ..services.importacion import FORMATOS_CSV, FORMATOS_NDJSON, importar_convocatorias, leer_filas
 from ..services.notifications import crear_notificacion
+from ..services.postulaciones import (
+    ESTADOS_RANKING,
+    RELACIONES_RANKING,
+    leer_inclusiones,
+    opciones_listado,
+    opciones_relaciones,
+    pagina_ranking,
+    posicion_en_ranking,
+)
+from ..services.programador import programador
+from ..services.trabajos import TRABAJO_EVALUAR_POSTULACION, cola_trabajos
+from ..utils.pagination import codificar_cursor, decodificar_cursor, leer_limite
 from ..utils.time import utc_now_naive
 
 
@@ -48,63 +81,54 @@ def crear_convocatoria():
     data = request.get_json() or {}
     debug_log("Payload crear_convocatoria recibido", data)
 
-    for campo in ("curso", "semestre", "requisitos"):
-        if not data.get(campo):
-            return jsonify({"msg": f"Campo obligatorio faltante: {campo}"}), 400
+    now = utc_now_naive()
+    try:
+        convocatoria = construir_convocatoria(data, user.id, now, log=True)
+    except ValueError as exc:
+        return jsonify({"msg": str(exc)}), 400
 
-    convocatoria = Convocatoria(
-        curso=data["curso"],
-        semestre=data["semestre"],
-        requisitos=data["requisitos"],
-        creado_por_id=user.id,
-    )
+    db.session.add(convocatoria)
+    db.session.commit()
+    programador.programar(convocatoria, now)
 
-    now = utc_now_naive()
-    if data.get("fecha_apertura"):
-        try:
-            fa = parse_datetime_or_error(data["fecha_apertura"], "fecha_apertura")
-            debug_log(
-                "Fecha apertura parseada",
-                {"original": data["fecha_apertura"], "normalizada": fa.isoformat()},
-            )
-            if fa < now:
-                return jsonify({"msg": "fecha_apertura no puede estar en el pasado"}), 400
-            convocatoria.fecha_apertura = fa
-        except (ValueError, TypeError) as exc:
-            debug_log("Error parseando fecha_apertura", str(exc))
-            return jsonify({"msg": str(exc)}), 400
+    return jsonify(convocatoria.to_dict()), 201
 
-    if data.get("fecha_cierre"):
-        try:
-            fc = parse_datetime_or_error(data["fecha_cierre"], "fecha_cierre")
-            debug_log(
-                "Fecha cierre parseada",
-                {"original": data["fecha_cierre"], "normalizada": fc.isoformat()},
-            )
-            if fc < now:
-                return jsonify({"msg": "fecha_cierre no puede estar en el pasado"}), 400
-            convocatoria.fecha_cierre = fc
-        except (ValueError, TypeError) as exc:
-            debug_log("Error parseando fecha_cierre", str(exc))
-            return jsonify({"msg": str(exc)}), 400
 
-    if convocatoria.fecha_apertura and convocatoria.fecha_cierre:
-        if convocatoria.fecha_cierre <= convocatoria.fecha_apertura:
-            debug_log(
-                "Validación rango fechas falló",
-                {
-                    "fecha_apertura": convocatoria.fecha_apertura.isoformat(),
-                    "fecha_cierre": convocatoria.fecha_cierre.isoformat(),
-                },
-            )
-            return jsonify({"msg": "fecha_cierre debe ser posterior a fecha_apertura"}), 400
+@bp.post("/importar")
+@jwt_required()
+def importar_convocatorias_masivo():
+    user_id = int(get_jwt_identity())
+    user = Usuario.query.get_or_404(user_id)
 
-    recalcular_estado(convocatoria, now)
+    if not (user.is_coordinator() or user.is_professor()):
+        return jsonify({"msg": "Solo coordinadores y profesores pueden importar convocatorias"}), 403
 
-    db.session.add(convocatoria)
+    mimetype = request.mimetype
+    if mimetype not in FORMATOS_CSV and mimetype not in FORMATOS_NDJSON:
+        return jsonify({"msg": "Formato no soportado: use text/csv o application/x-ndjson"}), 415
+
+    now = utc_now_naive()
+    creadas, errores = importar_convocatorias(
+        leer_filas(request.stream, mimetype),
+        user.id,
+        now,
+        tamano_lote=current_app.config["IMPORTACION_TAMANO_LOTE"],
+        max_filas=current_app.config["IMPORTACION_MAX_FILAS"],
+    )
     db.session.commit()
+    for convocatoria in creadas:
+        programador.programar(convocatoria, now)
 
-    return jsonify(convocatoria.to_dict()), 201
+    return (
+        jsonify(
+            {
+                "creadas": len(creadas),
+                "ids": [c.id for c in creadas],
+                "errores": errores,
+            }
+        ),
+        201 if creadas else 400,
+    )
 
 
 @bp.patch("/<int:convocatoria_id>/fechas")
@@ -117,7 +141,7 @@ def asignar_fechas(convocatoria_id: int):
         return jsonify({"msg": "Solo coordinadores y profesores pueden asignar fechas"}), 403
 
     convocatoria = Convocatoria.query.get_or_404(convocatoria_id)
-    if convocatoria.estado == EstadoConvocatoria.CLOSED:
+    if convocatoria.estado_en(utc_now_naive()) == EstadoConvocatoria.CLOSED:
         return jsonify({"msg": "No se pueden modificar convocatorias cerradas"}), 400
 
     data = request.get_json() or {}
@@ -158,91 +182,173 @@ def asignar_fechas(convocatoria_id: int):
     recalcular_estado(convocatoria, now)
 
     db.session.commit()
+    programador.programar(convocatoria, now)
     return jsonify(convocatoria.to_dict()), 200
 
 
-@bp.get("/activas")
-def listar_activas():
-    lang = request.args.get("lang")
-    auto_archivar_convocatorias()
+ESTADOS_TRADUCIDOS_EN = {
+    "borrador": "draft",
+    "programada": "scheduled",
+    "activa": "active",
+    "cerrada": "closed",
+    "archivada": "archived",
+}
+
+ESTADOS_FILTRO = {
+    "draft": EstadoConvocatoria.DRAFT,
+    "borrador": EstadoConvocatoria.DRAFT,
+    "scheduled": EstadoConvocatoria.SCHEDULED,
+    "programada": EstadoConvocatoria.SCHEDULED,
+    "active": EstadoConvocatoria.ACTIVE,
+    "activa": EstadoConvocatoria.ACTIVE,
+    "closed": EstadoConvocatoria.CLOSED,
+    "cerrada": EstadoConvocatoria.CLOSED,
+    "archived": EstadoConvocatoria.ARCHIVED,
+    "archivada": EstadoConvocatoria.ARCHIVED,
+}
+
+
+def _serializar_listado(convocatorias: List[Convocatoria], lang: str | None) -> List[Dict]:
     now = utc_now_naive()
-    convocatorias = Convocatoria.query.filter_by(archivada=False).all()
-    for convocatoria in convocatorias:
-        recalcular_estado(convocatoria, now)
-    db.session.commit()
-    activas = [c for c in convocatorias if c.estado == EstadoConvocatoria.ACTIVE]
-    data = [c.to_dict() for c in activas]
-
+    data = [c.to_dict(now) for c in convocatorias]
     if lang == "en":
-        estado_map = {
-            "borrador": "draft",
-            "programada": "scheduled",
-            "activa": "active",
-            "cerrada": "closed",
-            "archivada": "archived",
-        }
         for item in data:
             estado = item.get("estado")
             if estado:
-                item["estado"] = estado_map.get(estado, estado)
+                item["estado"] = ESTADOS_TRADUCIDOS_EN.get(estado, estado)
+    return data
 
-    return jsonify(data), 200
+
+def _filtrar_archivadas_y_estado(query, archivadas_flag: str | None, estado_filtro: str | None, now: datetime):
+    if archivadas_flag in ("solo", "only", "true", "1", "yes"):
+        query = query.filter_by(archivada=True)
+    elif archivadas_flag in ("todas", "all"):
+        query = query
+    else:
+        query = query.filter_by(archivada=False)
+
+    if estado_filtro:
+        estado_obj = ESTADOS_FILTRO.get(estado_filtro.lower())
+        if estado_obj:
+            query = query.filter(Convocatoria.condicion_estado(estado_obj, now))
+    return query
+
+
+@bp.get("/activas")
+@respuesta_cacheada(VERSION_CONVOCATORIAS)
+def listar_activas():
+    lang = request.args.get("lang")
+    now = utc_now_naive()
+    activas = (
+        Convocatoria.query.filter(Convocatoria.condicion_estado(EstadoConvocatoria.ACTIVE, now))
+        .order_by(Convocatoria.id.asc())
+        .all()
+    )
+    return jsonify(_serializar_listado(activas, lang)), 200
 
 
 @bp.get("")
+@respuesta_cacheada(VERSION_CONVOCATORIAS)
 def listar_convocatorias():
     lang = request.args.get("lang")
     estado_filtro = request.args.get("estado")
     archivadas_flag = request.args.get("archivadas")
+    semestre = (request.args.get("semestre") or "").strip()
+    curso_prefijo = (request.args.get("curso") or "").strip()
+    # Without limit/cursor the whole list is returned in its historical order (oldest first).
+    paginar = bool(request.args.get("limit") or request.args.get("cursor"))
+    orden = (request.args.get("orden") or "").lower()
+    ascendente = orden in ("antiguas", "asc") or (not paginar and orden not in ("recientes", "desc"))
 
-    auto_archivar_convocatorias()
+    try:
+        limite = leer_limite(
+            request.args.get("limit"),
+            current_app.config["CONVOCATORIAS_PAGE_SIZE"],
+            current_app.config["CONVOCATORIAS_MAX_PAGE_SIZE"],
+        )
+        cursor_raw = request.args.get("cursor")
+        cursor = decodificar_cursor(cursor_raw, (datetime, int)) if cursor_raw else None
+        creado_por_raw = request.args.get("creado_por_id")
+        creado_por_id = int(creado_por_raw) if creado_por_raw else None
+    except ValueError as exc:
+        return jsonify({"msg": str(exc) or "Parámetros inválidos"}), 400
 
-    query = Convocatoria.query
-    if archivadas_flag in ("solo", "only", "true", "1", "yes"):
-        query = query.filter_by(archivada=True)
-    elif archivadas_flag in ("todas", "all"):
-        query = query
+    now = utc_now_naive()
+    query = _filtrar_archivadas_y_estado(Convocatoria.query, archivadas_flag, estado_filtro, now)
+    if semestre:
+        query = query.filter(Convocatoria.semestre == semestre)
+    if curso_prefijo:
+        # Range predicate instead of LIKE so the prefix match can use ix_convocatoria_curso.
+        query = query.filter(
+            Convocatoria.curso >= curso_prefijo,
+            Convocatoria.curso < curso_prefijo + "\U0010ffff",
+        )
+    if creado_por_id is not None:
+        query = query.filter(Convocatoria.creado_por_id == creado_por_id)
+
+    clave = tuple_(Convocatoria.created_at, Convocatoria.id)
+    if cursor:
+        query = query.filter(clave > tuple_(*cursor) if ascendente else clave < tuple_(*cursor))
+    if ascendente:
+        query = query.order_by(Convocatoria.created_at.asc(), Convocatoria.id.asc())
     else:
-        query = query.filter_by(archivada=False)
+        query = query.order_by(Convocatoria.created_at.desc(), Convocatoria.id.desc())
 
-    now = utc_now_naive()
-    convocatorias = query.all()
-    for convocatoria in convocatorias:
-        recalcular_estado(convocatoria, now)
-    db.session.commit()
+    if not paginar:
+        return jsonify(_serializar_listado(query.all(), lang)), 200
 
-    if estado_filtro:
-        estado_filtro = estado_filtro.lower()
-        estado_map = {
-            "draft": EstadoConvocatoria.DRAFT,
-            "borrador": EstadoConvocatoria.DRAFT,
-            "scheduled": EstadoConvocatoria.SCHEDULED,
-            "programada": EstadoConvocatoria.SCHEDULED,
-            "active": EstadoConvocatoria.ACTIVE,
-            "activa": EstadoConvocatoria.ACTIVE,
-            "closed": EstadoConvocatoria.CLOSED,
-            "cerrada": EstadoConvocatoria.CLOSED,
-            "archived": EstadoConvocatoria.ARCHIVED,
-            "archivada": EstadoConvocatoria.ARCHIVED,
-        }
-        estado_obj = estado_map.get(estado_filtro)
-        if estado_obj:
-            convocatorias = [c for c in convocatorias if c.estado == estado_obj]
+    convocatorias = query.limit(limite + 1).all()
+    hay_mas = len(convocatorias) > limite
+    convocatorias = convocatorias[:limite]
+
+    respuesta = jsonify(_serializar_listado(convocatorias, lang))
+    if hay_mas:
+        ultima = convocatorias[-1]
+        siguiente = codificar_cursor([ultima.created_at, ultima.id])
+        argumentos = request.args.to_dict()
+        argumentos["cursor"] = siguiente
+        respuesta.headers["X-Next-Cursor"] = siguiente
+        respuesta.headers["Link"] = f'<{url_for(".listar_convocatorias", **argumentos)}>; rel="next"'
+    return respuesta, 200
+
+
+@bp.get("/elegibilidad")
+@jwt_required()
+def consultar_elegibilidad():
+    estudiante = Usuario.query.get_or_404(int(get_jwt_identity()))
+    if not estudiante.is_student():
+        return jsonify({"msg": "Solo los estudiantes pueden consultar su elegibilidad"}), 403
+
+    cuerpo, hit = elegibilidad_cacheada(estudiante, utc_now_naive())
+    respuesta = current_app.response_class(cuerpo, mimetype="application/json")
+    respuesta.headers["X-Cache"] = "HIT" if hit else "MISS"
+    return respuesta, 200
 
-    data = [c.to_dict() for c in convocatorias]
-    if lang == "en":
-        estado_map = {
-            "borrador": "draft",
-            "programada": "scheduled",
-            "activa": "active",
-            "cerrada": "closed",
-            "archivada": "archived",
-        }
-        for item in data:
-            estado = item.get("estado")
-            if estado:
-                item["estado"] = estado_map.get(estado, estado)
-    return jsonify(data), 200
+
+@bp.get("/buscar")
+@respuesta_cacheada(VERSION_CONVOCATORIAS)
+def buscar_convocatorias():
+    texto = (request.args.get("q") or "").strip()
+    if not texto:
+        return jsonify({"msg": "El parámetro 'q' es obligatorio"}), 400
+    try:
+        limite = leer_limite(
+            request.args.get("limit"),
+            current_app.config["BUSQUEDA_LIMITE"],
+            current_app.config["CONVOCATORIAS_MAX_PAGE_SIZE"],
+        )
+    except ValueError as exc:
+        return jsonify({"msg": str(exc)}), 400
+
+    now = utc_now_naive()
+    query = _filtrar_archivadas_y_estado(
+        Convocatoria.query,
+        request.args.get("archivadas"),
+        request.args.get("estado"),
+        now,
+    )
+    resultados = filtrar_por_texto(query, texto).limit(limite).all()
+    return jsonify(_serializar_listado(resultados, request.args.get("lang"))), 200
 
 
 @bp.patch("/<int:convocatoria_id>")
@@ -254,7 +360,7 @@ def editar_convocatoria(convocatoria_id: int):
         return jsonify({"msg": "Solo coordinadores y profesores pueden editar"}), 403
 
     convocatoria = Convocatoria.query.get_or_404(convocatoria_id)
-    if convocatoria.estado == EstadoConvocatoria.CLOSED:
+    if convocatoria.estado_en(utc_now_naive()) == EstadoConvocatoria.CLOSED:
         return jsonify({"msg": "No se puede editar una convocatoria cerrada"}), 400
 
     data = request.get_json() or {}
@@ -268,6 +374,12 @@ def editar_convocatoria(convocatoria_id: int):
     if "requisitos" in data and data["requisitos"]:
         convocatoria.requisitos = data["requisitos"].strip()
         cambios += 1
+    if data.get("cupos") not in (None, ""):
+        try:
+            convocatoria.cupos = leer_cupos(data["cupos"])
+        except ValueError as exc:
+            return jsonify({"msg": str(exc)}), 400
+        cambios += 1
 
     if cambios == 0:
         return jsonify({"msg": "No se proporcionaron cambios válidos"}), 400
@@ -280,6 +392,7 @@ def editar_convocatoria(convocatoria_id: int):
 
 @bp.post("/<int:convocatoria_id>/postulaciones")
 @jwt_required()
+@idempotente
 def crear_postulacion(convocatoria_id: int):
     estudiante_id = int(get_jwt_identity())
     estudiante = Usuario.query.get_or_404(estudiante_id)
@@ -289,36 +402,48 @@ def crear_postulacion(convocatoria_id: int):
 
     convocatoria = Convocatoria.query.get_or_404(convocatoria_id)
 
-    auto_archivar_convocatorias()
-    if convocatoria.archivada or convocatoria.estado in (EstadoConvocatoria.CLOSED, EstadoConvocatoria.ARCHIVED):
+    estado_actual = convocatoria.estado_en(utc_now_naive())
+    if convocatoria.archivada or estado_actual in (EstadoConvocatoria.CLOSED, EstadoConvocatoria.ARCHIVED):
         return jsonify({"msg": "La convocatoria no admite nuevas postulaciones"}), 400
 
-    existente = (
-        Postulacion.query.filter_by(
-            estudiante_id=estudiante.id,
-            convocatoria_id=convocatoria.id,
-        )
-        .filter(Postulacion.estado != EstadoPostulacion.ARCHIVED)
-        .first()
-    )
-    if existente:
-        return (
-            jsonify({"msg": "Ya existe una postulación para esta convocatoria", "postulacion": existente.to_dict()}),
-            409,
-        )
+    limite = limite_cv()
+    if request.mimetype == "multipart/form-data":
+        if request.content_length and request.content_length > limite + MARGEN_MULTIPART:
+            return jsonify({"msg": mensaje_limite(limite)}), 413
+        try:
+            campos, soportes = leer_multipart_cv(request.stream, request.headers.get("Content-Type", ""))
+            formulario = json.loads(campos["formulario"]) if campos.get("formulario") else {}
+            if not soportes and campos.get("cargaId"):
+                soportes = soportes_desde_carga(campos["cargaId"], estudiante.id)
+        except ArchivoDemasiadoGrande as exc:
+            return jsonify({"msg": str(exc)}), 413
+        except ValueError as exc:
+            return jsonify({"msg": str(exc)}), 400
+        if not isinstance(formulario, dict):
+            return jsonify({"msg": "El formulario debe ser un objeto JSON"}), 400
+        return _registrar_postulacion(estudiante, convocatoria, formulario, soportes)
+
+    # Legacy JSON body with the CV inline as base64; reject oversized bodies before parsing.
+    if request.content_length and request.content_length > (limite + 2) // 3 * 4 + MARGEN_MULTIPART:
+        return jsonify({"msg": mensaje_limite(limite)}), 400
 
     payload = request.get_json() or {}
     formulario = payload.get("formulario") or {}
     soportes = payload.get("soportes") or {}
 
-    if soportes:
+    if soportes.get("cargaId"):
+        try:
+            soportes = soportes_desde_carga(soportes["cargaId"], estudiante.id)
+        except ValueError as exc:
+            return jsonify({"msg": str(exc)}), 400
+    elif soportes:
         nombre_archivo = (soportes.get("cvNombre") or "").strip()
         contenido_b64 = soportes.get("cvBase64")
         if not nombre_archivo or not contenido_b64:
             return jsonify({"msg": "El archivo adjunto es inválido"}), 400
 
         extension = Path(nombre_archivo).suffix.lower()
-        if extension not in {".pdf", ".doc", ".docx"}:
+        if extension not in EXTENSIONES_CV:
             return jsonify({"msg": "Solo se permiten archivos PDF o DOCX"}), 400
 
         try:
@@ -326,99 +451,77 @@ def crear_postulacion(convocatoria_id: int):
         except (BinasciiError, ValueError):
             return jsonify({"msg": "El archivo adjunto no es válido"}), 400
 
-        max_bytes = 5 * 1024 * 1024
-        if len(contenido_bytes) > max_bytes:
-            return jsonify({"msg": "El archivo supera el tamaño máximo permitido de 5 MB"}), 400
+        if len(contenido_bytes) > limite:
+            return jsonify({"msg": mensaje_limite(limite)}), 400
 
-        soportes = {
-            "cvNombre": nombre_archivo,
-            "cvBase64": contenido_b64,
-            "cvSize": len(contenido_bytes),
-        }
+        hash_cv, tamano_cv = obtener_almacen().guardar(contenido_bytes)
+        soportes = referencia_cv(nombre_archivo, hash_cv, tamano_cv)
 
-    postulacion = Postulacion(estudiante_id=estudiante.id, convocatoria_id=convocatoria.id)
+    return _registrar_postulacion(estudiante, convocatoria, formulario, soportes)
+
+
+def _postulacion_duplicada(estudiante_id: int, convocatoria_id: int, solo_preasignadas: bool = False):
+    query = Postulacion.query.filter_by(estudiante_id=estudiante_id, convocatoria_id=convocatoria_id).filter(
+        Postulacion.estado != EstadoPostulacion.ARCHIVED
+    )
+    if solo_preasignadas:
+        query = query.filter_by(preasignada=True)
+    existente = query.first()
+    if existente is None:
+        return None
+    return (
+        jsonify({"msg": "Ya existe una postulación para esta convocatoria", "postulacion": existente.to_dict()}),
+        409,
+    )
+
+
+def _registrar_postulacion(estudiante: Usuario, convocatoria: Convocatoria, formulario: Dict, soportes: Dict):
+    estudiante_id, convocatoria_id = estudiante.id, convocatoria.id
+    # uq_postulacion_activa leaves preasignadas out, and it is missing while legacy duplicates
+    # exist; those cases are checked here, the rest is settled by the index on insert.
+    conflicto = _postulacion_duplicada(
+        estudiante_id, convocatoria_id, solo_preasignadas=unicidad_postulacion_activa()
+    )
+    if conflicto is not None:
+        return conflicto
+    postulacion = Postulacion(estudiante_id=estudiante_id, convocatoria_id=convocatoria_id)
     db.session.add(postulacion)
     postulacion.estudiante = estudiante
     postulacion.convocatoria = convocatoria
     postulacion.completar_formulario(formulario)
     postulacion.adjuntar_soportes(soportes)
     postulacion.esperar_validacion()
-    db.session.flush()
-
-    es_valido, razones = validar_requisitos_estudiante(convocatoria, estudiante)
-
-    servicio_ia = obtener_servicio_ia()
-    descartes_registrados: List[Dict] = []
-    evaluacion_model = None
-
-    if not es_valido:
-        postulacion.marcar_ineligible("; ".join(razones) if razones else "No cumple requisitos")
-        descartes_registrados.append(
-            {
-                "postulacion_id": None,
-                "estudiante_id": estudiante.id,
-                "convocatoria_id": convocatoria.id,
-                "razones": razones or ["No cumple requisitos de la convocatoria"],
-            }
-        )
-    else:
-        elegibles, descartados = servicio_ia.filtrar_postulaciones([postulacion])
-        descartes_registrados.extend(descartados)
-
-        if elegibles:
-            ranking = servicio_ia.clasificar_postulaciones(elegibles)
-            detalles = ranking[0]["detalles"] if ranking else {}
-            evaluacion_model = EvaluacionAspirante(postulacion_id=postulacion.id)
-            evaluacion_model.postulacion = postulacion
-            evaluacion_model.registrar_resultado(
-                postulacion.puntaje or 0.0,
-                postulacion.resultado or "pre-seleccionado",
-                detalles,
-            )
-            db.session.add(evaluacion_model)
-        else:
-            motivos = descartados[0]["razones"] if descartados else ["No supera filtros automáticos"]
-            postulacion.marcar_ineligible("; ".join(motivos))
-
-    db.session.flush()
-
-    for descarte in descartes_registrados:
-        if descarte.get("postulacion_id") is None:
-            descarte["postulacion_id"] = postulacion.id
-
-    reporte = registrar_descartes(convocatoria.id, descartes_registrados)
-
-    metadata_base = {
-        "convocatoria_id": convocatoria.id,
-        "postulacion_id": postulacion.id,
-        "estado": postulacion.estado.value if postulacion.estado else None,
-    }
-    if postulacion.estado == EstadoPostulacion.ELIGIBLE:
-        mensaje = (
-            f"Tu postulación a {convocatoria.curso} fue pre-seleccionada con puntaje "
-            f"{(postulacion.puntaje or 0):.1f}."
-        )
-        if evaluacion_model:
-            metadata_base["detalles"] = evaluacion_model.detalles or {}
-        crear_notificacion(
-            usuario_id=estudiante.id,
-            titulo=f"Postulación aprobada - {convocatoria.curso}",
-            mensaje=mensaje,
-            tipo=TipoNotificacion.SUCCESS,
-            metadata=metadata_base,
+    try:
+        db.session.flush()
+    except IntegrityError:
+        db.session.rollback()
+        conflicto = _postulacion_duplicada(estudiante_id, convocatoria_id)
+        if conflicto is None:
+            raise
+        return conflicto
+
+    if current_app.config["POSTULACIONES_ASINCRONAS"]:
+        # Scoring, the discard report and the notification run in the worker; clients follow ``estado``.
+        trabajo = cola_trabajos.encolar(
+            TRABAJO_EVALUAR_POSTULACION, {"postulacion_id": postulacion.id}, creado_por_id=estudiante.id
         )
-    elif postulacion.estado == EstadoPostulacion.INELIGIBLE:
-        motivos_texto = postulacion.razones_rechazo or "No supera los requisitos de la convocatoria."
-        crear_notificacion(
-            usuario_id=estudiante.id,
-            titulo=f"Postulación no elegible - {convocatoria.curso}",
-            mensaje=(
-                f"Tu postulación a {convocatoria.curso} no avanzó en el proceso. Motivos: {motivos_texto}."
+        db.session.commit()
+        cola_trabajos.notificar()
+        return (
+            jsonify(
+                {
+                    "postulacion": postulacion.to_dict(),
+                    "convocatoria": convocatoria.to_dict(),
+                    "trabajo": trabajo.to_dict(),
+                }
             ),
-            tipo=TipoNotificacion.WARNING,
-            metadata={**metadata_base, "motivos": motivos_texto},
+            202,
         )
 
+    resultado = evaluar_postulacion(postulacion)
+    evaluacion_model = resultado["evaluacion"]
+    descartes_registrados = resultado["descartados"]
+    reporte = resultado["reporte"]
     db.session.commit()
 
     respuesta = {
@@ -439,6 +542,7 @@ def crear_postulacion(convocatoria_id: int):
 
 @bp.post("/<int:convocatoria_id>/inscripciones")
 @jwt_required()
+@idempotente
 def inscribirse_monitoria(convocatoria_id: int):
     estudiante_id = int(get_jwt_identity())
     estudiante = Usuario.query.get_or_404(estudiante_id)
@@ -448,20 +552,10 @@ def inscribirse_monitoria(convocatoria_id: int):
 
     convocatoria = Convocatoria.query.get_or_404(convocatoria_id)
 
-    auto_archivar_convocatorias()
-    if convocatoria.archivada or convocatoria.estado not in {EstadoConvocatoria.ACTIVE, EstadoConvocatoria.SCHEDULED}:
+    estado_actual = convocatoria.estado_en(utc_now_naive())
+    if convocatoria.archivada or estado_actual not in {EstadoConvocatoria.ACTIVE, EstadoConvocatoria.SCHEDULED}:
         return jsonify({"msg": "La convocatoria no admite nuevas inscripciones"}), 400
 
-    existente = InscripcionMonitoria.query.filter_by(
-        estudiante_id=estudiante.id,
-        convocatoria_id=convocatoria.id,
-    ).first()
-    if existente:
-        return (
-            jsonify({"msg": "Ya tienes una inscripción en esta convocatoria", "inscripcion": existente.to_dict()}),
-            409,
-        )
-
     data = request.get_json() or {}
     comentario = (data.get("comentario") or "").strip() or None
     horario_preferido = (data.get("horario_preferido") or "").strip() or None
@@ -473,7 +567,20 @@ def inscribirse_monitoria(convocatoria_id: int):
         horario_preferido=horario_preferido,
     )
     db.session.add(inscripcion)
-    db.session.flush()
+    # uq_inscripcion_est_conv settles concurrent submissions; the conflict returns the existing row.
+    try:
+        db.session.flush()
+    except IntegrityError:
+        db.session.rollback()
+        existente = InscripcionMonitoria.query.filter_by(
+            estudiante_id=estudiante_id, convocatoria_id=convocatoria_id
+        ).first()
+        if existente is None:
+            raise
+        return (
+            jsonify({"msg": "Ya tienes una inscripción en esta convocatoria", "inscripcion": existente.to_dict()}),
+            409,
+        )
 
     crear_notificacion(
         usuario_id=estudiante.id,
@@ -485,6 +592,52 @@ def inscribirse_monitoria(convocatoria_id: int):
 
     return jsonify({"inscripcion": inscripcion.to_dict()}), 201
 
+
+@bp.get("/<int:convocatoria_id>/postulaciones/<int:postulacion_id>/cv")
+@jwt_required()
+def descargar_cv(convocatoria_id: int, postulacion_id: int):
+    """Stream the CV of one postulación; supports Range and If-None-Match on the content hash."""
+    usuario_id = int(get_jwt_identity())
+    usuario = Usuario.query.get_or_404(usuario_id)
+    postulacion = Postulacion.query.filter_by(id=postulacion_id, convocatoria_id=convocatoria_id).first_or_404()
+
+    if usuario.is_student() and postulacion.estudiante_id != usuario.id:
+        return jsonify({"msg": "Postulación no encontrada"}), 404
+
+    soportes = postulacion.datos_soportes or {}
+    hash_cv = soportes.get("cvHash")
+    almacen = obtener_almacen()
+    if not hash_cv or not almacen.existe(hash_cv):
+        return jsonify({"msg": "La postulación no tiene hoja de vida adjunta"}), 404
+
+    nombre = soportes.get("cvNombre") or "cv"
+    respuesta = send_file(
+        almacen.ruta(hash_cv),
+        mimetype=MIMETYPES_CV.get(Path(nombre).suffix.lower(), "application/octet-stream"),
+        download_name=nombre,
+        conditional=True,
+        etag=hash_cv,
+        max_age=0,
+    )
+    respuesta.headers["Cache-Control"] = "private, no-cache"
+    return respuesta
+
+
+@bp.get("/<int:convocatoria_id>/postulaciones/<int:postulacion_id>")
+@jwt_required()
+def detalle_postulacion(convocatoria_id: int, postulacion_id: int):
+    usuario_id = int(get_jwt_identity())
+    usuario = Usuario.query.get_or_404(usuario_id)
+    postulacion = Postulacion.query.filter_by(id=postulacion_id, convocatoria_id=convocatoria_id).first_or_404()
+
+    if usuario.is_student() and postulacion.estudiante_id != usuario.id:
+        return jsonify({"msg": "Postulación no encontrada"}), 404
+
+    data = postulacion.to_dict()
+    data["estudiante"] = postulacion.estudiante.to_dict()
+    return jsonify(data), 200
+
+
 @bp.get("/<int:convocatoria_id>/postulaciones")
 @jwt_required()
 def listar_postulaciones(convocatoria_id: int):
@@ -494,54 +647,142 @@ def listar_postulaciones(convocatoria_id: int):
 
     vista = request.args.get("view")
     estado_param = request.args.get("estado")
+    try:
+        incluir = leer_inclusiones(request.args.get("include"))
+    except ValueError as exc:
+        return jsonify({"msg": str(exc)}), 400
 
-    auto_archivar_convocatorias()
-
+    query = Postulacion.query.options(*opciones_listado(incluir)).filter_by(convocatoria_id=convocatoria_id)
     if usuario.is_student():
-        postulaciones = Postulacion.query.filter_by(convocatoria_id=convocatoria_id, estudiante_id=usuario.id).all()
-    else:
-        postulaciones = Postulacion.query.filter_by(convocatoria_id=convocatoria_id).all()
+        query = query.filter_by(estudiante_id=usuario.id)
+
+    if vista == "ranking":
+        estados = {
+            "descartadas": (),
+            "elegibles": (EstadoPostulacion.ELIGIBLE,),
+        }.get(estado_param, ESTADOS_RANKING)
+        return _ranking_postulaciones(convocatoria, query, estados, incluir, usuario.is_student())
 
     if estado_param == "descartadas":
-        postulaciones = [p for p in postulaciones if p.estado == EstadoPostulacion.INELIGIBLE]
+        query = query.filter(Postulacion.estado == EstadoPostulacion.INELIGIBLE)
     elif estado_param == "elegibles":
-        postulaciones = [p for p in postulaciones if p.estado == EstadoPostulacion.ELIGIBLE]
-
-    datos_postulaciones = [p.to_dict() for p in postulaciones]
+        query = query.filter(Postulacion.estado == EstadoPostulacion.ELIGIBLE)
 
-    if vista == "ranking":
-        estados_ranking = {EstadoPostulacion.ELIGIBLE, EstadoPostulacion.SELECTED}
-        ranking = [
-            {
-                "postulacion": p.to_dict(),
-                "estudiante": p.estudiante.to_dict(),
-                "puntaje": p.puntaje or 0.0,
-                "resultado": p.resultado,
-            }
-            for p in postulaciones
-            if p.estado in estados_ranking
-        ]
-        ranking.sort(key=lambda item: item["puntaje"], reverse=True)
-        return jsonify({"convocatoria": convocatoria.to_dict(), "ranking": ranking}), 200
+    postulaciones = query.order_by(Postulacion.id.asc()).all()
+    datos_postulaciones = [p.to_dict(incluir=incluir) for p in postulaciones]
 
-    reporte_descartes = None
+    reporte = None
     if not usuario.is_student():
         periodo = request.args.get("periodo") or utc_now_naive().strftime("%Y-%m")
-        reporte_descartes = ReporteDescartes.query.filter_by(
-            convocatoria_id=convocatoria.id,
-            periodo=periodo,
-        ).first()
+        reporte = reporte_descartes(convocatoria.id, periodo)
 
     respuesta = {
         "convocatoria": convocatoria.to_dict(),
         "postulaciones": datos_postulaciones,
     }
-    if reporte_descartes:
-        respuesta["reporte_descartes"] = reporte_descartes.to_dict()
+    if reporte:
+        respuesta["reporte_descartes"] = reporte
 
     return jsonify(respuesta), 200
 
 
+def _ranking_postulaciones(convocatoria: Convocatoria, query, estados, incluir, es_estudiante: bool):
+    """Ranking page served from ix_postulacion_ranking.
+
+    ``top=N`` returns the first N rows; ``limit``/``cursor`` paginate by
+    (puntaje, id). The cursor carries the position of its row so later pages
+    keep absolute positions without counting. Without any of them the whole
+    ranking is returned, as the frontend ranking views expect.
+    """
+    top_raw = request.args.get("top")
+    maximo = current_app.config["RANKING_MAX_PAGE_SIZE"]
+    try:
+        if top_raw:
+            limite, cursor = leer_limite(top_raw, maximo, maximo), None
+        elif not (request.args.get("limit") or request.args.get("cursor")):
+            limite, cursor = None, None
+        else:
+            limite = leer_limite(request.args.get("limit"), current_app.config["RANKING_PAGE_SIZE"], maximo)
+            cursor_raw = request.args.get("cursor")
+            cursor = decodificar_cursor(cursor_raw, (float, int, int)) if cursor_raw else None
+    except ValueError as exc:
+        return jsonify({"msg": str(exc) or "Parámetros inválidos"}), 400
+
+    postulaciones, hay_mas = pagina_ranking(
+        query.options(*opciones_relaciones(RELACIONES_RANKING)),
+        estados,
+        limite,
+        (cursor[0], cursor[1]) if cursor else None,
+    )
+    inicio = cursor[2] if cursor else 0
+    ranking = []
+    for indice, postulacion in enumerate(postulaciones, start=inicio + 1):
+        # A student only sees their own rows, so their position comes from the full ranking.
+        posicion = posicion_en_ranking(postulacion)[0] if es_estudiante else indice
+        ranking.append(
+            {
+                "posicion": posicion,
+                "postulacion": postulacion.to_dict(incluir=incluir),
+                "estudiante": postulacion.estudiante.to_dict(),
+                "puntaje": postulacion.puntaje or 0.0,
+                "resultado": postulacion.resultado,
+            }
+        )
+
+    respuesta = jsonify({"convocatoria": convocatoria.to_dict(), "ranking": ranking})
+    if hay_mas and not top_raw:
+        ultima = postulaciones[-1]
+        siguiente = codificar_cursor([ultima.puntaje, ultima.id, inicio + len(postulaciones)])
+        argumentos = request.args.to_dict()
+        argumentos["cursor"] = siguiente
+        respuesta.headers["X-Next-Cursor"] = siguiente
+        respuesta.headers["Link"] = (
+            f'<{url_for(".listar_postulaciones", convocatoria_id=convocatoria.id, **argumentos)}>; rel="next"'
+        )
+    return respuesta, 200
+
+
+@bp.get("/<int:convocatoria_id>/ranking/posicion")
+@jwt_required()
+def posicion_ranking(convocatoria_id: int):
+    """Position of a postulación in the ranking ("#7 de 180") without building the ranking."""
+    usuario_id = int(get_jwt_identity())
+    usuario = Usuario.query.get_or_404(usuario_id)
+    Convocatoria.query.get_or_404(convocatoria_id)
+
+    estudiante_id = usuario.id
+    if not usuario.is_student():
+        try:
+            estudiante_id = int(request.args.get("estudiante_id", ""))
+        except ValueError:
+            return jsonify({"msg": "estudiante_id es obligatorio"}), 400
+
+    postulacion = (
+        Postulacion.query.options(*opciones_listado())
+        .filter(
+            Postulacion.convocatoria_id == convocatoria_id,
+            Postulacion.estudiante_id == estudiante_id,
+            Postulacion.estado.in_(ESTADOS_RANKING),
+        )
+        .first()
+    )
+    if postulacion is None:
+        return jsonify({"msg": "La postulación no está en el ranking"}), 404
+
+    posicion, total = posicion_en_ranking(postulacion)
+    return (
+        jsonify(
+            {
+                "postulacion_id": postulacion.id,
+                "puntaje": postulacion.puntaje,
+                "posicion": posicion,
+                "total": total,
+            }
+        ),
+        200,
+    )
+
+
 @bp.patch("/<int:convocatoria_id>/postulaciones/<int:postulacion_id>/decision")
 @jwt_required()
 def decidir_postulacion(convocatoria_id: int, postulacion_id: int):
@@ -559,42 +800,20 @@ def decidir_postulacion(convocatoria_id: int, postulacion_id: int):
     decision = str(data.get("decision", "")).lower()
     comentario = (data.get("comentario") or "").strip()
 
-    if decision not in {"selected", "not_selected"}:
+    if decision not in DECISIONES:
         return jsonify({"msg": "Decisión inválida"}), 400
 
     if decision == "selected":
         postulacion.marcar_seleccionado(comentario)
-        titulo = f"Has sido seleccionado(a) como monitor de {convocatoria.curso}"
-        mensaje = (
-            f"Felicitaciones, has sido asignado(a) como monitor de {convocatoria.curso}."
-            + (f" Observaciones: {comentario}" if comentario else "")
-        )
-        tipo = TipoNotificacion.SUCCESS
     else:
         postulacion.marcar_no_seleccionado(comentario)
-        titulo = f"Resultado de la convocatoria {convocatoria.curso}"
-        mensaje = (
-            "Gracias por participar. En esta ocasión no fuiste seleccionado(a)."
-            + (f" Motivo: {comentario}" if comentario else "")
-        )
-        tipo = TipoNotificacion.WARNING
-
-    metadata = {
-        "convocatoria_id": convocatoria.id,
-        "postulacion_id": postulacion.id,
-        "decision": decision,
-    }
-    if comentario:
-        metadata["comentario"] = comentario
+    notificacion = notificacion_decision(
+        convocatoria.id, convocatoria.curso, postulacion.id, postulacion.estudiante_id, decision, comentario
+    )
+    metadata = notificacion["metadata"]
 
     try:
-        crear_notificacion(
-            usuario_id=postulacion.estudiante_id,
-            titulo=titulo,
-            mensaje=mensaje,
-            tipo=tipo,
-            metadata=metadata,
-        )
+        crear_notificacion(**notificacion)
     except Exception as exc:  # pragma: no cover - logging path
         current_app.logger.exception("Error enviando notificación de decisión: %s", exc)
         alerta_msg = (
@@ -614,3 +833,29 @@ def decidir_postulacion(convocatoria_id: int, postulacion_id: int):
     db.session.commit()
 
     return jsonify({"postulacion": postulacion.to_dict()}), 200
+
+
+@bp.patch("/<int:convocatoria_id>/postulaciones/decisiones")
+@jwt_required()
+def decidir_postulaciones_lote(convocatoria_id: int):
+    usuario = Usuario.query.get_or_404(int(get_jwt_identity()))
+    if not (usuario.is_coordinator() or usuario.is_professor()):
+        return jsonify({"msg": "Solo coordinadores y profesores pueden registrar decisiones"}), 403
+
+    convocatoria = Convocatoria.query.get_or_404(convocatoria_id)
+    data = request.get_json() or {}
+    decisiones = data.get("decisiones")
+    if not isinstance(decisiones, list) or not decisiones:
+        return jsonify({"msg": "Se requiere una lista de decisiones"}), 400
+    maximo = current_app.config["DECISIONES_MAX_LOTE"]
+    if len(decisiones) > maximo:
+        return jsonify({"msg": f"Se permiten como máximo {maximo} decisiones por solicitud"}), 400
+
+    resultados = aplicar_decisiones(convocatoria, decisiones)
+    db.session.commit()
+
+    aplicadas = sum(1 for resultado in resultados if resultado["ok"])
+    return (
+        jsonify({"resultados": resultados, "aplicadas": aplicadas, "errores": len(resultados) - aplicadas}),
+        200,
+    )
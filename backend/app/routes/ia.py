@@ -5,8 +5,18 @@ from flask import Blueprint, jsonify, request
 from flask_jwt_extended import get_jwt_identity, jwt_required
 
 from ..extensions import db
-from ..models import Usuario
+from ..models import Trabajo, Usuario
 from ..services.ia import obtener_configuracion_ia
+from ..services.simulacion import (
+    CAMPOS_CONFIGURACION,
+    TOP_K_DEFECTO,
+    TOP_K_MAXIMO,
+    cargar_instantanea,
+    configuracion_candidata,
+    leer_valores_configuracion,
+    simular,
+)
+from ..services.trabajos import TRABAJO_RECALCULAR_PUNTAJES, cola_trabajos
 
 
 bp = Blueprint("ia", __name__, url_prefix="/api/ia")
@@ -35,16 +45,79 @@ def actualizar_config_ia():
     data = request.get_json() or {}
     config = obtener_configuracion_ia()
 
-    for campo in ("min_semestre", "min_promedio", "peso_semestre", "peso_promedio", "peso_horas"):
-        if campo in data and data[campo] is not None:
-            try:
-                valor = float(data[campo])
-            except (ValueError, TypeError):
-                return jsonify({"msg": f"Valor inválido para {campo}"}), 400
-            if campo == "min_semestre":
-                setattr(config, campo, int(valor))
-            else:
-                setattr(config, campo, valor)
+    try:
+        valores = leer_valores_configuracion(data)
+    except ValueError as exc:
+        return jsonify({"msg": str(exc)}), 400
 
+    cambios = False
+    for campo, valor in valores.items():
+        if getattr(config, campo) != valor:
+            setattr(config, campo, valor)
+            cambios = True
+
+    trabajo = None
+    if cambios:
+        # Scores written with the previous version are refreshed in the background.
+        config.version = (config.version or 1) + 1
+        trabajo = cola_trabajos.encolar(
+            TRABAJO_RECALCULAR_PUNTAJES, {"version": config.version}, creado_por_id=usuario.id
+        )
     db.session.commit()
-    return jsonify(config.to_dict()), 200
+    if trabajo is not None:
+        cola_trabajos.notificar()
+
+    respuesta = config.to_dict()
+    respuesta["trabajo"] = trabajo.to_dict() if trabajo else None
+    return jsonify(respuesta), 200
+
+
+@bp.get("/trabajos/<int:trabajo_id>")
+@jwt_required()
+def obtener_trabajo(trabajo_id: int):
+    usuario_id = int(get_jwt_identity())
+    usuario = Usuario.query.get_or_404(usuario_id)
+    if not usuario.is_coordinator():
+        return jsonify({"msg": "Solo el coordinador puede consultar los trabajos"}), 403
+
+    trabajo = db.session.get(Trabajo, trabajo_id)
+    if trabajo is None:
+        return jsonify({"msg": "Trabajo no encontrado"}), 404
+    return jsonify(trabajo.to_dict()), 200
+
+
+@bp.post("/simulacion")
+@jwt_required()
+def simular_config_ia():
+    usuario_id = int(get_jwt_identity())
+    usuario = Usuario.query.get_or_404(usuario_id)
+    if not usuario.is_coordinator():
+        return jsonify({"msg": "Solo el coordinador puede simular la configuración"}), 403
+
+    data = request.get_json() or {}
+    try:
+        valores = leer_valores_configuracion(data)
+    except ValueError as exc:
+        return jsonify({"msg": str(exc)}), 400
+    try:
+        top_k = int(data.get("top") or TOP_K_DEFECTO)
+        convocatoria_ids = data.get("convocatoria_ids")
+        if convocatoria_ids is not None:
+            convocatoria_ids = [int(cid) for cid in convocatoria_ids]
+    except (ValueError, TypeError):
+        return jsonify({"msg": "Parámetros de simulación inválidos"}), 400
+    if not 1 <= top_k <= TOP_K_MAXIMO:
+        return jsonify({"msg": f"top debe estar entre 1 y {TOP_K_MAXIMO}"}), 400
+
+    # Read-only: the candidate configuration is a transient object and nothing is flushed.
+    actual = obtener_configuracion_ia()
+    candidata = configuracion_candidata(actual, valores)
+    resumen = simular(actual, candidata, cargar_instantanea(convocatoria_ids), top_k)
+    return jsonify(
+        {
+            "configuracion_actual": actual.to_dict(),
+            "configuracion_simulada": {campo: getattr(candidata, campo) for campo in CAMPOS_CONFIGURACION},
+            "top": top_k,
+            "convocatorias": resumen,
+        }
+    ), 200
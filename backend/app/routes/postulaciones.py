@@ -1,22 +1,42 @@
 """Postulaciones management endpoints."""
 from __future__ import annotations
 
-from flask import Blueprint, jsonify, request
+from datetime import datetime
+
+from flask import Blueprint, current_app, jsonify, request, url_for
 from flask_jwt_extended import get_jwt_identity, jwt_required
+from sqlalchemy import select, tuple_
+from werkzeug.http import parse_content_range_header
 
 from ..extensions import db
 from ..models import (
+    CargaArchivo,
     Convocatoria,
     EstadoPostulacion,
     Postulacion,
     TipoNotificacion,
     Usuario,
 )
+from ..services.almacenamiento import externalizar_soportes
+from ..services.busqueda import sugerir_convocatorias, sugerir_estudiantes
+from ..services.cargas import ArchivoDemasiadoGrande, ConflictoCarga, LimiteCargas, anexar_fragmento, crear_carga
 from ..services.notifications import crear_notificacion
+from ..services.postulaciones import (
+    leer_inclusiones,
+    opciones_listado,
+    tablas_relacionadas,
+)
+from ..utils.pagination import codificar_cursor, decodificar_cursor, leer_limite
 
 
 bp = Blueprint("postulaciones", __name__, url_prefix="/api/postulaciones")
 
+# Typeahead sources for the preasignación form, keyed by the ``tipo`` query parameter.
+SUGERENCIAS_PREASIGNADAS = {
+    "estudiantes": sugerir_estudiantes,
+    "convocatorias": sugerir_convocatorias,
+}
+
 
 def _get_current_user() -> Usuario:
     user_id = int(get_jwt_identity())
@@ -74,8 +94,8 @@ def _aplicar_estado(postulacion: Postulacion, estado: EstadoPostulacion, *, come
             postulacion.razones_rechazo = comentario
 
 
-def _serialize_postulacion(postulacion: Postulacion) -> dict:
-    data = postulacion.to_dict()
+def _serialize_postulacion(postulacion: Postulacion, incluir: frozenset[str] | None = None) -> dict:
+    data = postulacion.to_dict(incluir=incluir)
     if postulacion.estudiante:
         data["estudiante"] = postulacion.estudiante.to_dict()
     if postulacion.convocatoria:
@@ -88,8 +108,24 @@ def _serialize_postulacion(postulacion: Postulacion) -> dict:
 @bp.get("/preasignadas")
 @jwt_required()
 def listar_preasignadas():
+    """Page of preasignadas, newest first, with related records once in ``usuarios``/``convocatorias``.
+
+    Rows carry ``estudiante_id``, ``convocatoria_id`` and ``creada_por_id``;
+    the next page is requested with the ``siguiente`` cursor.
+    """
     usuario = _get_current_user()
-    query = Postulacion.query.filter_by(preasignada=True)
+    try:
+        incluir = leer_inclusiones(request.args.get("include"))
+        limite = leer_limite(
+            request.args.get("limit"),
+            current_app.config["PREASIGNADAS_PAGE_SIZE"],
+            current_app.config["PREASIGNADAS_MAX_PAGE_SIZE"],
+        )
+        cursor_raw = request.args.get("cursor")
+        cursor = decodificar_cursor(cursor_raw, (datetime, int)) if cursor_raw else None
+    except ValueError as exc:
+        return jsonify({"msg": str(exc) or "Parámetros inválidos"}), 400
+    query = Postulacion.query.options(*opciones_listado(incluir)).filter_by(preasignada=True)
 
     convocatoria_param = request.args.get("convocatoria_id")
     if convocatoria_param:
@@ -99,11 +135,46 @@ def listar_preasignadas():
         except ValueError:
             return jsonify({"msg": "convocatoria_id inválido"}), 400
 
+    estado_raw = request.args.get("estado")
+    if estado_raw:
+        estado = _parse_estado(estado_raw)
+        if not estado:
+            return jsonify({"msg": "Estado inválido"}), 400
+        query = query.filter(Postulacion.estado == estado)
+
+    semestre = (request.args.get("semestre") or "").strip()
+    if semestre:
+        query = query.filter(
+            Postulacion.convocatoria_id.in_(select(Convocatoria.id).where(Convocatoria.semestre == semestre))
+        )
+
     if usuario.is_student():
         query = query.filter_by(estudiante_id=usuario.id)
 
-    postulaciones = query.order_by(Postulacion.created_at.desc()).all()
-    return jsonify([_serialize_postulacion(p) for p in postulaciones]), 200
+    clave = tuple_(Postulacion.created_at, Postulacion.id)
+    if cursor:
+        query = query.filter(clave < tuple_(*cursor))
+    postulaciones = query.order_by(Postulacion.created_at.desc(), Postulacion.id.desc()).limit(limite + 1).all()
+    hay_mas = len(postulaciones) > limite
+    postulaciones = postulaciones[:limite]
+
+    siguiente = None
+    if hay_mas:
+        ultima = postulaciones[-1]
+        siguiente = codificar_cursor([ultima.created_at, ultima.id])
+    respuesta = jsonify(
+        {
+            "items": [p.to_dict(incluir=incluir) for p in postulaciones],
+            **tablas_relacionadas(postulaciones),
+            "siguiente": siguiente,
+        }
+    )
+    if siguiente:
+        argumentos = request.args.to_dict()
+        argumentos["cursor"] = siguiente
+        respuesta.headers["X-Next-Cursor"] = siguiente
+        respuesta.headers["Link"] = f'<{url_for(".listar_preasignadas", **argumentos)}>; rel="next"'
+    return respuesta, 200
 
 
 @bp.post("/preasignadas")
@@ -136,6 +207,11 @@ def crear_preasignada():
         estudiante_id=estudiante.id,
         convocatoria_id=convocatoria.id,
     )
+    try:
+        soportes = externalizar_soportes(soportes)
+    except ValueError as exc:
+        return jsonify({"msg": str(exc)}), 400
+
     postulacion.marcar_preasignada(usuario.id)
     postulacion.completar_formulario(formulario)
     postulacion.adjuntar_soportes(soportes)
@@ -268,22 +344,97 @@ def opciones_preasignadas():
     if error:
         return error
 
-    estudiantes = (
-        Usuario.query.filter_by(rol="STUDENT")
-        .order_by(Usuario.nombre.asc())
-        .all()
-    )
-    convocatorias = Convocatoria.query.order_by(Convocatoria.created_at.desc()).all()
-
-    return (
-        jsonify(
-            {
-                "estudiantes": [est.to_dict() for est in estudiantes],
-                "convocatorias": [conv.to_dict() for conv in convocatorias],
-            }
-        ),
-        200,
-    )
+    texto = (request.args.get("q") or "").strip()
+    tipo = request.args.get("tipo")
+    if tipo not in (None, "", *SUGERENCIAS_PREASIGNADAS):
+        return jsonify({"msg": "tipo debe ser estudiantes o convocatorias"}), 400
+    try:
+        limite = leer_limite(
+            request.args.get("limit"),
+            current_app.config["OPCIONES_PAGE_SIZE"],
+            current_app.config["OPCIONES_MAX_PAGE_SIZE"],
+        )
+        cursor_raw = request.args.get("cursor")
+        if cursor_raw and not tipo:
+            raise ValueError("cursor requiere tipo")
+        cursor = decodificar_cursor(cursor_raw, (str, int)) if cursor_raw else None
+    except ValueError as exc:
+        return jsonify({"msg": str(exc) or "Parámetros inválidos"}), 400
+
+    respuesta = {"siguiente": {}}
+    for nombre in [tipo] if tipo else SUGERENCIAS_PREASIGNADAS:
+        items, siguiente = SUGERENCIAS_PREASIGNADAS[nombre](texto, limite, cursor)
+        respuesta[nombre] = items
+        respuesta["siguiente"][nombre] = siguiente
+    return jsonify(respuesta), 200
+
+
+def _carga_del_usuario(carga_id: str, usuario: Usuario) -> CargaArchivo | None:
+    carga = db.session.get(CargaArchivo, carga_id)
+    if carga is None or carga.usuario_id != usuario.id:
+        return None
+    return carga
+
+
+@bp.post("/cargas")
+@jwt_required()
+def iniciar_carga():
+    usuario = _get_current_user()
+    datos = request.get_json() or {}
+    try:
+        tamano = int(datos.get("tamano"))
+    except (TypeError, ValueError):
+        return jsonify({"msg": "tamano debe ser un entero"}), 400
+
+    try:
+        carga = crear_carga(usuario.id, datos.get("nombre"), tamano)
+    except ArchivoDemasiadoGrande as exc:
+        return jsonify({"msg": str(exc)}), 413
+    except LimiteCargas as exc:
+        return jsonify({"msg": str(exc)}), 429
+    except ValueError as exc:
+        return jsonify({"msg": str(exc)}), 400
+    db.session.commit()
+
+    respuesta = jsonify(carga.to_dict())
+    respuesta.headers["Location"] = url_for("postulaciones.estado_carga", carga_id=carga.id)
+    return respuesta, 201
+
+
+@bp.get("/cargas/<carga_id>")
+@jwt_required()
+def estado_carga(carga_id: str):
+    carga = _carga_del_usuario(carga_id, _get_current_user())
+    if carga is None:
+        return jsonify({"msg": "Carga no encontrada"}), 404
+    return jsonify(carga.to_dict()), 200
+
+
+@bp.put("/cargas/<carga_id>")
+@jwt_required()
+def enviar_fragmento(carga_id: str):
+    """Receive the raw bytes ``Content-Range: bytes <inicio>-<fin>/<total>`` of a resumable upload."""
+    carga = _carga_del_usuario(carga_id, _get_current_user())
+    if carga is None:
+        return jsonify({"msg": "Carga no encontrada"}), 404
+
+    rango = parse_content_range_header(request.headers.get("Content-Range"))
+    if rango is None or rango.units != "bytes" or rango.length != carga.tamano_total:
+        return jsonify({"msg": "Content-Range inválido", "carga": carga.to_dict()}), 400
+
+    try:
+        anexar_fragmento(carga, rango.start, request.stream)
+    except ArchivoDemasiadoGrande as exc:
+        db.session.rollback()
+        return jsonify({"msg": str(exc), "carga": carga.to_dict()}), 413
+    except ConflictoCarga as exc:
+        return jsonify({"msg": str(exc), "carga": carga.to_dict()}), 409
+    except ValueError as exc:
+        # The signature check discarded the partial file; persist the reset offset.
+        db.session.commit()
+        return jsonify({"msg": str(exc), "carga": carga.to_dict()}), 400
+    db.session.commit()
+    return jsonify(carga.to_dict()), 200
 
 
 __all__ = ["bp"]
@@ -1,6 +1,9 @@
 """Service layer exports."""
 
+from .almacenamiento import AlmacenBlobs, externalizar_soportes, obtener_almacen
+from .cache import incrementar_version, obtener_version, respuesta_cacheada
 from .convocatorias import (
+    aplicar_transiciones_vencidas,
     auto_archivar_convocatorias,
     debug_log,
     parse_datetime_or_error,
@@ -11,17 +14,28 @@ from .ia import (
     SeleccionIA,
     obtener_configuracion_ia,
     obtener_servicio_ia,
-    registrar_descartes,
 )
+from .descartes import registrar_descartes, reporte_descartes
 from .notifications import (
     crear_notificacion,
+    crear_notificaciones_lote,
     listar_notificaciones,
     marcar_notificacion_leida,
     marcar_notificacion_leida_por_id,
     marcar_todas_leidas,
 )
 
+from .programador import ProgramadorTransiciones, programador
+from .trabajos import ColaTrabajos, cola_trabajos
+
 __all__ = [
+    "AlmacenBlobs",
+    "externalizar_soportes",
+    "obtener_almacen",
+    "incrementar_version",
+    "obtener_version",
+    "respuesta_cacheada",
+    "aplicar_transiciones_vencidas",
     "auto_archivar_convocatorias",
     "debug_log",
     "parse_datetime_or_error",
@@ -31,9 +45,15 @@ __all__ = [
     "obtener_configuracion_ia",
     "obtener_servicio_ia",
     "registrar_descartes",
+    "reporte_descartes",
     "crear_notificacion",
+    "crear_notificaciones_lote",
     "listar_notificaciones",
     "marcar_notificacion_leida",
     "marcar_notificacion_leida_por_id",
     "marcar_todas_leidas",
+    "ProgramadorTransiciones",
+    "programador",
+    "ColaTrabajos",
+    "cola_trabajos",
 ]
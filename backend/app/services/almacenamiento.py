@@ -0,0 +1,279 @@
+"""Content-addressed on-disk storage for postulación attachments."""
+from __future__ import annotations
+
+import base64
+import hashlib
+import os
+import tempfile
+from binascii import Error as BinasciiError
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import BinaryIO, Collection, Dict, Iterable, Iterator, Tuple
+
+from flask import Flask, current_app
+from sqlalchemy import String, cast, select
+
+from ..extensions import db
+from ..models import CargaArchivo, Postulacion
+
+
+TAMANO_BLOQUE = 64 * 1024
+# Key that keeps a legacy payload that could not be decoded, so it is not retried on every start.
+CLAVE_CUARENTENA = "cvBase64Invalido"
+
+
+def _sha256_archivo(ruta: Path) -> Tuple[str, int]:
+    digest = hashlib.sha256()
+    tamano = 0
+    with ruta.open("rb") as origen:
+        for bloque in iter(lambda: origen.read(TAMANO_BLOQUE), b""):
+            digest.update(bloque)
+            tamano += len(bloque)
+    return digest.hexdigest(), tamano
+
+
+class EscrituraBlob:
+    """Incremental write to a temporary file that becomes a blob on :meth:`confirmar`."""
+
+    def __init__(self, almacen: "AlmacenBlobs") -> None:
+        self._almacen = almacen
+        descriptor, self._temporal = tempfile.mkstemp(dir=almacen.raiz, prefix=".subida-")
+        self._destino = os.fdopen(descriptor, "wb")
+        self._digest = hashlib.sha256()
+        self.tamano = 0
+
+    def escribir(self, bloque: bytes) -> None:
+        self._digest.update(bloque)
+        self.tamano += len(bloque)
+        self._destino.write(bloque)
+
+    def confirmar(self) -> Tuple[str, int]:
+        self._destino.close()
+        hash_hex = self._digest.hexdigest()
+        self._almacen._mover(Path(self._temporal), hash_hex)
+        return hash_hex, self.tamano
+
+    def descartar(self) -> None:
+        self._destino.close()
+        if os.path.exists(self._temporal):
+            os.unlink(self._temporal)
+
+
+class AlmacenBlobs:
+    """Files stored as ``<raiz>/<hash[:2]>/<sha256>``; identical content is kept once.
+
+    Resumable uploads accumulate in ``<raiz>/parciales/<id>`` until complete.
+    """
+
+    def __init__(self, raiz: Path | str) -> None:
+        self.raiz = Path(raiz)
+        self.raiz.mkdir(parents=True, exist_ok=True)
+        (self.raiz / "parciales").mkdir(exist_ok=True)
+
+    def ruta(self, hash_hex: str) -> Path:
+        if len(hash_hex) != 64 or any(c not in "0123456789abcdef" for c in hash_hex):
+            raise ValueError("Hash de archivo inválido")
+        return self.raiz / hash_hex[:2] / hash_hex
+
+    def existe(self, hash_hex: str) -> bool:
+        try:
+            return self.ruta(hash_hex).is_file()
+        except ValueError:
+            return False
+
+    def abrir(self, hash_hex: str) -> BinaryIO:
+        return self.ruta(hash_hex).open("rb")
+
+    def _mover(self, temporal: Path, hash_hex: str) -> None:
+        final = self.ruta(hash_hex)
+        if final.exists():
+            temporal.unlink()
+            # A fresh reference to old content must not look abandoned to the purge.
+            os.utime(final)
+        else:
+            final.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(temporal, final)
+
+    def nueva_escritura(self) -> EscrituraBlob:
+        return EscrituraBlob(self)
+
+    def guardar_bloques(self, bloques: Iterable[bytes]) -> Tuple[str, int]:
+        """Spool ``bloques`` to a temporary file and move it into place; returns ``(hash, tamaño)``."""
+        escritura = self.nueva_escritura()
+        try:
+            for bloque in bloques:
+                escritura.escribir(bloque)
+        except BaseException:
+            escritura.descartar()
+            raise
+        return escritura.confirmar()
+
+    def guardar(self, contenido: bytes) -> Tuple[str, int]:
+        return self.guardar_bloques(
+            contenido[inicio : inicio + TAMANO_BLOQUE] for inicio in range(0, len(contenido), TAMANO_BLOQUE)
+        )
+
+    def ruta_parcial(self, carga_id: str) -> Path:
+        if not carga_id.isalnum():
+            raise ValueError("Identificador de carga inválido")
+        return self.raiz / "parciales" / carga_id
+
+    def escribir_parcial(self, carga_id: str, offset: int, bloques: Iterable[bytes]) -> int:
+        """Write ``bloques`` at ``offset``; on failure the file is truncated back to ``offset``."""
+        ruta = self.ruta_parcial(carga_id)
+        ruta.touch(exist_ok=True)
+        escritos = 0
+        with ruta.open("r+b") as destino:
+            destino.truncate(offset)
+            destino.seek(offset)
+            try:
+                for bloque in bloques:
+                    destino.write(bloque)
+                    escritos += len(bloque)
+            except BaseException:
+                destino.truncate(offset)
+                raise
+        return escritos
+
+    def leer_parcial(self, carga_id: str, cantidad: int) -> bytes:
+        with self.ruta_parcial(carga_id).open("rb") as origen:
+            return origen.read(cantidad)
+
+    def consolidar_parcial(self, carga_id: str) -> Tuple[str, int]:
+        ruta = self.ruta_parcial(carga_id)
+        hash_hex, tamano = _sha256_archivo(ruta)
+        self._mover(ruta, hash_hex)
+        return hash_hex, tamano
+
+    def descartar_parcial(self, carga_id: str) -> None:
+        ruta = self.ruta_parcial(carga_id)
+        if ruta.exists():
+            ruta.unlink()
+
+    def _antiguos(self, carpeta: Path, antes_de: datetime) -> Iterator[Path]:
+        limite = antes_de.replace(tzinfo=timezone.utc).timestamp()
+        for ruta in carpeta.iterdir():
+            if ruta.is_file() and ruta.stat().st_mtime < limite:
+                yield ruta
+
+    def purgar_parciales(self, antes_de: datetime, conservar: Collection[str]) -> int:
+        """Delete partial uploads untouched since ``antes_de`` whose id is not in ``conservar``."""
+        borrados = 0
+        for ruta in self._antiguos(self.raiz / "parciales", antes_de):
+            if ruta.name not in conservar:
+                ruta.unlink(missing_ok=True)
+                borrados += 1
+        return borrados
+
+    def purgar_blobs(self, antes_de: datetime, referenciados: Collection[str]) -> int:
+        """Delete blobs and leftover temporaries untouched since ``antes_de`` and not in ``referenciados``."""
+        borrados = 0
+        for ruta in self._antiguos(self.raiz, antes_de):
+            if ruta.name.startswith(".subida-"):
+                ruta.unlink(missing_ok=True)
+                borrados += 1
+        for carpeta in self.raiz.iterdir():
+            if not carpeta.is_dir() or len(carpeta.name) != 2:
+                continue
+            for ruta in self._antiguos(carpeta, antes_de):
+                if ruta.name not in referenciados:
+                    ruta.unlink(missing_ok=True)
+                    borrados += 1
+        return borrados
+
+
+def obtener_almacen() -> AlmacenBlobs:
+    return current_app.extensions["almacen_blobs"]
+
+
+def referencia_cv(nombre: str, hash_hex: str, tamano: int) -> Dict:
+    return {"cvNombre": nombre, "cvHash": hash_hex, "cvSize": tamano}
+
+
+def externalizar_soportes(soportes: Dict) -> Dict:
+    """Replace an inline ``cvBase64`` payload with a reference to the stored blob."""
+    if not soportes or "cvBase64" not in soportes:
+        return soportes or {}
+    try:
+        contenido = base64.b64decode(soportes["cvBase64"] or "", validate=True)
+    except (BinasciiError, ValueError, TypeError) as exc:
+        raise ValueError("El archivo adjunto no es válido") from exc
+    hash_hex, tamano = obtener_almacen().guardar(contenido)
+    resto = {clave: valor for clave, valor in soportes.items() if clave not in ("cvBase64", "cvSize")}
+    return {**resto, **referencia_cv(soportes.get("cvNombre") or "", hash_hex, tamano)}
+
+
+def migrar_soportes_base64(tamano_lote: int = 100) -> int:
+    """Move CVs stored as base64 in ``datos_soportes`` to the blob store; returns how many moved.
+
+    Payloads that do not decode are kept untouched under :data:`CLAVE_CUARENTENA`
+    and logged for manual review; the only copy of a CV is never dropped.
+    """
+    migradas = 0
+    ultimo_id = 0
+    while True:
+        postulaciones = db.session.scalars(
+            select(Postulacion)
+            .where(
+                Postulacion.id > ultimo_id,
+                cast(Postulacion.datos_soportes, String).like('%"cvBase64"%'),
+            )
+            .order_by(Postulacion.id)
+            .limit(tamano_lote)
+        ).all()
+        if not postulaciones:
+            break
+        ultimo_id = postulaciones[-1].id
+        for postulacion in postulaciones:
+            if "cvBase64" not in (postulacion.datos_soportes or {}):
+                continue
+            try:
+                postulacion.datos_soportes = externalizar_soportes(postulacion.datos_soportes)
+            except ValueError:
+                soportes = dict(postulacion.datos_soportes)
+                soportes[CLAVE_CUARENTENA] = soportes.pop("cvBase64")
+                postulacion.datos_soportes = soportes
+                current_app.logger.warning(
+                    "CV de la postulación %s no es base64 válido; se conserva en %s", postulacion.id, CLAVE_CUARENTENA
+                )
+                continue
+            migradas += 1
+        db.session.commit()
+    return migradas
+
+
+def hashes_referenciados() -> set:
+    """Blob hashes still in use by a postulación or by an upload not yet attached to one."""
+    # The JSON index operator renders json_extract on SQLite and ->> on PostgreSQL.
+    cv_hash = Postulacion.datos_soportes["cvHash"].as_string()
+    en_postulaciones = db.session.scalars(select(cv_hash).where(cv_hash.is_not(None)))
+    en_cargas = db.session.scalars(select(CargaArchivo.hash).where(CargaArchivo.hash.is_not(None)))
+    return set(en_postulaciones) | set(en_cargas)
+
+
+def purgar_blobs_huerfanos(antes_de: datetime) -> int:
+    """Delete stored files nothing references that were last written before ``antes_de``.
+
+    The grace period covers CVs saved by a request whose postulación has
+    not been committed yet.
+    """
+    return obtener_almacen().purgar_blobs(antes_de, hashes_referenciados())
+
+
+def init_app(app: Flask) -> None:
+    raiz = app.config.get("BLOB_STORAGE_PATH") or os.path.join(app.instance_path, "blobs")
+    app.extensions["almacen_blobs"] = AlmacenBlobs(raiz)
+
+
+__all__ = [
+    "AlmacenBlobs",
+    "CLAVE_CUARENTENA",
+    "EscrituraBlob",
+    "externalizar_soportes",
+    "hashes_referenciados",
+    "init_app",
+    "migrar_soportes_base64",
+    "obtener_almacen",
+    "purgar_blobs_huerfanos",
+    "referencia_cv",
+]
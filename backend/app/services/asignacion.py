@@ -0,0 +1,257 @@
+"""Global monitor assignment across the convocatorias of a period."""
+from __future__ import annotations
+
+from collections import Counter
+from typing import Dict, Iterable, List, NamedTuple, Tuple
+
+from flask import current_app
+from sqlalchemy import func, select, update
+
+from ..extensions import db
+from ..models import (
+    Convocatoria,
+    EstadoPostulacion,
+    EstadoPropuesta,
+    Postulacion,
+    PropuestaAsignacion,
+    Usuario,
+)
+from ..utils.flujo import FlujoCostoMinimo
+from ..utils.time import utc_now_naive
+from .decisiones import notificacion_decision
+from .notifications import crear_notificaciones_lote
+
+
+# Scores become integer costs so reduced costs compare exactly.
+ESCALA_PUNTAJE = 10**6
+
+
+class PropuestaObsoleta(ValueError):
+    """The data changed since the proposal was computed; it must be recomputed."""
+
+
+class Candidata(NamedTuple):
+    postulacion_id: int
+    estudiante_id: int
+    convocatoria_id: int
+    puntaje: float
+
+
+def cupos_por_horas(horas_disponibles, horas_por_monitoria: int) -> int:
+    """How many monitorías fit in a student's weekly hours; unknown hours allow none."""
+    if horas_disponibles is None or horas_por_monitoria <= 0:
+        return 0
+    return max(0, int(horas_disponibles) // horas_por_monitoria)
+
+
+def resolver_asignacion(
+    candidatas: Iterable[Candidata],
+    cupos_convocatoria: Dict[int, int],
+    cupos_estudiante: Dict[int, int],
+) -> List[Candidata]:
+    """Maximum-total-puntaje assignment respecting both capacities.
+
+    Modelled as a transportation problem: each unit of a student's capacity
+    goes to one convocatoria seat (cost ``-puntaje``) or stays unassigned
+    through a direct edge to the sink (cost 0). Units are added one at a time
+    and placed on their shortest augmenting path, the row-by-row Hungarian
+    method, so each search only explores the students and seats it can displace.
+    """
+    mejores: Dict[Tuple[int, int], Candidata] = {}
+    for candidata in candidatas:
+        if cupos_estudiante.get(candidata.estudiante_id, 0) <= 0:
+            continue
+        if cupos_convocatoria.get(candidata.convocatoria_id, 0) <= 0:
+            continue
+        clave = (candidata.estudiante_id, candidata.convocatoria_id)
+        if clave not in mejores or candidata.puntaje > mejores[clave].puntaje:
+            mejores[clave] = candidata
+    if not mejores:
+        return []
+
+    por_estudiante: Dict[int, List[Candidata]] = {}
+    for candidata in mejores.values():
+        por_estudiante.setdefault(candidata.estudiante_id, []).append(candidata)
+    convocatorias = {cid: i for i, cid in enumerate(sorted({c.convocatoria_id for c in mejores.values()}))}
+    sumidero = len(convocatorias)
+    siguiente = sumidero + 1
+    red = FlujoCostoMinimo(siguiente + len(por_estudiante))
+    for convocatoria_id, nodo in convocatorias.items():
+        red.agregar_arista(nodo, sumidero, cupos_convocatoria[convocatoria_id], 0)
+
+    aristas: List[Tuple[int, Candidata]] = []
+    # Strongest students first: their seats are rarely contested later, so searches stay short.
+    orden = sorted(por_estudiante.items(), key=lambda item: (-max(c.puntaje for c in item[1]), item[0]))
+    for nodo, (estudiante_id, opciones) in enumerate(orden, start=siguiente):
+        costos = [-round(c.puntaje * ESCALA_PUNTAJE) for c in opciones]
+        # A fresh node gets the smallest potential that keeps its new edges at non-negative reduced cost.
+        red.potencial[nodo] = max(
+            [red.potencial[sumidero]]
+            + [red.potencial[convocatorias[c.convocatoria_id]] - costo for c, costo in zip(opciones, costos)]
+        )
+        for candidata, costo in zip(opciones, costos):
+            arista = red.agregar_arista(nodo, convocatorias[candidata.convocatoria_id], 1, costo)
+            aristas.append((arista, candidata))
+        unidades = min(cupos_estudiante[estudiante_id], len(opciones))
+        red.agregar_arista(nodo, sumidero, unidades, 0)
+        for _ in range(unidades):
+            red.enviar_unidad(nodo, sumidero)
+
+    elegidas = [candidata for arista, candidata in aristas if red.flujo(arista)]
+    return sorted(elegidas, key=lambda c: (c.convocatoria_id, -c.puntaje, c.postulacion_id))
+
+
+def _contar_seleccionadas(columna, periodo: str) -> Counter:
+    filas = db.session.execute(
+        select(columna, func.count())
+        .join(Convocatoria, Postulacion.convocatoria_id == Convocatoria.id)
+        .where(
+            Convocatoria.semestre == periodo,
+            Convocatoria.archivada.is_(False),
+            Postulacion.estado == EstadoPostulacion.SELECTED,
+        )
+        .group_by(columna)
+    ).all()
+    return Counter(dict(filas))
+
+
+def proponer_asignacion(periodo: str, creada_por_id: int | None = None) -> PropuestaAsignacion:
+    """Compute the assignment for ``periodo`` from a snapshot of eligible postulaciones. The caller commits.
+
+    Monitors already selected keep their seat and their hours.
+    """
+    horas_por_monitoria = current_app.config["HORAS_POR_MONITORIA"]
+    convocatorias = dict(
+        db.session.execute(
+            select(Convocatoria.id, Convocatoria.cupos).where(
+                Convocatoria.semestre == periodo, Convocatoria.archivada.is_(False)
+            )
+        ).all()
+    )
+    ocupados_convocatoria = _contar_seleccionadas(Postulacion.convocatoria_id, periodo)
+    ocupados_estudiante = _contar_seleccionadas(Postulacion.estudiante_id, periodo)
+
+    filas = db.session.execute(
+        select(
+            Postulacion.id,
+            Postulacion.estudiante_id,
+            Postulacion.convocatoria_id,
+            Postulacion.puntaje,
+            Usuario.horas_disponibles,
+        )
+        .join(Usuario, Postulacion.estudiante_id == Usuario.id)
+        .where(
+            Postulacion.convocatoria_id.in_(list(convocatorias)),
+            Postulacion.estado == EstadoPostulacion.ELIGIBLE,
+            Postulacion.puntaje.is_not(None),
+        )
+    ).all()
+    candidatas = [Candidata(pid, eid, cid, puntaje) for pid, eid, cid, puntaje, _ in filas]
+    cupos_estudiante = {
+        eid: cupos_por_horas(horas, horas_por_monitoria) - ocupados_estudiante[eid] for _, eid, _, _, horas in filas
+    }
+    cupos_convocatoria = {cid: (cupos or 0) - ocupados_convocatoria[cid] for cid, cupos in convocatorias.items()}
+
+    elegidas = resolver_asignacion(candidatas, cupos_convocatoria, cupos_estudiante)
+    asignadas = Counter(c.convocatoria_id for c in elegidas)
+    candidatas_por_convocatoria = Counter(c.convocatoria_id for c in candidatas)
+    propuesta = PropuestaAsignacion(
+        periodo=periodo,
+        creada_por_id=creada_por_id,
+        puntaje_total=sum(c.puntaje for c in elegidas),
+        asignaciones=[c._asdict() for c in elegidas],
+        resumen={
+            "horas_por_monitoria": horas_por_monitoria,
+            "candidatas": len(candidatas),
+            "asignadas": len(elegidas),
+            "estudiantes": len({c.estudiante_id for c in elegidas}),
+            "convocatorias": [
+                {
+                    "convocatoria_id": cid,
+                    "cupos": cupos,
+                    "ocupados": ocupados_convocatoria[cid],
+                    "candidatas": candidatas_por_convocatoria[cid],
+                    "asignadas": asignadas[cid],
+                }
+                for cid, cupos in sorted(convocatorias.items())
+            ],
+        },
+    )
+    db.session.add(propuesta)
+    return propuesta
+
+
+def confirmar_propuesta(propuesta: PropuestaAsignacion) -> int:
+    """Select every assigned postulación in the current transaction; returns how many.
+
+    Raises :class:`PropuestaObsoleta` when a postulación is no longer
+    eligible or a seat/hour limit would be exceeded. The caller commits, or
+    rolls back on error.
+    """
+    if propuesta.estado != EstadoPropuesta.DRAFT:
+        raise ValueError("La propuesta ya fue confirmada")
+    asignaciones = [Candidata(**item) for item in propuesta.asignaciones or []]
+    ids = [c.postulacion_id for c in asignaciones]
+    if ids:
+        resultado = db.session.execute(
+            update(Postulacion)
+            .where(Postulacion.id.in_(ids), Postulacion.estado == EstadoPostulacion.ELIGIBLE)
+            .values(estado=EstadoPostulacion.SELECTED, resultado="seleccionado", razones_rechazo=None)
+            .execution_options(synchronize_session=False)
+        )
+        if resultado.rowcount != len(ids):
+            raise PropuestaObsoleta("Algunas postulaciones cambiaron de estado; recalcula la propuesta")
+
+        horas_por_monitoria = current_app.config["HORAS_POR_MONITORIA"]
+        seleccionadas_convocatoria = _contar_seleccionadas(Postulacion.convocatoria_id, propuesta.periodo)
+        cupos = dict(
+            db.session.execute(
+                select(Convocatoria.id, Convocatoria.cupos).where(
+                    Convocatoria.id.in_({c.convocatoria_id for c in asignaciones})
+                )
+            ).all()
+        )
+        if any(seleccionadas_convocatoria[cid] > (total or 0) for cid, total in cupos.items()):
+            raise PropuestaObsoleta("Los cupos cambiaron desde que se calculó la propuesta")
+        seleccionadas_estudiante = _contar_seleccionadas(Postulacion.estudiante_id, propuesta.periodo)
+        horas = dict(
+            db.session.execute(
+                select(Usuario.id, Usuario.horas_disponibles).where(
+                    Usuario.id.in_({c.estudiante_id for c in asignaciones})
+                )
+            ).all()
+        )
+        if any(seleccionadas_estudiante[eid] > cupos_por_horas(h, horas_por_monitoria) for eid, h in horas.items()):
+            raise PropuestaObsoleta("Las horas disponibles cambiaron desde que se calculó la propuesta")
+
+        cursos = dict(
+            db.session.execute(
+                select(Convocatoria.id, Convocatoria.curso).where(Convocatoria.id.in_(cupos))
+            ).all()
+        )
+        notificaciones = []
+        for asignacion in asignaciones:
+            notificacion = notificacion_decision(
+                asignacion.convocatoria_id,
+                cursos[asignacion.convocatoria_id],
+                asignacion.postulacion_id,
+                asignacion.estudiante_id,
+                "selected",
+            )
+            notificacion["metadata"]["propuesta_id"] = propuesta.id
+            notificaciones.append(notificacion)
+        crear_notificaciones_lote(notificaciones)
+
+    propuesta.estado = EstadoPropuesta.COMMITTED
+    propuesta.confirmada_at = utc_now_naive()
+    return len(ids)
+
+
+__all__ = [
+    "Candidata",
+    "PropuestaObsoleta",
+    "confirmar_propuesta",
+    "cupos_por_horas",
+    "proponer_asignacion",
+    "resolver_asignacion",
+]
@@ -1,10 +1,42 @@
 """Database bootstrap helpers."""
 from __future__ import annotations
 
+from flask import current_app
 from sqlalchemy import text
 
 from ..extensions import db
 from ..models import TipoUsuario, Usuario
+from ..utils.requisitos import compilar_requisitos
+
+
+INDICES_CONVOCATORIA = {
+    "ix_convocatoria_archivada_apertura": "archivada, fecha_apertura",
+    "ix_convocatoria_archivada_cierre": "archivada, fecha_cierre",
+    "ix_convocatoria_archivada_creacion": "archivada, created_at, id",
+    "ix_convocatoria_semestre_creacion": "semestre, created_at, id",
+    "ix_convocatoria_creador_creacion": "creado_por_id, created_at, id",
+    "ix_convocatoria_curso": "curso",
+    "ix_convocatoria_umbrales": "min_semestre_req, min_promedio_req",
+}
+
+INDICES_POSTULACION = {
+    "ix_postulacion_estudiante_convocatoria": "estudiante_id, convocatoria_id",
+    "ix_postulacion_ranking": "convocatoria_id, estado, puntaje DESC, id",
+    "ix_postulacion_preasignada_creacion": "preasignada, created_at, id",
+}
+
+INDICES_USUARIO = {
+    "ix_usuario_rol_nombre": "rol, nombre, id",
+}
+
+# One live postulación per student and convocatoria; preasignadas are managed by gestores apart.
+# Whether the index exists is kept in ``app.extensions`` under EXTENSION_UNICIDAD.
+EXTENSION_UNICIDAD = "unicidad_postulacion"
+UNICIDAD_POSTULACION = (
+    "uq_postulacion_activa",
+    "estudiante_id, convocatoria_id",
+    "estado != 'ARCHIVED' AND preasignada = 0",
+)
 
 
 def ensure_schema_updates() -> None:
@@ -17,6 +49,29 @@ def ensure_schema_updates() -> None:
             conn.execute(text("UPDATE convocatoria SET archivada = 0 WHERE archivada IS NULL"))
         if "archivada_at" not in columnas_convocatoria:
             conn.execute(text("ALTER TABLE convocatoria ADD COLUMN archivada_at DATETIME"))
+        if "min_semestre_req" not in columnas_convocatoria:
+            conn.execute(text("ALTER TABLE convocatoria ADD COLUMN min_semestre_req INTEGER"))
+            conn.execute(text("ALTER TABLE convocatoria ADD COLUMN min_promedio_req FLOAT"))
+            umbrales = [
+                {"id": fila[0], "semestre": semestre, "promedio": promedio}
+                for fila in conn.execute(text("SELECT id, requisitos FROM convocatoria"))
+                for semestre, promedio in [compilar_requisitos(fila[1])]
+            ]
+            if umbrales:
+                conn.execute(
+                    text(
+                        "UPDATE convocatoria SET min_semestre_req = :semestre, "
+                        "min_promedio_req = :promedio WHERE id = :id"
+                    ),
+                    umbrales,
+                )
+        if "cupos" not in columnas_convocatoria:
+            conn.execute(text("ALTER TABLE convocatoria ADD COLUMN cupos INTEGER NOT NULL DEFAULT 1"))
+        for nombre, columnas in INDICES_CONVOCATORIA.items():
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS {nombre} ON convocatoria ({columnas})"))
+
+        for nombre, columnas in INDICES_USUARIO.items():
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS {nombre} ON usuario ({columnas})"))
 
         columnas_postulacion = {
             row[1]: row for row in conn.execute(text("PRAGMA table_info(postulacion)"))
@@ -27,6 +82,61 @@ def ensure_schema_updates() -> None:
                 conn.execute(text("UPDATE postulacion SET preasignada = 0 WHERE preasignada IS NULL"))
             if "creada_por_id" not in columnas_postulacion:
                 conn.execute(text("ALTER TABLE postulacion ADD COLUMN creada_por_id INTEGER"))
+            if "config_version" not in columnas_postulacion:
+                conn.execute(text("ALTER TABLE postulacion ADD COLUMN config_version INTEGER"))
+            for nombre, columnas in INDICES_POSTULACION.items():
+                conn.execute(text(f"CREATE INDEX IF NOT EXISTS {nombre} ON postulacion ({columnas})"))
+            current_app.extensions[EXTENSION_UNICIDAD] = _crear_indice_unico_postulacion(conn)
+
+        columnas_configuracion = {
+            row[1] for row in conn.execute(text("PRAGMA table_info(configuracion_ia)"))
+        }
+        if columnas_configuracion and "version" not in columnas_configuracion:
+            conn.execute(text("ALTER TABLE configuracion_ia ADD COLUMN version INTEGER NOT NULL DEFAULT 1"))
+
+        columnas_reporte = {row[1] for row in conn.execute(text("PRAGMA table_info(reporte_descartes)"))}
+        if columnas_reporte and "total" not in columnas_reporte:
+            conn.execute(text("ALTER TABLE reporte_descartes ADD COLUMN total INTEGER NOT NULL DEFAULT 0"))
+
+        columnas_trabajo = {row[1] for row in conn.execute(text("PRAGMA table_info(trabajo)"))}
+        if columnas_trabajo and "max_intentos" not in columnas_trabajo:
+            conn.execute(text("ALTER TABLE trabajo ADD COLUMN max_intentos INTEGER NOT NULL DEFAULT 1"))
+            conn.execute(text("ALTER TABLE trabajo ADD COLUMN disponible_en DATETIME"))
+
+        if conn.execute(text("PRAGMA table_info(respuesta_idempotente)")).first():
+            conn.execute(
+                text(
+                    "CREATE INDEX IF NOT EXISTS ix_respuesta_idempotente_creacion "
+                    "ON respuesta_idempotente (created_at)"
+                )
+            )
+
+
+def unicidad_postulacion_activa() -> bool:
+    """Whether uq_postulacion_activa guards inserts; without it callers must check for duplicates."""
+    return current_app.extensions.get(EXTENSION_UNICIDAD, False)
+
+
+def _crear_indice_unico_postulacion(conn) -> bool:
+    nombre, columnas, condicion = UNICIDAD_POSTULACION
+    if conn.execute(text("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = :n"), {"n": nombre}).first():
+        return True
+    duplicadas = conn.execute(
+        text(
+            f"SELECT estudiante_id, convocatoria_id FROM postulacion WHERE {condicion} "
+            f"GROUP BY {columnas} HAVING COUNT(*) > 1 LIMIT 5"
+        )
+    ).all()
+    if duplicadas:
+        # Existing duplicates need a human decision; routes fall back to a SELECT check until a later start.
+        current_app.logger.warning(
+            "No se creó %s: hay postulaciones duplicadas (estudiante, convocatoria) como %s",
+            nombre,
+            [tuple(fila) for fila in duplicadas],
+        )
+        return False
+    conn.execute(text(f"CREATE UNIQUE INDEX {nombre} ON postulacion ({columnas}) WHERE {condicion}"))
+    return True
 
 
 def seed_default_data() -> None:
@@ -95,4 +205,5 @@ def seed_default_data() -> None:
 __all__ = [
     "ensure_schema_updates",
     "seed_default_data",
+    "unicidad_postulacion_activa",
 ]
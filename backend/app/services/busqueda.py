@@ -0,0 +1,222 @@
+"""Full-text search over convocatorias and usuarios (SQLite FTS5 / PostgreSQL tsvector)."""
+from __future__ import annotations
+
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Float, Integer, func, literal_column, select, text, tuple_
+from sqlalchemy.orm import Query
+
+from ..extensions import db
+from ..models import Convocatoria, Usuario
+from ..utils.pagination import codificar_cursor
+
+
+TABLA_FTS = "convocatoria_fts"
+TABLA_FTS_USUARIO = "usuario_fts"
+
+_PALABRA = re.compile(r"\w+", re.UNICODE)
+
+_SQLITE_DDL = (
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {TABLA_FTS} USING fts5(
+        curso, requisitos,
+        content='convocatoria', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS convocatoria_fts_ai AFTER INSERT ON convocatoria BEGIN
+        INSERT INTO {TABLA_FTS}(rowid, curso, requisitos) VALUES (new.id, new.curso, new.requisitos);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS convocatoria_fts_ad AFTER DELETE ON convocatoria BEGIN
+        INSERT INTO {TABLA_FTS}({TABLA_FTS}, rowid, curso, requisitos)
+        VALUES ('delete', old.id, old.curso, old.requisitos);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS convocatoria_fts_au AFTER UPDATE OF curso, requisitos ON convocatoria BEGIN
+        INSERT INTO {TABLA_FTS}({TABLA_FTS}, rowid, curso, requisitos)
+        VALUES ('delete', old.id, old.curso, old.requisitos);
+        INSERT INTO {TABLA_FTS}(rowid, curso, requisitos) VALUES (new.id, new.curso, new.requisitos);
+    END
+    """,
+)
+
+_SQLITE_DDL_USUARIO = (
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {TABLA_FTS_USUARIO} USING fts5(
+        nombre, codigo, correo,
+        content='usuario', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS usuario_fts_ai AFTER INSERT ON usuario BEGIN
+        INSERT INTO {TABLA_FTS_USUARIO}(rowid, nombre, codigo, correo)
+        VALUES (new.id, new.nombre, new.codigo, new.correo);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS usuario_fts_ad AFTER DELETE ON usuario BEGIN
+        INSERT INTO {TABLA_FTS_USUARIO}({TABLA_FTS_USUARIO}, rowid, nombre, codigo, correo)
+        VALUES ('delete', old.id, old.nombre, old.codigo, old.correo);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS usuario_fts_au AFTER UPDATE OF nombre, codigo, correo ON usuario BEGIN
+        INSERT INTO {TABLA_FTS_USUARIO}({TABLA_FTS_USUARIO}, rowid, nombre, codigo, correo)
+        VALUES ('delete', old.id, old.nombre, old.codigo, old.correo);
+        INSERT INTO {TABLA_FTS_USUARIO}(rowid, nombre, codigo, correo)
+        VALUES (new.id, new.nombre, new.codigo, new.correo);
+    END
+    """,
+)
+
+_POSTGRES_VECTOR = "to_tsvector('simple', coalesce(curso, '') || ' ' || coalesce(requisitos, ''))"
+_POSTGRES_VECTOR_USUARIO = (
+    "to_tsvector('simple', coalesce(nombre, '') || ' ' || coalesce(codigo, '') || ' ' || coalesce(correo, ''))"
+)
+
+
+def _dialecto() -> str:
+    return db.engine.dialect.name
+
+
+def asegurar_indice_busqueda() -> None:
+    """Create the search indexes and their sync triggers if they are missing."""
+    with db.engine.begin() as conn:
+        if _dialecto() == "sqlite":
+            for tabla, ddl in ((TABLA_FTS, _SQLITE_DDL), (TABLA_FTS_USUARIO, _SQLITE_DDL_USUARIO)):
+                existe = conn.execute(
+                    text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :nombre"),
+                    {"nombre": tabla},
+                ).first()
+                for sentencia in ddl:
+                    conn.execute(text(sentencia))
+                if not existe:
+                    conn.execute(text(f"INSERT INTO {tabla}({tabla}) VALUES ('rebuild')"))
+        elif _dialecto() == "postgresql":
+            conn.execute(
+                text(f"CREATE INDEX IF NOT EXISTS ix_convocatoria_fts ON convocatoria USING GIN ({_POSTGRES_VECTOR})")
+            )
+            conn.execute(
+                text(f"CREATE INDEX IF NOT EXISTS ix_usuario_fts ON usuario USING GIN ({_POSTGRES_VECTOR_USUARIO})")
+            )
+
+
+def palabras_busqueda(texto: str) -> List[str]:
+    return _PALABRA.findall(texto or "")
+
+
+def _consulta_sqlite(palabras: List[str]) -> str:
+    return " ".join(f'"{p}"*' for p in palabras)
+
+
+def _ids_coincidentes(tabla: str, consulta: str):
+    """``SELECT rowid`` of the FTS5 rows matching ``consulta``, for ``IN`` filters."""
+    return (
+        select(literal_column("rowid"))
+        .select_from(text(tabla))
+        .where(text(f"{tabla} MATCH :consulta").bindparams(consulta=consulta))
+    )
+
+
+def _consulta_postgres(palabras: List[str]):
+    return func.to_tsquery("simple", " & ".join(f"{p}:*" for p in palabras))
+
+
+def filtrar_por_texto(query: Query, texto: str, por_relevancia: bool = True) -> Query:
+    """Restrict ``query`` to convocatorias matching every word as a prefix, best match first.
+
+    ``curso`` weighs twice as much as ``requisitos`` in the ranking. With
+    ``por_relevancia=False`` only the filter is applied and the caller orders.
+    """
+    palabras = palabras_busqueda(texto)
+    if not palabras:
+        return query.filter(literal_column("0") == 1)
+
+    if _dialecto() == "postgresql":
+        consulta = _consulta_postgres(palabras)
+        vector = literal_column(_POSTGRES_VECTOR)
+        query = query.filter(vector.op("@@")(consulta))
+        if not por_relevancia:
+            return query
+        return query.order_by(func.ts_rank(vector, consulta).desc(), Convocatoria.id.desc())
+
+    consulta = _consulta_sqlite(palabras)
+    if not por_relevancia:
+        return query.filter(Convocatoria.id.in_(_ids_coincidentes(TABLA_FTS, consulta)))
+    coincidencias = (
+        text(
+            f"SELECT rowid AS id, bm25({TABLA_FTS}, 2.0, 1.0) AS rango "
+            f"FROM {TABLA_FTS} WHERE {TABLA_FTS} MATCH :consulta"
+        )
+        .bindparams(consulta=consulta)
+        .columns(id=Integer, rango=Float)
+        .subquery("coincidencias")
+    )
+    return query.join(coincidencias, coincidencias.c.id == Convocatoria.id).order_by(
+        coincidencias.c.rango.asc(), Convocatoria.id.desc()
+    )
+
+
+def filtrar_usuarios_por_texto(query: Query, texto: str) -> Query:
+    """Restrict ``query`` to usuarios whose nombre, codigo or correo contain every word as a prefix.
+
+    Accents and case are ignored, so ``"maria gonz"`` finds María González.
+    """
+    palabras = palabras_busqueda(texto)
+    if not palabras:
+        return query.filter(literal_column("0") == 1)
+
+    if _dialecto() == "postgresql":
+        return query.filter(literal_column(_POSTGRES_VECTOR_USUARIO).op("@@")(_consulta_postgres(palabras)))
+
+    return query.filter(Usuario.id.in_(_ids_coincidentes(TABLA_FTS_USUARIO, _consulta_sqlite(palabras))))
+
+
+def _pagina_alfabetica(consulta, etiqueta, despues: Optional[Sequence], limite: int) -> Tuple[List, Optional[str]]:
+    """Keyset page ordered by ``(etiqueta, id)``; returns the rows and the cursor of the next page."""
+    entidad_id = consulta.selected_columns[0]
+    if despues:
+        consulta = consulta.where(tuple_(etiqueta, entidad_id) > tuple_(*despues))
+    filas = db.session.execute(consulta.order_by(etiqueta, entidad_id).limit(limite + 1)).all()
+    if len(filas) <= limite:
+        return filas, None
+    filas = filas[:limite]
+    return filas, codificar_cursor([filas[-1]._mapping[etiqueta.key], filas[-1][0]])
+
+
+def sugerir_estudiantes(
+    texto: str, limite: int, despues: Optional[Sequence] = None
+) -> Tuple[List[Dict], Optional[str]]:
+    """Compact student records for a typeahead, alphabetical; all students when ``texto`` is empty."""
+    consulta = select(Usuario.id, Usuario.nombre, Usuario.codigo, Usuario.correo).where(Usuario.rol == "STUDENT")
+    if texto:
+        consulta = filtrar_usuarios_por_texto(consulta, texto)
+    filas, siguiente = _pagina_alfabetica(consulta, Usuario.nombre, despues, limite)
+    return [dict(fila._mapping) for fila in filas], siguiente
+
+
+def sugerir_convocatorias(
+    texto: str, limite: int, despues: Optional[Sequence] = None
+) -> Tuple[List[Dict], Optional[str]]:
+    """Compact convocatoria records for a typeahead, alphabetical by curso."""
+    consulta = select(Convocatoria.id, Convocatoria.curso, Convocatoria.semestre, Convocatoria.archivada)
+    if texto:
+        consulta = filtrar_por_texto(consulta, texto, por_relevancia=False)
+    filas, siguiente = _pagina_alfabetica(consulta, Convocatoria.curso, despues, limite)
+    return [dict(fila._mapping) for fila in filas], siguiente
+
+
+__all__ = [
+    "asegurar_indice_busqueda",
+    "filtrar_por_texto",
+    "filtrar_usuarios_por_texto",
+    "sugerir_convocatorias",
+    "sugerir_estudiantes",
+    "palabras_busqueda",
+]
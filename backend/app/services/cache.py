@@ -0,0 +1,214 @@
+"""Versioned in-process response cache."""
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from functools import wraps
+from typing import Callable, Dict, Hashable, Iterable, NamedTuple, Optional
+
+from flask import Flask, Response, current_app, request
+from sqlalchemy import event, func, select, update
+from sqlalchemy.orm import Session
+
+from ..extensions import db
+from ..models import Convocatoria, VersionDatos
+from ..utils.time import utc_now_naive
+
+
+VERSION_CONVOCATORIAS = "convocatorias"
+VERSIONES = (VERSION_CONVOCATORIAS,)
+
+# Models whose writes invalidate each version.
+MODELOS_VERSIONADOS: Dict[type, str] = {Convocatoria: VERSION_CONVOCATORIAS}
+
+HEADERS_CACHEADOS = ("X-Next-Cursor", "Link")
+
+# Per-student entries live apart so they never evict the shared public responses.
+EXTENSION_RESPUESTAS = "cache_respuestas"
+EXTENSION_ELEGIBILIDAD = "cache_elegibilidad"
+
+
+class EntradaCache(NamedTuple):
+    cuerpo: bytes
+    status: int
+    headers: Dict[str, str]
+    expira_en: datetime
+
+
+class CacheRespuestas:
+    """Thread-safe LRU of serialized responses with per-entry expiry."""
+
+    def __init__(self, max_entradas: int = 256) -> None:
+        self.max_entradas = max_entradas
+        self._entradas: "OrderedDict[Hashable, EntradaCache]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obtener(self, clave: Hashable, now: datetime) -> Optional[EntradaCache]:
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is None:
+                return None
+            if entrada.expira_en <= now:
+                del self._entradas[clave]
+                return None
+            self._entradas.move_to_end(clave)
+            return entrada
+
+    def guardar(self, clave: Hashable, entrada: EntradaCache) -> None:
+        with self._lock:
+            self._entradas[clave] = entrada
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+
+    def limpiar(self) -> None:
+        with self._lock:
+            self._entradas.clear()
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+
+def asegurar_versiones() -> None:
+    existentes = {fila for fila in db.session.scalars(select(VersionDatos.nombre))}
+    faltantes = [VersionDatos(nombre=nombre, version=0) for nombre in VERSIONES if nombre not in existentes]
+    if faltantes:
+        db.session.add_all(faltantes)
+        db.session.commit()
+
+
+def obtener_version(nombre: str) -> int:
+    version = db.session.scalar(select(VersionDatos.version).where(VersionDatos.nombre == nombre))
+    return version or 0
+
+
+def incrementar_version(nombre: str, session: Session | None = None) -> None:
+    """Bump a data version inside the caller's transaction."""
+    stmt = (
+        update(VersionDatos.__table__)
+        .where(VersionDatos.__table__.c.nombre == nombre)
+        .values(version=VersionDatos.__table__.c.version + 1)
+    )
+    (session or db.session).connection().execute(stmt)
+
+
+def _versiones_afectadas(objetos: Iterable[object], session: Session) -> set[str]:
+    afectadas: set[str] = set()
+    for obj in objetos:
+        nombre = MODELOS_VERSIONADOS.get(type(obj))
+        if nombre and (obj in session.new or obj in session.deleted or session.is_modified(obj)):
+            afectadas.add(nombre)
+    return afectadas
+
+
+def _al_preparar_flush(session: Session, flush_context, instances) -> None:
+    objetos = list(session.new) + list(session.dirty) + list(session.deleted)
+    for nombre in _versiones_afectadas(objetos, session):
+        incrementar_version(nombre, session)
+
+
+def proxima_transicion_convocatorias(now: datetime) -> Optional[datetime]:
+    """Earliest future apertura/cierre among non-archived convocatorias."""
+    proximas = [
+        db.session.scalar(
+            select(func.min(columna)).where(Convocatoria.archivada == False, columna > now)  # noqa: E712
+        )
+        for columna in (Convocatoria.fecha_apertura, Convocatoria.fecha_cierre)
+    ]
+    proximas = [momento for momento in proximas if momento]
+    return min(proximas) if proximas else None
+
+
+def obtener_cache(extension: str = EXTENSION_RESPUESTAS) -> CacheRespuestas:
+    return current_app.extensions[extension]
+
+
+def calcular_expiracion(now: datetime) -> datetime:
+    expira_en = now + timedelta(seconds=current_app.config["RESPONSE_CACHE_TTL_SECONDS"])
+    proxima = proxima_transicion_convocatorias(now)
+    if proxima and proxima < expira_en:
+        expira_en = proxima
+    return expira_en
+
+
+def obtener_o_calcular(
+    clave: Hashable, calcular: Callable[[], bytes], now: datetime, extension: str = EXTENSION_RESPUESTAS
+) -> tuple[bytes, bool]:
+    """Return ``(cuerpo, hit)`` for ``clave`` in the cache under ``extension``, computing it on a miss."""
+    cache = obtener_cache(extension)
+    entrada = cache.obtener(clave, now)
+    if entrada is not None:
+        return entrada.cuerpo, True
+    cuerpo = calcular()
+    cache.guardar(clave, EntradaCache(cuerpo, 200, {}, calcular_expiracion(now)))
+    return cuerpo, False
+
+
+def respuesta_cacheada(nombre_version: str) -> Callable:
+    """Cache a public GET view keyed by (endpoint, query args, data version).
+
+    Entries expire at the next scheduled apertura/cierre so state transitions
+    are never served stale.
+    """
+
+    def decorador(vista: Callable) -> Callable:
+        @wraps(vista)
+        def envoltura(*args, **kwargs):
+            cache = obtener_cache()
+            now = utc_now_naive()
+            clave = (
+                request.endpoint,
+                tuple(sorted(request.args.items(multi=True))),
+                tuple(sorted(kwargs.items())),
+                obtener_version(nombre_version),
+            )
+            entrada = cache.obtener(clave, now)
+            if entrada is not None:
+                respuesta = Response(entrada.cuerpo, status=entrada.status, mimetype="application/json")
+                respuesta.headers.extend(entrada.headers)
+                respuesta.headers["X-Cache"] = "HIT"
+                return respuesta
+
+            respuesta = current_app.make_response(vista(*args, **kwargs))
+            if respuesta.status_code == 200:
+                expira_en = calcular_expiracion(now)
+                headers = {h: respuesta.headers[h] for h in HEADERS_CACHEADOS if h in respuesta.headers}
+                cache.guardar(clave, EntradaCache(respuesta.get_data(), 200, headers, expira_en))
+            respuesta.headers["X-Cache"] = "MISS"
+            return respuesta
+
+        return envoltura
+
+    return decorador
+
+
+_listener_registrado = False
+
+
+def init_app(app: Flask) -> None:
+    global _listener_registrado
+    app.extensions[EXTENSION_RESPUESTAS] = CacheRespuestas(app.config.get("RESPONSE_CACHE_MAX_ENTRIES", 256))
+    app.extensions[EXTENSION_ELEGIBILIDAD] = CacheRespuestas(app.config.get("ELEGIBILIDAD_CACHE_MAX_ENTRIES", 1024))
+    if not _listener_registrado:
+        event.listen(db.session, "before_flush", _al_preparar_flush)
+        _listener_registrado = True
+    with app.app_context():
+        asegurar_versiones()
+
+
+__all__ = [
+    "CacheRespuestas",
+    "EXTENSION_ELEGIBILIDAD",
+    "EXTENSION_RESPUESTAS",
+    "VERSION_CONVOCATORIAS",
+    "asegurar_versiones",
+    "calcular_expiracion",
+    "incrementar_version",
+    "init_app",
+    "obtener_cache",
+    "obtener_o_calcular",
+    "obtener_version",
+    "proxima_transicion_convocatorias",
+    "respuesta_cacheada",
+]
@@ -0,0 +1,304 @@
+"""Incremental validation of uploaded CVs (multipart and resumable uploads)."""
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, Optional, Tuple
+
+from flask import current_app
+from sqlalchemy import delete, func, select
+from werkzeug.http import parse_options_header
+from werkzeug.sansio.multipart import Data, Epilogue, Field, File, MultipartDecoder, NeedData
+
+from ..extensions import db
+from ..models import CargaArchivo
+from ..utils.time import utc_now_naive
+from .almacenamiento import TAMANO_BLOQUE, EscrituraBlob, obtener_almacen, purgar_blobs_huerfanos, referencia_cv
+
+
+EXTENSIONES_CV = {".pdf", ".doc", ".docx"}
+FIRMAS_CV = {
+    ".pdf": (b"%PDF-",),
+    ".docx": (b"PK\x03\x04",),
+    ".doc": (b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1",),
+}
+LONGITUD_FIRMA = 8
+MIMETYPES_CV = {
+    ".pdf": "application/pdf",
+    ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    ".doc": "application/msword",
+}
+
+# Room for boundaries, part headers and the small text fields of a multipart body.
+MARGEN_MULTIPART = 64 * 1024
+MAX_MEMORIA_CAMPOS = 64 * 1024
+
+
+class ArchivoDemasiadoGrande(ValueError):
+    """The upload crossed the configured size limit."""
+
+
+class ConflictoCarga(ValueError):
+    """The chunk does not continue the upload where the server left it."""
+
+
+class LimiteCargas(ValueError):
+    """The user already has the maximum number of unfinished uploads."""
+
+
+def limite_cv() -> int:
+    return current_app.config["CV_MAX_BYTES"]
+
+
+def vigencia_cargas() -> timedelta:
+    """Inactivity after which an upload expires and unreferenced files may be purged."""
+    return timedelta(hours=current_app.config["CARGAS_EXPIRACION_HORAS"])
+
+
+def mensaje_limite(limite: int) -> str:
+    return f"El archivo supera el tamaño máximo permitido de {limite // (1024 * 1024)} MB"
+
+
+def validar_nombre_cv(nombre: Optional[str]) -> str:
+    nombre = (nombre or "").strip()
+    if not nombre:
+        raise ValueError("El archivo adjunto es inválido")
+    if Path(nombre).suffix.lower() not in EXTENSIONES_CV:
+        raise ValueError("Solo se permiten archivos PDF o DOCX")
+    return nombre
+
+
+def validar_firma(nombre: str, cabecera: bytes) -> None:
+    """Check the leading bytes against the signature expected for the file extension."""
+    firmas = FIRMAS_CV[Path(nombre).suffix.lower()]
+    if not any(cabecera.startswith(firma) for firma in firmas):
+        raise ValueError("El contenido del archivo no corresponde a un PDF o DOCX")
+
+
+class ValidadorCV:
+    """Enforce the size limit and the magic bytes while the file is still streaming."""
+
+    def __init__(self, nombre: str, limite: int) -> None:
+        self.nombre = validar_nombre_cv(nombre)
+        self.limite = limite
+        self.tamano = 0
+        self._cabecera = b""
+        self._firma_validada = False
+
+    def revisar(self, bloque: bytes) -> bytes:
+        self.tamano += len(bloque)
+        if self.tamano > self.limite:
+            raise ArchivoDemasiadoGrande(mensaje_limite(self.limite))
+        if not self._firma_validada:
+            self._cabecera += bloque[: LONGITUD_FIRMA - len(self._cabecera)]
+            if len(self._cabecera) >= LONGITUD_FIRMA:
+                validar_firma(self.nombre, self._cabecera)
+                self._firma_validada = True
+        return bloque
+
+    def finalizar(self) -> None:
+        if self.tamano == 0:
+            raise ValueError("El archivo adjunto está vacío")
+        if not self._firma_validada:
+            validar_firma(self.nombre, self._cabecera)
+            self._firma_validada = True
+
+
+def _eventos_multipart(stream: BinaryIO, decoder: MultipartDecoder) -> Iterator:
+    while True:
+        bloque = stream.read(TAMANO_BLOQUE)
+        decoder.receive_data(bloque or None)
+        evento = decoder.next_event()
+        while not isinstance(evento, NeedData):
+            yield evento
+            if isinstance(evento, Epilogue):
+                return
+            evento = decoder.next_event()
+        if not bloque:
+            raise ValueError("La solicitud multipart está incompleta")
+
+
+def leer_multipart_cv(stream: BinaryIO, content_type: str, campo: str = "cv") -> Tuple[Dict[str, str], Dict]:
+    """Parse a multipart body chunk by chunk, spooling the ``campo`` file into the blob store.
+
+    Returns the text fields and the soportes reference (empty if no file was
+    sent, including the empty part a form submits when no file is chosen).
+    Raises :class:`ArchivoDemasiadoGrande` as soon as the limit is crossed
+    and ``ValueError`` for any other invalid input.
+    """
+    _, opciones = parse_options_header(content_type)
+    boundary = opciones.get("boundary")
+    if not boundary:
+        raise ValueError("La solicitud multipart no es válida")
+
+    decoder = MultipartDecoder(boundary.encode(), max_form_memory_size=MAX_MEMORIA_CAMPOS)
+    campos: Dict[str, str] = {}
+    soportes: Dict = {}
+    campo_actual: Optional[str] = None
+    valor_actual = bytearray()
+    validador: Optional[ValidadorCV] = None
+    escritura: Optional[EscrituraBlob] = None
+    parte_vacia = False
+
+    try:
+        for evento in _eventos_multipart(stream, decoder):
+            if isinstance(evento, Field):
+                campo_actual, valor_actual = evento.name, bytearray()
+            elif isinstance(evento, File):
+                if evento.name != campo or escritura is not None or soportes:
+                    raise ValueError(f"Solo se admite un archivo en el campo '{campo}'")
+                if not evento.filename:
+                    parte_vacia = True
+                    continue
+                validador = ValidadorCV(evento.filename, limite_cv())
+                escritura = obtener_almacen().nueva_escritura()
+            elif isinstance(evento, Data):
+                if parte_vacia:
+                    if evento.data:
+                        raise ValueError("El archivo adjunto es inválido")
+                    parte_vacia = evento.more_data
+                elif escritura is not None:
+                    escritura.escribir(validador.revisar(evento.data))
+                    if not evento.more_data:
+                        validador.finalizar()
+                        hash_hex, tamano = escritura.confirmar()
+                        soportes = referencia_cv(validador.nombre, hash_hex, tamano)
+                        escritura = None
+                else:
+                    valor_actual += evento.data
+                    if not evento.more_data and campo_actual is not None:
+                        campos[campo_actual] = valor_actual.decode("utf-8")
+                        campo_actual = None
+    except BaseException:
+        if escritura is not None:
+            escritura.descartar()
+        raise
+    return campos, soportes
+
+
+def crear_carga(usuario_id: int, nombre: str, tamano_total: int, now: Optional[datetime] = None) -> CargaArchivo:
+    """Register a resumable upload. The caller commits.
+
+    Raises :class:`LimiteCargas` when the user already has
+    ``CARGAS_MAX_ABIERTAS`` unfinished uploads that have not expired.
+    """
+    nombre = validar_nombre_cv(nombre)
+    if tamano_total <= 0:
+        raise ValueError("El tamaño del archivo debe ser positivo")
+    limite = limite_cv()
+    if tamano_total > limite:
+        raise ArchivoDemasiadoGrande(mensaje_limite(limite))
+    now = now or utc_now_naive()
+    abiertas = db.session.scalar(
+        select(func.count())
+        .select_from(CargaArchivo)
+        .where(
+            CargaArchivo.usuario_id == usuario_id,
+            CargaArchivo.hash.is_(None),
+            CargaArchivo.updated_at > now - vigencia_cargas(),
+        )
+    )
+    maximo = current_app.config["CARGAS_MAX_ABIERTAS"]
+    if abiertas >= maximo:
+        raise LimiteCargas(f"Ya tiene {maximo} cargas sin terminar; complete alguna o espere a que expiren")
+    carga = CargaArchivo(id=uuid.uuid4().hex, usuario_id=usuario_id, nombre=nombre, tamano_total=tamano_total)
+    db.session.add(carga)
+    return carga
+
+
+def _bloques_limitados(stream: BinaryIO, maximo: int) -> Iterator[bytes]:
+    restante = maximo
+    while True:
+        bloque = stream.read(TAMANO_BLOQUE)
+        if not bloque:
+            return
+        if len(bloque) > restante:
+            raise ArchivoDemasiadoGrande("El fragmento excede el tamaño declarado de la carga")
+        restante -= len(bloque)
+        yield bloque
+
+
+def anexar_fragmento(carga: CargaArchivo, offset: int, stream: BinaryIO) -> CargaArchivo:
+    """Append a chunk starting at ``offset``; completes the upload once every byte arrived.
+
+    The caller commits. ``offset`` must equal the bytes already received.
+    """
+    if carga.completa:
+        raise ConflictoCarga("La carga ya está completa")
+    if carga.updated_at and carga.updated_at <= utc_now_naive() - vigencia_cargas():
+        raise ConflictoCarga("La carga expiró; inicie una nueva")
+    if offset != carga.recibido:
+        raise ConflictoCarga(f"Offset inválido: se esperaba {carga.recibido}")
+
+    almacen = obtener_almacen()
+    recibido_antes = carga.recibido
+    escritos = almacen.escribir_parcial(carga.id, offset, _bloques_limitados(stream, carga.tamano_total - offset))
+    carga.recibido = offset + escritos
+
+    completa = carga.recibido == carga.tamano_total
+    if recibido_antes < LONGITUD_FIRMA and (carga.recibido >= LONGITUD_FIRMA or completa):
+        try:
+            validar_firma(carga.nombre, almacen.leer_parcial(carga.id, LONGITUD_FIRMA))
+        except ValueError:
+            almacen.descartar_parcial(carga.id)
+            carga.recibido = 0
+            raise
+    if completa:
+        carga.hash, _ = almacen.consolidar_parcial(carga.id)
+    return carga
+
+
+def soportes_desde_carga(carga_id: str, usuario_id: int) -> Dict:
+    carga = db.session.get(CargaArchivo, carga_id)
+    if carga is None or carga.usuario_id != usuario_id:
+        raise ValueError("La carga indicada no existe")
+    if not carga.completa:
+        raise ValueError("La carga del archivo no ha terminado")
+    return referencia_cv(carga.nombre, carga.hash, carga.tamano_total)
+
+
+def purgar_cargas(now: Optional[datetime] = None) -> int:
+    """Delete uploads idle for longer than :func:`vigencia_cargas`, their partial files and orphan blobs.
+
+    Completed uploads that were never attached to a postulación expire too.
+    Commits before touching the disk so no live row points to a removed file.
+    Returns how many uploads were removed.
+    """
+    now = now or utc_now_naive()
+    antes_de = now - vigencia_cargas()
+    vencidas = db.session.execute(
+        select(CargaArchivo.id, CargaArchivo.hash).where(CargaArchivo.updated_at < antes_de)
+    ).all()
+    if vencidas:
+        db.session.execute(delete(CargaArchivo).where(CargaArchivo.id.in_([carga_id for carga_id, _ in vencidas])))
+        db.session.commit()
+
+    almacen = obtener_almacen()
+    for carga_id, hash_hex in vencidas:
+        if hash_hex is None:
+            almacen.descartar_parcial(carga_id)
+    almacen.purgar_parciales(antes_de, set(db.session.scalars(select(CargaArchivo.id))))
+    purgar_blobs_huerfanos(antes_de)
+    return len(vencidas)
+
+
+__all__ = [
+    "ArchivoDemasiadoGrande",
+    "ConflictoCarga",
+    "LimiteCargas",
+    "EXTENSIONES_CV",
+    "MARGEN_MULTIPART",
+    "MIMETYPES_CV",
+    "ValidadorCV",
+    "anexar_fragmento",
+    "crear_carga",
+    "leer_multipart_cv",
+    "limite_cv",
+    "mensaje_limite",
+    "purgar_cargas",
+    "soportes_desde_carga",
+    "validar_firma",
+    "validar_nombre_cv",
+    "vigencia_cargas",
+]
@@ -1,29 +1,22 @@
 """Convocatoria domain services."""
 from __future__ import annotations
 
-import re
 from datetime import datetime, timezone
 from typing import Dict, List, Optional, Tuple
 
 from dateutil import parser as date_parser
+from sqlalchemy import and_, case, literal, or_, update
 
 from ..extensions import db
 from ..models import Convocatoria, EstadoConvocatoria, Usuario
 from ..utils.time import utc_now_naive
+from .cache import VERSION_CONVOCATORIAS, incrementar_version
 
 
 def recalcular_estado(convocatoria: Convocatoria, now: datetime) -> EstadoConvocatoria:
-    if convocatoria.archivada:
-        convocatoria.estado = EstadoConvocatoria.ARCHIVED
-        return convocatoria.estado
-    fa = convocatoria.fecha_apertura
-    fc = convocatoria.fecha_cierre
-    if fa and fa <= now and (not fc or fc > now):
-        convocatoria.estado = EstadoConvocatoria.ACTIVE
-    elif fa and fa > now:
-        convocatoria.estado = EstadoConvocatoria.SCHEDULED
-    if fc and fc <= now:
-        convocatoria.estado = EstadoConvocatoria.CLOSED
+    estado = convocatoria.estado_en(now)
+    if convocatoria.estado != estado:
+        convocatoria.estado = estado
     return convocatoria.estado
 
 
@@ -50,6 +43,78 @@ def parse_datetime_or_error(raw_value, field_name: str) -> datetime | None:
     return dt
 
 
+CAMPOS_OBLIGATORIOS = ("curso", "semestre", "requisitos")
+
+
+def construir_convocatoria(
+    data: Dict,
+    creado_por_id: int,
+    now: datetime,
+    *,
+    log: bool = False,
+) -> Convocatoria:
+    """Validate a creation payload and build an unsaved ``Convocatoria``.
+
+    Raises ``ValueError`` with the user-facing message when a rule fails.
+    """
+    for campo in CAMPOS_OBLIGATORIOS:
+        if not data.get(campo):
+            raise ValueError(f"Campo obligatorio faltante: {campo}")
+
+    convocatoria = Convocatoria(
+        curso=data["curso"],
+        semestre=data["semestre"],
+        requisitos=data["requisitos"],
+        creado_por_id=creado_por_id,
+    )
+
+    if data.get("cupos") not in (None, ""):
+        convocatoria.cupos = leer_cupos(data["cupos"])
+
+    for campo in ("fecha_apertura", "fecha_cierre"):
+        if not data.get(campo):
+            continue
+        try:
+            fecha = parse_datetime_or_error(data[campo], campo)
+        except (ValueError, TypeError) as exc:
+            if log:
+                debug_log(f"Error parseando {campo}", str(exc))
+            raise ValueError(str(exc)) from exc
+        if log:
+            debug_log(
+                f"Fecha {campo.split('_')[1]} parseada",
+                {"original": data[campo], "normalizada": fecha.isoformat()},
+            )
+        if fecha < now:
+            raise ValueError(f"{campo} no puede estar en el pasado")
+        setattr(convocatoria, campo, fecha)
+
+    if convocatoria.fecha_apertura and convocatoria.fecha_cierre:
+        if convocatoria.fecha_cierre <= convocatoria.fecha_apertura:
+            if log:
+                debug_log(
+                    "Validación rango fechas falló",
+                    {
+                        "fecha_apertura": convocatoria.fecha_apertura.isoformat(),
+                        "fecha_cierre": convocatoria.fecha_cierre.isoformat(),
+                    },
+                )
+            raise ValueError("fecha_cierre debe ser posterior a fecha_apertura")
+
+    recalcular_estado(convocatoria, now)
+    return convocatoria
+
+
+def leer_cupos(valor) -> int:
+    try:
+        cupos = int(valor)
+    except (TypeError, ValueError):
+        raise ValueError("cupos debe ser un número entero") from None
+    if cupos < 1:
+        raise ValueError("cupos debe ser mayor o igual a 1")
+    return cupos
+
+
 def debug_log(msg: str, payload=None) -> None:
     try:
         print(f"[DEBUG-CONVOCATORIAS] {msg}")
@@ -59,74 +124,87 @@ def debug_log(msg: str, payload=None) -> None:
         pass
 
 
-def auto_archivar_convocatorias(now: Optional[datetime] = None) -> None:
+def aplicar_transiciones_vencidas(now: Optional[datetime] = None) -> int:
+    """Open or archive every due convocatoria with a single set-based UPDATE.
+
+    Returns the number of affected rows. The caller owns the transaction.
+    """
     now = now or utc_now_naive()
-    convs = Convocatoria.query.all()
-    cambios = False
-    for conv in convs:
-        if conv.archivada:
-            continue
-        recalcular_estado(conv, now)
-        if conv.estado == EstadoConvocatoria.CLOSED and conv.fecha_cierre and conv.fecha_cierre <= now:
-            conv.archivar(now)
-            cambios = True
-    if cambios:
+    tipo_estado = Convocatoria.__table__.c.estado.type
+    cerrada = and_(Convocatoria.fecha_cierre.is_not(None), Convocatoria.fecha_cierre <= now)
+    abierta = and_(
+        Convocatoria.fecha_apertura.is_not(None),
+        Convocatoria.fecha_apertura <= now,
+        Convocatoria.estado != EstadoConvocatoria.ACTIVE,
+    )
+    stmt = (
+        update(Convocatoria)
+        .where(Convocatoria.archivada.is_(False), or_(cerrada, abierta))
+        .values(
+            estado=case(
+                (cerrada, literal(EstadoConvocatoria.ARCHIVED, tipo_estado)),
+                else_=literal(EstadoConvocatoria.ACTIVE, tipo_estado),
+            ),
+            archivada=case((cerrada, literal(True)), else_=Convocatoria.archivada),
+            archivada_at=case((cerrada, literal(now)), else_=Convocatoria.archivada_at),
+            updated_at=now,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    afectadas = db.session.execute(stmt).rowcount or 0
+    if afectadas:
+        incrementar_version(VERSION_CONVOCATORIAS)
+    return afectadas
+
+
+def auto_archivar_convocatorias(now: Optional[datetime] = None) -> None:
+    if aplicar_transiciones_vencidas(now):
         db.session.commit()
 
 
-def _normalizar_numero(valor: Optional[str]) -> Optional[float]:
-    if valor is None:
-        return None
+def semestre_numerico(estudiante: Usuario) -> int:
     try:
-        return float(str(valor).replace(",", "."))
+        return int(str(estudiante.semestre))
     except (TypeError, ValueError):
-        return None
-
-
-def _extraer_patron_numero(texto: str, patron: str) -> Optional[float]:
-    match = re.search(patron, texto, flags=re.IGNORECASE)
-    if not match:
-        return None
-    for group in match.groups():
-        numero = _normalizar_numero(group)
-        if numero is not None:
-            return numero
-    return None
+        return 0
 
 
-def validar_requisitos_estudiante(convocatoria: Convocatoria, estudiante: Usuario) -> Tuple[bool, List[str]]:
-    requisitos_texto = convocatoria.requisitos.lower()
+def razones_umbrales(
+    min_semestre_req: Optional[int],
+    min_promedio_req: Optional[float],
+    estudiante: Usuario,
+) -> List[str]:
     razones: List[str] = []
-
-    semestre_requerido = _extraer_patron_numero(requisitos_texto, r"semestre[s]?\s*(?:mínimo|minimo|mayor a)?\s*(\d+)")
-    if semestre_requerido is not None:
-        try:
-            semestre_estudiante = int(str(estudiante.semestre))
-        except (TypeError, ValueError):
-            semestre_estudiante = 0
-        if semestre_estudiante < int(semestre_requerido):
+    if min_semestre_req is not None:
+        semestre_estudiante = semestre_numerico(estudiante)
+        if semestre_estudiante < min_semestre_req:
             razones.append(
-                f"Semestre requerido: {int(semestre_requerido)}, estudiante: {semestre_estudiante}"
+                f"Semestre requerido: {min_semestre_req}, estudiante: {semestre_estudiante}"
             )
 
-    promedio_requerido = _extraer_patron_numero(
-        requisitos_texto,
-        r"promedio\s*(?:mínimo|minimo|mayor a)?\s*(\d+(?:[\.,]\d+)?)",
-    )
-    if promedio_requerido is not None:
+    if min_promedio_req is not None:
         promedio_estudiante = estudiante.promedio or 0.0
-        if promedio_estudiante < promedio_requerido:
+        if promedio_estudiante < min_promedio_req:
             razones.append(
-                f"Promedio requerido: {promedio_requerido}, estudiante: {promedio_estudiante}"
+                f"Promedio requerido: {min_promedio_req}, estudiante: {promedio_estudiante}"
             )
+    return razones
 
+
+def validar_requisitos_estudiante(convocatoria: Convocatoria, estudiante: Usuario) -> Tuple[bool, List[str]]:
+    razones = razones_umbrales(convocatoria.min_semestre_req, convocatoria.min_promedio_req, estudiante)
     return len(razones) == 0, razones
 
 
 __all__ = [
     "recalcular_estado",
     "parse_datetime_or_error",
+    "construir_convocatoria",
     "debug_log",
+    "leer_cupos",
+    "aplicar_transiciones_vencidas",
     "auto_archivar_convocatorias",
+    "razones_umbrales",
+    "semestre_numerico",
     "validar_requisitos_estudiante",
 ]
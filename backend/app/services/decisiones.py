@@ -0,0 +1,121 @@
+"""Selection decisions on postulaciones, one at a time or in batches."""
+from __future__ import annotations
+
+from typing import Dict, List, Sequence, Tuple
+
+from sqlalchemy import select, update
+
+from ..extensions import db
+from ..models import Convocatoria, EstadoPostulacion, Postulacion, TipoNotificacion
+from .notifications import crear_notificaciones_lote
+
+
+# decision -> (estado, resultado), the same fields marcar_seleccionado/marcar_no_seleccionado set.
+DECISIONES = {
+    "selected": (EstadoPostulacion.SELECTED, "seleccionado"),
+    "not_selected": (EstadoPostulacion.NOT_SELECTED, "no_seleccionado"),
+}
+
+
+def contenido_notificacion(curso: str, decision: str, comentario: str = "") -> Tuple[str, str, TipoNotificacion]:
+    """``(titulo, mensaje, tipo)`` of the notification sent to the student for ``decision``."""
+    if decision == "selected":
+        return (
+            f"Has sido seleccionado(a) como monitor de {curso}",
+            f"Felicitaciones, has sido asignado(a) como monitor de {curso}."
+            + (f" Observaciones: {comentario}" if comentario else ""),
+            TipoNotificacion.SUCCESS,
+        )
+    return (
+        f"Resultado de la convocatoria {curso}",
+        "Gracias por participar. En esta ocasión no fuiste seleccionado(a)."
+        + (f" Motivo: {comentario}" if comentario else ""),
+        TipoNotificacion.WARNING,
+    )
+
+
+def notificacion_decision(
+    convocatoria_id: int, curso: str, postulacion_id: int, estudiante_id: int, decision: str, comentario: str = ""
+) -> Dict:
+    """Keyword arguments for ``crear_notificacion``/``crear_notificaciones_lote``."""
+    titulo, mensaje, tipo = contenido_notificacion(curso, decision, comentario)
+    metadata = {"convocatoria_id": convocatoria_id, "postulacion_id": postulacion_id, "decision": decision}
+    if comentario:
+        metadata["comentario"] = comentario
+    return {"usuario_id": estudiante_id, "titulo": titulo, "mensaje": mensaje, "tipo": tipo, "metadata": metadata}
+
+
+def _leer_item(item) -> Tuple[int, str, str]:
+    if not isinstance(item, dict):
+        raise ValueError("Cada decisión debe ser un objeto")
+    try:
+        postulacion_id = int(item.get("postulacion_id"))
+    except (TypeError, ValueError):
+        raise ValueError("postulacion_id inválido") from None
+    decision = str(item.get("decision", "")).lower()
+    if decision not in DECISIONES:
+        raise ValueError("Decisión inválida")
+    return postulacion_id, decision, str(item.get("comentario") or "").strip()
+
+
+def aplicar_decisiones(convocatoria: Convocatoria, items: Sequence) -> List[Dict]:
+    """Apply every valid decision with one executemany UPDATE and one bulk INSERT of notifications.
+
+    Returns one result per item, in order. Invalid, repeated or unknown
+    postulaciones are reported and skipped. The caller commits.
+    """
+    resultados: List[Dict] = [{} for _ in items]
+    pendientes: Dict[int, Tuple[int, str, str]] = {}
+    for indice, item in enumerate(items):
+        try:
+            postulacion_id, decision, comentario = _leer_item(item)
+        except ValueError as exc:
+            crudo = item.get("postulacion_id") if isinstance(item, dict) else None
+            resultados[indice] = {"postulacion_id": crudo, "ok": False, "msg": str(exc)}
+            continue
+        if postulacion_id in pendientes:
+            resultados[indice] = {
+                "postulacion_id": postulacion_id,
+                "ok": False,
+                "msg": "Postulación repetida en el lote",
+            }
+            continue
+        pendientes[postulacion_id] = (indice, decision, comentario)
+
+    estudiantes = dict(
+        db.session.execute(
+            select(Postulacion.id, Postulacion.estudiante_id).where(
+                Postulacion.id.in_(list(pendientes)), Postulacion.convocatoria_id == convocatoria.id
+            )
+        ).all()
+    ) if pendientes else {}
+
+    cambios: List[Dict] = []
+    notificaciones: List[Dict] = []
+    for postulacion_id, (indice, decision, comentario) in pendientes.items():
+        if postulacion_id not in estudiantes:
+            resultados[indice] = {"postulacion_id": postulacion_id, "ok": False, "msg": "Postulación no encontrada"}
+            continue
+        estado, resultado = DECISIONES[decision]
+        cambios.append(
+            {"id": postulacion_id, "estado": estado, "resultado": resultado, "razones_rechazo": comentario or None}
+        )
+        notificaciones.append(
+            notificacion_decision(
+                convocatoria.id, convocatoria.curso, postulacion_id, estudiantes[postulacion_id], decision, comentario
+            )
+        )
+        resultados[indice] = {"postulacion_id": postulacion_id, "ok": True, "estado": estado.value}
+
+    if cambios:
+        db.session.execute(update(Postulacion), cambios)
+        crear_notificaciones_lote(notificaciones)
+    return resultados
+
+
+__all__ = [
+    "DECISIONES",
+    "aplicar_decisiones",
+    "contenido_notificacion",
+    "notificacion_decision",
+]
@@ -0,0 +1,180 @@
+"""Append-only log of descartes with monthly aggregates maintained on write."""
+from __future__ import annotations
+
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import delete, insert, select, text
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from ..extensions import db
+from ..models import Descarte, DescarteRazon, ReporteDescartes, ResumenDescartes
+from ..utils.time import utc_now_naive
+
+
+RECIENTES_DEFECTO = 50
+LONGITUD_MOTIVO = 120
+
+
+def periodo_de(momento: datetime) -> str:
+    return momento.strftime("%Y-%m")
+
+
+def motivo_de(razon: str) -> str:
+    """Reason category used for the counts: the text before the student's values.
+
+    ``"Promedio mínimo requerido: 3.5, estudiante: 3.1"`` counts as
+    ``"Promedio mínimo requerido"``.
+    """
+    return razon.split(":", 1)[0].strip()[:LONGITUD_MOTIVO] or "Sin motivo"
+
+
+def _insert_upsert(modelo):
+    """``INSERT`` for the active dialect; both provide ``on_conflict_do_update`` and ``excluded``."""
+    if db.engine.dialect.name == "postgresql":
+        return postgresql_insert(modelo)
+    return sqlite_insert(modelo)
+
+
+def _razones(descarte: Dict) -> List[str]:
+    razones = descarte.get("razones") or []
+    if isinstance(razones, str):
+        razones = [razones]
+    return [str(razon) for razon in razones]
+
+
+def _anexar(convocatoria_id: int, periodo: str, descartados: List[Dict], now: datetime) -> ReporteDescartes:
+    registros = [
+        Descarte(
+            convocatoria_id=convocatoria_id,
+            postulacion_id=descarte.get("postulacion_id"),
+            estudiante_id=descarte.get("estudiante_id"),
+            periodo=periodo,
+            created_at=now,
+        )
+        for descarte in descartados
+    ]
+    db.session.add_all(registros)
+    db.session.flush()
+
+    razones: List[Dict] = []
+    motivos: Counter = Counter()
+    for registro, descarte in zip(registros, descartados):
+        textos = _razones(descarte)
+        razones.extend({"descarte_id": registro.id, "motivo": motivo_de(t), "texto": t} for t in textos)
+        # A reason category counts once per descarte even if it appears twice.
+        motivos.update({motivo_de(t) for t in textos})
+    if razones:
+        db.session.execute(insert(DescarteRazon), razones)
+
+    if motivos:
+        sentencia = _insert_upsert(ResumenDescartes).values(
+            [
+                {"convocatoria_id": convocatoria_id, "periodo": periodo, "motivo": motivo, "total": total}
+                for motivo, total in motivos.items()
+            ]
+        )
+        db.session.execute(
+            sentencia.on_conflict_do_update(
+                index_elements=["convocatoria_id", "periodo", "motivo"],
+                set_={"total": ResumenDescartes.total + sentencia.excluded.total},
+            )
+        )
+
+    sentencia = _insert_upsert(ReporteDescartes).values(
+        convocatoria_id=convocatoria_id, periodo=periodo, total=len(descartados), created_at=now
+    )
+    return db.session.scalars(
+        sentencia.on_conflict_do_update(
+            index_elements=["convocatoria_id", "periodo"],
+            set_={"total": ReporteDescartes.total + sentencia.excluded.total},
+        ).returning(ReporteDescartes),
+        execution_options={"populate_existing": True},
+    ).one()
+
+
+def registrar_descartes(
+    convocatoria_id: int, descartados: List[Dict], now: Optional[datetime] = None
+) -> ReporteDescartes | None:
+    """Append ``descartados`` to the log and bump the month's counters. The caller commits.
+
+    The cost depends on the number of new descartes only; nothing already
+    recorded is read or rewritten.
+    """
+    if not descartados:
+        return None
+    now = now or utc_now_naive()
+    return _anexar(convocatoria_id, periodo_de(now), descartados, now)
+
+
+def reporte_descartes(
+    convocatoria_id: int, periodo: str, recientes: int = RECIENTES_DEFECTO
+) -> Dict | None:
+    """Month report: total, counts per reason and the latest ``recientes`` descartes, all from indexes."""
+    reporte = db.session.scalar(
+        select(ReporteDescartes).where(
+            ReporteDescartes.convocatoria_id == convocatoria_id, ReporteDescartes.periodo == periodo
+        )
+    )
+    if reporte is None:
+        return None
+    por_motivo = db.session.execute(
+        select(ResumenDescartes.motivo, ResumenDescartes.total)
+        .where(ResumenDescartes.convocatoria_id == convocatoria_id, ResumenDescartes.periodo == periodo)
+        .order_by(ResumenDescartes.total.desc(), ResumenDescartes.motivo)
+    ).all()
+    ultimos = db.session.scalars(
+        select(Descarte)
+        .where(Descarte.convocatoria_id == convocatoria_id, Descarte.periodo == periodo)
+        .order_by(Descarte.id.desc())
+        .limit(recientes)
+    ).all()
+    datos = reporte.to_dict()
+    datos["por_motivo"] = [{"motivo": motivo, "total": total} for motivo, total in por_motivo]
+    datos["contenido"] = {"descartados": [descarte.to_dict() for descarte in ultimos]}
+    return datos
+
+
+def _entradas_legadas(contenido) -> List[Dict]:
+    descartados = (contenido or {}).get("descartados") or []
+    if isinstance(descartados, dict):
+        descartados = descartados.get("detalle") or []
+    return [d for d in descartados if isinstance(d, dict)]
+
+
+def migrar_reportes_legados() -> int:
+    """Move reports stored as a JSON snapshot into the descarte log; returns how many.
+
+    Legacy rows are removed before the unique (convocatoria, periodo) index
+    is created, since racing writers could have left duplicates behind.
+    """
+    legados = db.session.scalars(select(ReporteDescartes).where(ReporteDescartes.contenido.is_not(None))).all()
+    pendientes = [
+        (r.convocatoria_id, r.periodo, _entradas_legadas(r.contenido), r.created_at or utc_now_naive())
+        for r in legados
+    ]
+    if legados:
+        db.session.execute(delete(ReporteDescartes).where(ReporteDescartes.id.in_([r.id for r in legados])))
+    db.session.execute(
+        text(
+            "CREATE UNIQUE INDEX IF NOT EXISTS uq_reporte_descartes_periodo "
+            "ON reporte_descartes (convocatoria_id, periodo)"
+        )
+    )
+    for convocatoria_id, periodo, descartados, creado in pendientes:
+        if descartados:
+            _anexar(convocatoria_id, periodo, descartados, creado)
+    db.session.commit()
+    return len(legados)
+
+
+__all__ = [
+    "RECIENTES_DEFECTO",
+    "migrar_reportes_legados",
+    "motivo_de",
+    "periodo_de",
+    "registrar_descartes",
+    "reporte_descartes",
+]
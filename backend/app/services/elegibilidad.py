@@ -0,0 +1,97 @@
+"""Batch eligibility of one student across every active convocatoria."""
+from __future__ import annotations
+
+import json
+from datetime import datetime
+from typing import Dict, List
+
+from sqlalchemy import case, func, literal, select
+
+from ..extensions import db
+from ..models import Convocatoria, EstadoConvocatoria, EstadoPostulacion, Postulacion, Usuario
+from .cache import EXTENSION_ELEGIBILIDAD, VERSION_CONVOCATORIAS, obtener_o_calcular, obtener_version
+from .convocatorias import razones_umbrales, semestre_numerico
+from .ia import obtener_servicio_ia
+
+
+def evaluar_elegibilidad(estudiante: Usuario, now: datetime) -> Dict:
+    """Eligibility and projected score for ``estudiante`` in all active convocatorias.
+
+    Thresholds are compared in SQL in a single query; the IA score only
+    depends on the student and the configuration, so it is computed once.
+    """
+    servicio = obtener_servicio_ia()
+    puntaje, detalles = servicio.calcular_puntaje_estudiante(estudiante)
+    razones_ia = servicio.razones_descarte(estudiante)
+
+    cumple = Convocatoria.condicion_elegible(semestre_numerico(estudiante), estudiante.promedio or 0.0)
+    filas = db.session.execute(
+        select(
+            Convocatoria.id,
+            Convocatoria.curso,
+            Convocatoria.min_semestre_req,
+            Convocatoria.min_promedio_req,
+            case((cumple, literal(True)), else_=literal(False)).label("cumple"),
+        )
+        .where(Convocatoria.condicion_estado(EstadoConvocatoria.ACTIVE, now))
+        .order_by(Convocatoria.id.asc())
+    ).all()
+
+    postuladas = set(
+        db.session.scalars(
+            select(Postulacion.convocatoria_id).where(
+                Postulacion.estudiante_id == estudiante.id,
+                Postulacion.convocatoria_id.in_([fila.id for fila in filas]),
+                Postulacion.estado != EstadoPostulacion.ARCHIVED,
+            )
+        )
+    )
+
+    convocatorias: List[Dict] = []
+    for fila in filas:
+        razones = [] if fila.cumple else razones_umbrales(fila.min_semestre_req, fila.min_promedio_req, estudiante)
+        razones = razones + razones_ia
+        convocatorias.append(
+            {
+                "convocatoria_id": fila.id,
+                "curso": fila.curso,
+                "elegible": not razones,
+                "razones": razones,
+                "puntaje_proyectado": puntaje if not razones else None,
+                "ya_postulado": fila.id in postuladas,
+            }
+        )
+
+    return {
+        "estudiante_id": estudiante.id,
+        "puntaje_proyectado": puntaje,
+        "detalles": detalles,
+        "razones_ia": razones_ia,
+        "convocatorias": convocatorias,
+    }
+
+
+def elegibilidad_cacheada(estudiante: Usuario, now: datetime) -> tuple[bytes, bool]:
+    """JSON body of :func:`evaluar_elegibilidad`, cached per profile and data version."""
+    config = obtener_servicio_ia().configuracion
+    ultima_postulacion = db.session.scalar(
+        select(func.max(Postulacion.updated_at)).where(Postulacion.estudiante_id == estudiante.id)
+    )
+    clave = (
+        "elegibilidad",
+        estudiante.id,
+        estudiante.updated_at,
+        ultima_postulacion,
+        obtener_version(VERSION_CONVOCATORIAS),
+        config.id,
+        config.updated_at,
+    )
+    return obtener_o_calcular(
+        clave,
+        lambda: json.dumps(evaluar_elegibilidad(estudiante, now), ensure_ascii=False).encode(),
+        now,
+        EXTENSION_ELEGIBILIDAD,
+    )
+
+
+__all__ = ["elegibilidad_cacheada", "evaluar_elegibilidad"]
@@ -0,0 +1,160 @@
+"""Evaluation of a submitted postulación: requirements, IA scoring, discard report and notification."""
+from __future__ import annotations
+
+from typing import Dict, List
+
+from ..extensions import db
+from ..models import EstadoPostulacion, EvaluacionAspirante, Postulacion, TipoNotificacion, Trabajo
+from .convocatorias import validar_requisitos_estudiante
+from .descartes import registrar_descartes
+from .ia import obtener_servicio_ia
+from .notifications import crear_notificacion, crear_notificaciones_lote
+
+
+# ``resultado`` of a postulación whose evaluation job ran out of attempts; it stays PENDING for a human.
+RESULTADO_EVALUACION_FALLIDA = "evaluacion_fallida"
+
+
+def evaluar_postulacion(postulacion: Postulacion) -> Dict:
+    """Move a PENDING postulación to ELIGIBLE or INELIGIBLE and notify the student. The caller commits.
+
+    Returns the ``evaluacion``, ``descartados`` and ``reporte`` produced, any of them possibly empty.
+    """
+    estudiante, convocatoria = postulacion.estudiante, postulacion.convocatoria
+    es_valido, razones = validar_requisitos_estudiante(convocatoria, estudiante)
+
+    servicio_ia = obtener_servicio_ia()
+    descartes_registrados: List[Dict] = []
+    evaluacion_model = None
+
+    if not es_valido:
+        postulacion.marcar_ineligible("; ".join(razones) if razones else "No cumple requisitos")
+        descartes_registrados.append(
+            {
+                "postulacion_id": None,
+                "estudiante_id": estudiante.id,
+                "convocatoria_id": convocatoria.id,
+                "razones": razones or ["No cumple requisitos de la convocatoria"],
+            }
+        )
+    else:
+        elegibles, descartados = servicio_ia.filtrar_postulaciones([postulacion])
+        descartes_registrados.extend(descartados)
+
+        if elegibles:
+            ranking = servicio_ia.clasificar_postulaciones(elegibles)
+            detalles = ranking[0]["detalles"] if ranking else {}
+            evaluacion_model = EvaluacionAspirante(postulacion_id=postulacion.id)
+            evaluacion_model.postulacion = postulacion
+            evaluacion_model.registrar_resultado(
+                postulacion.puntaje or 0.0,
+                postulacion.resultado or "pre-seleccionado",
+                detalles,
+            )
+            db.session.add(evaluacion_model)
+        else:
+            motivos = descartados[0]["razones"] if descartados else ["No supera filtros automáticos"]
+            postulacion.marcar_ineligible("; ".join(motivos))
+
+    db.session.flush()
+
+    for descarte in descartes_registrados:
+        if descarte.get("postulacion_id") is None:
+            descarte["postulacion_id"] = postulacion.id
+
+    reporte = registrar_descartes(convocatoria.id, descartes_registrados)
+
+    metadata_base = {
+        "convocatoria_id": convocatoria.id,
+        "postulacion_id": postulacion.id,
+        "estado": postulacion.estado.value if postulacion.estado else None,
+    }
+    if postulacion.estado == EstadoPostulacion.ELIGIBLE:
+        mensaje = (
+            f"Tu postulación a {convocatoria.curso} fue pre-seleccionada con puntaje "
+            f"{(postulacion.puntaje or 0):.1f}."
+        )
+        if evaluacion_model:
+            metadata_base["detalles"] = evaluacion_model.detalles or {}
+        crear_notificacion(
+            usuario_id=estudiante.id,
+            titulo=f"Postulación aprobada - {convocatoria.curso}",
+            mensaje=mensaje,
+            tipo=TipoNotificacion.SUCCESS,
+            metadata=metadata_base,
+        )
+    elif postulacion.estado == EstadoPostulacion.INELIGIBLE:
+        motivos_texto = postulacion.razones_rechazo or "No supera los requisitos de la convocatoria."
+        crear_notificacion(
+            usuario_id=estudiante.id,
+            titulo=f"Postulación no elegible - {convocatoria.curso}",
+            mensaje=(
+                f"Tu postulación a {convocatoria.curso} no avanzó en el proceso. Motivos: {motivos_texto}."
+            ),
+            tipo=TipoNotificacion.WARNING,
+            metadata={**metadata_base, "motivos": motivos_texto},
+        )
+
+    return {"evaluacion": evaluacion_model, "descartados": descartes_registrados, "reporte": reporte}
+
+
+def procesar_postulacion(trabajo: Trabajo) -> None:
+    """Job handler for :func:`evaluar_postulacion`.
+
+    Nothing is committed here, so the evaluation and the job's completion
+    land in the same transaction and a failed attempt leaves the
+    postulación PENDING for the retry. Postulaciones that already left
+    PENDING (evaluated, decided or archived) are skipped.
+    """
+    postulacion = db.session.get(Postulacion, trabajo.parametros["postulacion_id"])
+    trabajo.total = 1
+    if postulacion is not None and postulacion.estado == EstadoPostulacion.PENDING:
+        evaluar_postulacion(postulacion)
+    trabajo.procesados = 1
+
+
+def evaluacion_fallida(trabajo: Trabajo) -> None:
+    """Final-failure handler: flag the postulación and tell the student and the convocatoria's creator."""
+    postulacion = db.session.get(Postulacion, trabajo.parametros["postulacion_id"])
+    if postulacion is None or postulacion.estado != EstadoPostulacion.PENDING:
+        return
+    postulacion.resultado = RESULTADO_EVALUACION_FALLIDA
+    convocatoria = postulacion.convocatoria
+    metadata = {
+        "convocatoria_id": convocatoria.id,
+        "postulacion_id": postulacion.id,
+        "trabajo_id": trabajo.id,
+        "resultado": RESULTADO_EVALUACION_FALLIDA,
+    }
+    crear_notificaciones_lote(
+        [
+            {
+                "usuario_id": postulacion.estudiante_id,
+                "titulo": f"Postulación en revisión - {convocatoria.curso}",
+                "mensaje": (
+                    f"No pudimos evaluar automáticamente tu postulación a {convocatoria.curso}. "
+                    "Sigue registrada y será revisada manualmente."
+                ),
+                "tipo": TipoNotificacion.WARNING,
+                "metadata": metadata,
+            },
+            {
+                "usuario_id": convocatoria.creado_por_id,
+                "titulo": f"Evaluación fallida - {convocatoria.curso}",
+                "mensaje": (
+                    f"La evaluación automática de la postulación #{postulacion.id} falló tras "
+                    f"{trabajo.intentos} intentos: {trabajo.error}. Requiere revisión manual."
+                ),
+                "tipo": TipoNotificacion.ERROR,
+                "metadata": metadata,
+            },
+        ]
+    )
+
+
+__all__ = [
+    "RESULTADO_EVALUACION_FALLIDA",
+    "evaluacion_fallida",
+    "evaluar_postulacion",
+    "procesar_postulacion",
+]
@@ -4,8 +4,9 @@ from __future__ import annotations
 from typing import Dict, List, Tuple
 
 from ..extensions import db
-from ..models import ConfiguracionIA, Postulacion, ReporteDescartes, Usuario
-from ..utils.time import utc_now_naive
+from ..models import ConfiguracionIA, Postulacion, Usuario
+from .postulaciones import RELACIONES_RANKING, precargar_relaciones
+from .puntuacion import Caracteristicas, ResultadoLote, puntuar
 
 
 class SeleccionIA:
@@ -20,8 +21,7 @@ class SeleccionIA:
         except (ValueError, TypeError):
             return None
 
-    def _calcular_puntaje(self, postulacion: Postulacion) -> Tuple[float, Dict[str, float]]:
-        estudiante = postulacion.estudiante
+    def calcular_puntaje_estudiante(self, estudiante: Usuario) -> Tuple[float, Dict[str, float]]:
         detalles: Dict[str, float] = {}
         puntaje = 0.0
 
@@ -44,27 +44,34 @@ class SeleccionIA:
         detalles["puntaje_total"] = puntaje
         return puntaje, detalles
 
+    def _calcular_puntaje(self, postulacion: Postulacion) -> Tuple[float, Dict[str, float]]:
+        return self.calcular_puntaje_estudiante(postulacion.estudiante)
+
+    def razones_descarte(self, estudiante: Usuario) -> List[str]:
+        semestre_val = self._obtener_semestre(estudiante) or 0
+        promedio_val = estudiante.promedio or 0.0
+
+        razones: List[str] = []
+        if semestre_val < self.configuracion.min_semestre:
+            razones.append(
+                f"Semestre mínimo requerido: {self.configuracion.min_semestre}, estudiante: {semestre_val}"
+            )
+        if promedio_val < self.configuracion.min_promedio:
+            razones.append(
+                f"Promedio mínimo requerido: {self.configuracion.min_promedio}, estudiante: {promedio_val}"
+            )
+        return razones
+
     def filtrar_postulaciones(self, postulaciones: List[Postulacion]) -> Tuple[List[Postulacion], List[Dict]]:
         elegibles: List[Postulacion] = []
         descartados: List[Dict] = []
+        precargar_relaciones(postulaciones, RELACIONES_RANKING)
 
         for postulacion in postulaciones:
-            estudiante = postulacion.estudiante
-            semestre_val = self._obtener_semestre(estudiante) or 0
-            promedio_val = estudiante.promedio or 0.0
-
-            razones: List[str] = []
-            if semestre_val < self.configuracion.min_semestre:
-                razones.append(
-                    f"Semestre mínimo requerido: {self.configuracion.min_semestre}, estudiante: {semestre_val}"
-                )
-            if promedio_val < self.configuracion.min_promedio:
-                razones.append(
-                    f"Promedio mínimo requerido: {self.configuracion.min_promedio}, estudiante: {promedio_val}"
-                )
-
+            razones = self.razones_descarte(postulacion.estudiante)
             if razones:
                 postulacion.marcar_ineligible("; ".join(razones))
+                postulacion.config_version = self.configuracion.version
                 descartados.append(
                     {
                         "postulacion_id": postulacion.id,
@@ -80,9 +87,11 @@ class SeleccionIA:
 
     def clasificar_postulaciones(self, postulaciones: List[Postulacion]) -> List[Dict]:
         ranking: List[Dict] = []
+        precargar_relaciones(postulaciones, RELACIONES_RANKING)
         for postulacion in postulaciones:
             puntaje, detalles = self._calcular_puntaje(postulacion)
             postulacion.marcar_elegible(puntaje, "pre-seleccionado")
+            postulacion.config_version = self.configuracion.version
             ranking.append(
                 {
                     "postulacion": postulacion.to_dict(),
@@ -94,11 +103,9 @@ class SeleccionIA:
         ranking.sort(key=lambda item: item["puntaje"], reverse=True)
         return ranking
 
-    def generar_reporte_descartados(self, descartados: List[Dict]) -> Dict:
-        return {
-            "total_descartados": len(descartados),
-            "detalle": descartados,
-        }
+    def puntuar_lote(self, caracteristicas: Caracteristicas) -> ResultadoLote:
+        """Vectorized equivalent of :meth:`calcular_puntaje_estudiante` and :meth:`razones_descarte`."""
+        return puntuar(caracteristicas, self.configuracion)
 
 
 def obtener_configuracion_ia() -> ConfiguracionIA:
@@ -114,25 +121,8 @@ def obtener_servicio_ia() -> SeleccionIA:
     return SeleccionIA(obtener_configuracion_ia())
 
 
-def registrar_descartes(convocatoria_id: int, descartados: List[Dict]) -> ReporteDescartes | None:
-    if not descartados:
-        return None
-    periodo_actual = utc_now_naive().strftime("%Y-%m")
-    reporte = ReporteDescartes.query.filter_by(
-        convocatoria_id=convocatoria_id,
-        periodo=periodo_actual,
-    ).first()
-    if not reporte:
-        reporte = ReporteDescartes(convocatoria_id=convocatoria_id, periodo=periodo_actual)
-        db.session.add(reporte)
-    servicio = obtener_servicio_ia()
-    reporte.generar(servicio.generar_reporte_descartados(descartados))
-    return reporte
-
-
 __all__ = [
     "SeleccionIA",
     "obtener_configuracion_ia",
     "obtener_servicio_ia",
-    "registrar_descartes",
 ]
@@ -0,0 +1,136 @@
+"""Replay of stored responses for requests that carry an ``Idempotency-Key`` header."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from functools import wraps
+from typing import Callable, Optional
+
+from flask import current_app, jsonify, request
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
+
+from ..extensions import db
+from ..models import RespuestaIdempotente
+from ..utils.time import utc_now_naive
+
+
+HEADER_IDEMPOTENCIA = "Idempotency-Key"
+LONGITUD_MAXIMA_CLAVE = 255
+# A reservation still without response after this long belongs to a request that died.
+RESERVA_ABANDONADA = timedelta(minutes=5)
+
+
+def _vencida(registro: RespuestaIdempotente, now) -> bool:
+    vigencia = (
+        RESERVA_ABANDONADA
+        if registro.codigo is None
+        else timedelta(hours=current_app.config["IDEMPOTENCIA_TTL_HORAS"])
+    )
+    return registro.created_at is None or registro.created_at + vigencia <= now
+
+
+def _reservar(usuario_id: int, clave: str, ruta: str):
+    """Insert the in-progress row for ``clave``; returns ``(reserva_id, None)`` or ``(None, registro_existente)``."""
+    now = utc_now_naive()
+    for _ in range(2):
+        reserva = RespuestaIdempotente(usuario_id=usuario_id, clave=clave, ruta=ruta, created_at=now)
+        db.session.add(reserva)
+        try:
+            db.session.commit()
+            return reserva.id, None
+        except IntegrityError:
+            db.session.rollback()
+        existente = db.session.scalar(
+            select(RespuestaIdempotente).where(
+                RespuestaIdempotente.usuario_id == usuario_id, RespuestaIdempotente.clave == clave
+            )
+        )
+        if existente is not None and not _vencida(existente, now):
+            return None, existente
+        db.session.execute(
+            delete(RespuestaIdempotente).where(
+                RespuestaIdempotente.usuario_id == usuario_id,
+                RespuestaIdempotente.clave == clave,
+                RespuestaIdempotente.created_at <= now - RESERVA_ABANDONADA,
+            )
+        )
+        db.session.commit()
+    return None, None
+
+
+def idempotente(vista: Callable) -> Callable:
+    """Run an authenticated POST view at most once per (user, ``Idempotency-Key``).
+
+    The key is reserved before the view runs, so a concurrent retry gets 409
+    instead of a second execution, and a later retry gets the stored status
+    and JSON body with ``Idempotent-Replayed: true``. Responses with a 5xx
+    status are not stored, so the client can retry them. Requests without
+    the header run unchanged. Apply it below ``jwt_required``.
+    """
+
+    @wraps(vista)
+    def envoltura(*args, **kwargs):
+        clave = (request.headers.get(HEADER_IDEMPOTENCIA) or "").strip()
+        if not clave:
+            return vista(*args, **kwargs)
+        if len(clave) > LONGITUD_MAXIMA_CLAVE:
+            mensaje = f"{HEADER_IDEMPOTENCIA} admite como máximo {LONGITUD_MAXIMA_CLAVE} caracteres"
+            return jsonify({"msg": mensaje}), 400
+
+        usuario_id = int(get_jwt_identity())
+        ruta = f"{request.method} {request.path}"
+        reserva_id, existente = _reservar(usuario_id, clave, ruta)
+        if existente is not None:
+            if existente.ruta != ruta:
+                return jsonify({"msg": f"La {HEADER_IDEMPOTENCIA} ya se usó en otra solicitud"}), 422
+            if existente.codigo is None:
+                return jsonify({"msg": "Hay una solicitud en curso con la misma clave"}), 409
+            respuesta = current_app.make_response((jsonify(existente.cuerpo), existente.codigo))
+            respuesta.headers["Idempotent-Replayed"] = "true"
+            return respuesta
+        if reserva_id is None:
+            return jsonify({"msg": "No fue posible reservar la clave de idempotencia"}), 409
+
+        try:
+            respuesta = current_app.make_response(vista(*args, **kwargs))
+        except Exception:
+            db.session.rollback()
+            db.session.execute(delete(RespuestaIdempotente).where(RespuestaIdempotente.id == reserva_id))
+            db.session.commit()
+            raise
+
+        if respuesta.status_code >= 400:
+            # Error paths must not leave half-done work behind our bookkeeping commit.
+            db.session.rollback()
+        if respuesta.status_code >= 500 or not respuesta.is_json:
+            db.session.execute(delete(RespuestaIdempotente).where(RespuestaIdempotente.id == reserva_id))
+        else:
+            db.session.execute(
+                update(RespuestaIdempotente)
+                .where(RespuestaIdempotente.id == reserva_id)
+                .values(codigo=respuesta.status_code, cuerpo=respuesta.get_json())
+            )
+        db.session.commit()
+        return respuesta
+
+    return envoltura
+
+
+def purgar_respuestas_vencidas(now: Optional[datetime] = None) -> int:
+    """Delete stored responses older than ``IDEMPOTENCIA_TTL_HORAS``; returns how many."""
+    now = now or utc_now_naive()
+    vigencia = timedelta(hours=current_app.config["IDEMPOTENCIA_TTL_HORAS"])
+    # Never below the reservation window, so a short TTL cannot free a key whose request is still running.
+    resultado = db.session.execute(
+        delete(RespuestaIdempotente).where(RespuestaIdempotente.created_at < now - max(vigencia, RESERVA_ABANDONADA))
+    )
+    db.session.commit()
+    return resultado.rowcount
+
+
+__all__ = [
+    "HEADER_IDEMPOTENCIA",
+    "idempotente",
+    "purgar_respuestas_vencidas",
+]
@@ -0,0 +1,117 @@
+"""Bulk convocatoria import from streamed CSV or NDJSON."""
+from __future__ import annotations
+
+import csv
+import json
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from ..extensions import db
+from ..models import Convocatoria
+from .convocatorias import construir_convocatoria
+
+
+FORMATOS_CSV = {"text/csv", "application/csv"}
+FORMATOS_NDJSON = {"application/x-ndjson", "application/ndjson", "application/jsonl", "application/x-jsonlines"}
+
+# (número de línea, fila o None, mensaje de error o None)
+FilaImportacion = Tuple[int, Dict | None, str | None]
+
+ERROR_CODIFICACION = "El contenido no está codificado en UTF-8"
+
+
+def _decodificar(lineas: Iterable[bytes]) -> Iterator[str]:
+    primera = True
+    for linea in lineas:
+        texto = linea.decode("utf-8-sig" if primera else "utf-8")
+        primera = False
+        yield texto
+
+
+def leer_filas(lineas: Iterable[bytes], mimetype: str) -> Iterator[FilaImportacion]:
+    """Yield rows one at a time from a line iterator without buffering the body.
+
+    Undecodable or malformed input is reported as a row error. In CSV it also
+    ends the import, since the rest of the stream cannot be split into rows reliably.
+    """
+    if mimetype in FORMATOS_CSV:
+        lector = csv.DictReader(_decodificar(lineas), strict=True)
+        try:
+            for fila in lector:
+                yield lector.line_num, {k.strip(): (v or "").strip() for k, v in fila.items() if k}, None
+        except UnicodeDecodeError:
+            yield lector.line_num + 1, None, ERROR_CODIFICACION
+        except csv.Error as exc:
+            yield lector.line_num + 1, None, f"CSV inválido: {exc}"
+        return
+
+    for numero, linea in enumerate(lineas, start=1):
+        try:
+            texto = linea.decode("utf-8-sig" if numero == 1 else "utf-8")
+        except UnicodeDecodeError:
+            yield numero, None, ERROR_CODIFICACION
+            continue
+        if not texto.strip():
+            continue
+        try:
+            fila = json.loads(texto)
+        except ValueError:
+            yield numero, None, "JSON inválido"
+            continue
+        if not isinstance(fila, dict):
+            yield numero, None, "Cada línea debe ser un objeto JSON"
+            continue
+        yield numero, fila, None
+
+
+def importar_convocatorias(
+    filas: Iterable[FilaImportacion],
+    creado_por_id: int,
+    now: datetime,
+    *,
+    tamano_lote: int = 500,
+    max_filas: int | None = None,
+) -> Tuple[List[Convocatoria], List[Dict]]:
+    """Validate rows incrementally and insert the valid ones in batches.
+
+    Uses the same rules as ``crear_convocatoria``. The caller commits.
+    """
+    creadas: List[Convocatoria] = []
+    errores: List[Dict] = []
+    lote: List[Convocatoria] = []
+    procesadas = 0
+
+    for linea, fila, error in filas:
+        procesadas += 1
+        if max_filas is not None and procesadas > max_filas:
+            errores.append({"linea": linea, "msg": f"Se superó el máximo de {max_filas} filas por importación"})
+            break
+        if error:
+            errores.append({"linea": linea, "msg": error})
+            continue
+        try:
+            convocatoria = construir_convocatoria(fila, creado_por_id, now)
+        except ValueError as exc:
+            errores.append({"linea": linea, "msg": str(exc)})
+            continue
+        lote.append(convocatoria)
+        if len(lote) >= tamano_lote:
+            db.session.add_all(lote)
+            db.session.flush()
+            creadas.extend(lote)
+            lote = []
+
+    if lote:
+        db.session.add_all(lote)
+        db.session.flush()
+        creadas.extend(lote)
+    return creadas, errores
+
+
+__all__ = [
+    "ERROR_CODIFICACION",
+    "FORMATOS_CSV",
+    "FORMATOS_NDJSON",
+    "importar_convocatorias",
+    "leer_filas",
+]
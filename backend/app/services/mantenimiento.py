@@ -0,0 +1,18 @@
+"""Periodic cleanup run by the scheduler leader."""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Dict, Optional
+
+from ..utils.time import utc_now_naive
+from .cargas import purgar_cargas
+from .idempotencia import purgar_respuestas_vencidas
+
+
+def ejecutar_mantenimiento(now: Optional[datetime] = None) -> Dict[str, int]:
+    """Run every cleanup task; returns how many items each one removed. Tasks commit themselves."""
+    now = now or utc_now_naive()
+    return {"cargas": purgar_cargas(now), "respuestas_idempotentes": purgar_respuestas_vencidas(now)}
+
+
+__all__ = ["ejecutar_mantenimiento"]
@@ -1,9 +1,9 @@
 """Notification domain services."""
 from __future__ import annotations
 
-from typing import List
+from typing import Dict, Iterable, List
 
-from sqlalchemy import desc
+from sqlalchemy import desc, insert
 
 from ..extensions import db
 from ..models import Notificacion, TipoNotificacion
@@ -49,6 +49,31 @@ def crear_notificacion(
     return notificacion
 
 
+def crear_notificaciones_lote(notificaciones: Iterable[Dict]) -> int:
+    """Insert many notifications with one executemany INSERT; returns how many.
+
+    Each item takes the keyword arguments of :func:`crear_notificacion`
+    (``usuario_id``, ``titulo``, ``mensaje``, ``tipo``, ``metadata``). The
+    rows are not loaded into the session. The caller commits.
+    """
+    now = utc_now_naive()
+    filas = [
+        {
+            "usuario_id": item["usuario_id"],
+            "titulo": item["titulo"],
+            "mensaje": item["mensaje"],
+            "tipo": _coerce_tipo(item.get("tipo")),
+            "leida": False,
+            "payload": item.get("metadata") or {},
+            "created_at": now,
+        }
+        for item in notificaciones
+    ]
+    if filas:
+        db.session.execute(insert(Notificacion), filas)
+    return len(filas)
+
+
 def listar_notificaciones(
     usuario_id: int,
     *,
@@ -91,6 +116,7 @@ def marcar_todas_leidas(usuario_id: int) -> int:
 
 __all__ = [
     "crear_notificacion",
+    "crear_notificaciones_lote",
     "listar_notificaciones",
     "marcar_notificacion_leida",
     "marcar_notificacion_leida_por_id",
@@ -0,0 +1,167 @@
+"""Loader options and sparse serialization for postulación listings."""
+from __future__ import annotations
+
+import heapq
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, func, inspect, or_, select
+from sqlalchemy.orm import defer, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+
+from ..extensions import db
+from ..models import Convocatoria, EstadoPostulacion, Postulacion, Usuario
+
+
+# Heavy JSON columns that listings only load when requested with ``include=``.
+CAMPOS_DETALLE = {
+    "formulario": Postulacion.datos_formulario,
+    "soportes": Postulacion.datos_soportes,
+}
+
+
+def leer_inclusiones(valor: Optional[str]) -> FrozenSet[str]:
+    """Parse ``include=formulario,soportes``; raises ``ValueError`` on unknown names."""
+    incluir = frozenset(parte.strip() for parte in (valor or "").split(",") if parte.strip())
+    desconocidos = incluir - CAMPOS_DETALLE.keys()
+    if desconocidos:
+        raise ValueError(f"include no soporta: {', '.join(sorted(desconocidos))}")
+    return incluir
+
+
+def opciones_listado(incluir: FrozenSet[str] = frozenset()) -> List:
+    """Defer the heavy columns that were not requested so they never leave the database."""
+    return [defer(columna) for nombre, columna in CAMPOS_DETALLE.items() if nombre not in incluir]
+
+
+# Related objects each read path serializes; loaded in one extra query per relationship.
+RELACIONES_RANKING = ("estudiante",)
+RELACIONES_SERIALIZACION = ("estudiante", "convocatoria", "creador")
+
+
+def opciones_relaciones(relaciones: Iterable[str]) -> List:
+    return [selectinload(getattr(Postulacion, nombre)) for nombre in relaciones]
+
+
+def precargar_relaciones(postulaciones: Iterable[Postulacion], relaciones: Iterable[str]) -> None:
+    """Batch-load many-to-one relationships of already loaded postulaciones.
+
+    Equivalent to ``selectinload`` for lists that did not come from a query
+    with loader options: one SELECT per relationship instead of one per row.
+    """
+    postulaciones = list(postulaciones)
+    mapper = inspect(Postulacion)
+    for nombre in relaciones:
+        relacion = mapper.relationships[nombre]
+        columna = next(iter(relacion.local_columns))
+        pendientes = [p for p in postulaciones if nombre in inspect(p).unloaded]
+        ids = {getattr(p, columna.key) for p in pendientes} - {None}
+        if not ids:
+            continue
+        destino = relacion.mapper.class_
+        por_id = {obj.id: obj for obj in db.session.scalars(select(destino).where(destino.id.in_(ids)))}
+        for postulacion in pendientes:
+            set_committed_value(postulacion, nombre, por_id.get(getattr(postulacion, columna.key)))
+
+
+def tablas_relacionadas(postulaciones: Iterable[Postulacion]) -> Dict[str, Dict[int, Dict]]:
+    """Related usuarios (students and creators) and convocatorias of a page, each serialized once.
+
+    One SELECT per table regardless of page size, so listings can ship ids on
+    every row and the related records once in a side table.
+    """
+    postulaciones = list(postulaciones)
+    usuario_ids = {p.estudiante_id for p in postulaciones} | {p.creada_por_id for p in postulaciones}
+    convocatoria_ids = {p.convocatoria_id for p in postulaciones}
+    tablas: Dict[str, Dict[int, Dict]] = {"usuarios": {}, "convocatorias": {}}
+    for nombre, modelo, ids in (("usuarios", Usuario, usuario_ids), ("convocatorias", Convocatoria, convocatoria_ids)):
+        ids -= {None}
+        if ids:
+            registros = db.session.scalars(select(modelo).where(modelo.id.in_(ids)))
+            tablas[nombre] = {registro.id: registro.to_dict() for registro in registros}
+    return tablas
+
+
+ESTADOS_RANKING = (EstadoPostulacion.ELIGIBLE, EstadoPostulacion.SELECTED)
+
+# Ranking order: puntaje descending with missing scores last, then oldest id first.
+ORDEN_RANKING = (Postulacion.puntaje.desc().nulls_last(), Postulacion.id.asc())
+
+
+def _clave_ranking(postulacion: Postulacion) -> Tuple[bool, float, int]:
+    return postulacion.puntaje is None, -(postulacion.puntaje or 0.0), postulacion.id
+
+
+def _despues_de(puntaje: Optional[float], postulacion_id: int):
+    """Rows that come after ``(puntaje, id)`` in :data:`ORDEN_RANKING`."""
+    if puntaje is None:
+        return and_(Postulacion.puntaje.is_(None), Postulacion.id > postulacion_id)
+    return or_(
+        Postulacion.puntaje < puntaje,
+        and_(Postulacion.puntaje == puntaje, Postulacion.id > postulacion_id),
+        Postulacion.puntaje.is_(None),
+    )
+
+
+def _antes_de(puntaje: Optional[float], postulacion_id: int):
+    """Rows that come before ``(puntaje, id)`` in :data:`ORDEN_RANKING`."""
+    if puntaje is None:
+        return or_(
+            Postulacion.puntaje.is_not(None),
+            and_(Postulacion.puntaje.is_(None), Postulacion.id < postulacion_id),
+        )
+    return or_(
+        Postulacion.puntaje > puntaje,
+        and_(Postulacion.puntaje == puntaje, Postulacion.id < postulacion_id),
+    )
+
+
+def pagina_ranking(
+    query,
+    estados: Sequence[EstadoPostulacion],
+    limite: Optional[int],
+    despues: Optional[Tuple[Optional[float], int]] = None,
+) -> Tuple[List[Postulacion], bool]:
+    """Return up to ``limite`` ranked postulaciones after the ``despues`` key, and whether more exist.
+
+    Each estado is read as its own ordered range of ``ix_postulacion_ranking``
+    and the streams are merged, so only ``limite + 1`` rows per estado are
+    fetched and nothing is sorted in full. ``limite=None`` returns the whole ranking.
+    """
+    flujos = []
+    for estado in estados:
+        consulta = query.filter(Postulacion.estado == estado)
+        if despues is not None:
+            consulta = consulta.filter(_despues_de(*despues))
+        consulta = consulta.order_by(*ORDEN_RANKING)
+        flujos.append((consulta if limite is None else consulta.limit(limite + 1)).all())
+    combinadas = list(heapq.merge(*flujos, key=_clave_ranking))
+    if limite is None:
+        return combinadas, False
+    return combinadas[:limite], len(combinadas) > limite
+
+
+def posicion_en_ranking(postulacion: Postulacion) -> Tuple[int, int]:
+    """``(posición, total)`` of ``postulacion`` in its convocatoria ranking using two index counts."""
+    base = select(func.count()).select_from(Postulacion).where(
+        Postulacion.convocatoria_id == postulacion.convocatoria_id,
+        Postulacion.estado.in_(ESTADOS_RANKING),
+    )
+    delante = db.session.scalar(base.where(_antes_de(postulacion.puntaje, postulacion.id)))
+    total = db.session.scalar(base)
+    return delante + 1, total
+
+
+__all__ = [
+    "CAMPOS_DETALLE",
+    "ESTADOS_RANKING",
+    "ORDEN_RANKING",
+    "RELACIONES_RANKING",
+    "RELACIONES_SERIALIZACION",
+    "leer_inclusiones",
+    "opciones_listado",
+    "opciones_relaciones",
+    "pagina_ranking",
+    "posicion_en_ranking",
+    "precargar_relaciones",
+    "tablas_relacionadas",
+]
@@ -0,0 +1,202 @@
+"""Background scheduler for convocatoria state transitions."""
+from __future__ import annotations
+
+import heapq
+import os
+import socket
+import threading
+import uuid
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from flask import Flask
+from sqlalchemy import or_, update
+from sqlalchemy.exc import IntegrityError
+
+from ..extensions import db
+from ..models import CandadoProgramador, Convocatoria
+from ..utils.time import utc_now_naive
+from .convocatorias import aplicar_transiciones_vencidas
+from .mantenimiento import ejecutar_mantenimiento
+
+
+NOMBRE_CANDADO = "transiciones_convocatorias"
+
+
+class ProgramadorTransiciones:
+    """Keeps a time-ordered heap of upcoming apertura/cierre transitions.
+
+    Only the worker holding the lease in ``CandadoProgramador`` applies
+    transitions; the heap is rebuilt from the database every
+    ``SCHEDULER_REFRESH_SECONDS`` so writes made by other workers are picked up.
+    The leader also runs :func:`ejecutar_mantenimiento` every
+    ``MANTENIMIENTO_INTERVALO_SECONDS``.
+    """
+
+    def __init__(self) -> None:
+        self._app: Flask | None = None
+        self._heap: List[Tuple[datetime, int]] = []
+        self._lock = threading.Lock()
+        self._detener = threading.Event()
+        self._hilo: threading.Thread | None = None
+        self._proximo_refresco: datetime | None = None
+        self._proximo_mantenimiento: datetime | None = None
+        self.propietario = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.intervalo_refresco = 60.0
+        self.duracion_candado = 30.0
+        self.intervalo_mantenimiento = 3600.0
+
+    def init_app(self, app: Flask) -> None:
+        self._app = app
+        self.intervalo_refresco = float(app.config.get("SCHEDULER_REFRESH_SECONDS", 60))
+        self.duracion_candado = float(app.config.get("SCHEDULER_LEASE_SECONDS", 30))
+        self.intervalo_mantenimiento = float(app.config.get("MANTENIMIENTO_INTERVALO_SECONDS", 3600))
+        app.extensions["programador_transiciones"] = self
+        if app.config.get("SCHEDULER_ENABLED") and not app.config.get("TESTING"):
+            self.iniciar()
+
+    # ------------------------------------------------------------------
+    # Heap maintenance
+    # ------------------------------------------------------------------
+    def programar(self, convocatoria: Convocatoria, now: datetime | None = None) -> None:
+        """Register the future transitions of a convocatoria written in this process."""
+        if convocatoria.archivada or convocatoria.id is None:
+            return
+        now = now or utc_now_naive()
+        with self._lock:
+            for momento in (convocatoria.fecha_apertura, convocatoria.fecha_cierre):
+                if momento and momento > now:
+                    heapq.heappush(self._heap, (momento, convocatoria.id))
+
+    def cargar_pendientes(self, now: datetime | None = None) -> int:
+        now = now or utc_now_naive()
+        filas = (
+            db.session.query(Convocatoria.id, Convocatoria.fecha_apertura, Convocatoria.fecha_cierre)
+            .filter(
+                Convocatoria.archivada.is_(False),
+                or_(Convocatoria.fecha_apertura > now, Convocatoria.fecha_cierre > now),
+            )
+            .all()
+        )
+        heap: List[Tuple[datetime, int]] = []
+        for conv_id, apertura, cierre in filas:
+            for momento in (apertura, cierre):
+                if momento and momento > now:
+                    heap.append((momento, conv_id))
+        heapq.heapify(heap)
+        with self._lock:
+            self._heap = heap
+        return len(heap)
+
+    def proxima_transicion(self) -> Optional[datetime]:
+        with self._lock:
+            return self._heap[0][0] if self._heap else None
+
+    def _extraer_vencidas(self, now: datetime) -> int:
+        vencidas = 0
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                heapq.heappop(self._heap)
+                vencidas += 1
+        return vencidas
+
+    # ------------------------------------------------------------------
+    # Leader election
+    # ------------------------------------------------------------------
+    def adquirir_liderazgo(self, now: datetime | None = None) -> bool:
+        now = now or utc_now_naive()
+        expira_en = now + timedelta(seconds=self.duracion_candado)
+        resultado = db.session.execute(
+            update(CandadoProgramador)
+            .where(
+                CandadoProgramador.nombre == NOMBRE_CANDADO,
+                or_(
+                    CandadoProgramador.propietario == self.propietario,
+                    CandadoProgramador.expira_en < now,
+                ),
+            )
+            .values(propietario=self.propietario, expira_en=expira_en)
+            .execution_options(synchronize_session=False)
+        )
+        if resultado.rowcount:
+            db.session.commit()
+            return True
+        try:
+            db.session.add(
+                CandadoProgramador(nombre=NOMBRE_CANDADO, propietario=self.propietario, expira_en=expira_en)
+            )
+            db.session.commit()
+            return True
+        except IntegrityError:
+            db.session.rollback()
+            return False
+
+    # ------------------------------------------------------------------
+    # Execution
+    # ------------------------------------------------------------------
+    def ejecutar_ciclo(self, now: datetime | None = None) -> float:
+        """Apply due transitions if this worker is the leader.
+
+        Returns the number of seconds to wait before the next cycle.
+        """
+        now = now or utc_now_naive()
+        if not self.adquirir_liderazgo(now):
+            self._proximo_refresco = None
+            return self.duracion_candado / 2
+
+        if self._proximo_refresco is None or self._proximo_refresco <= now:
+            aplicar = True
+            self.cargar_pendientes(now)
+            self._proximo_refresco = now + timedelta(seconds=self.intervalo_refresco)
+        else:
+            aplicar = self._extraer_vencidas(now) > 0
+
+        if aplicar and aplicar_transiciones_vencidas(now):
+            db.session.commit()
+
+        if self._proximo_mantenimiento is None or self._proximo_mantenimiento <= now:
+            self._proximo_mantenimiento = now + timedelta(seconds=self.intervalo_mantenimiento)
+            ejecutar_mantenimiento(now)
+
+        siguiente = self._proximo_refresco
+        proxima = self.proxima_transicion()
+        if proxima and proxima < siguiente:
+            siguiente = proxima
+        espera = (siguiente - now).total_seconds()
+        return max(0.5, min(espera, self.duracion_candado / 2))
+
+    def _bucle(self) -> None:
+        assert self._app is not None
+        espera = 0.0
+        while not self._detener.wait(espera):
+            with self._app.app_context():
+                try:
+                    espera = self.ejecutar_ciclo()
+                except Exception:  # pragma: no cover - logging path
+                    self._app.logger.exception("Error aplicando transiciones programadas")
+                    db.session.rollback()
+                    espera = self.duracion_candado / 2
+                finally:
+                    db.session.remove()
+
+    def iniciar(self) -> None:
+        if self._hilo and self._hilo.is_alive():
+            return
+        self._detener.clear()
+        self._hilo = threading.Thread(target=self._bucle, name="programador-transiciones", daemon=True)
+        self._hilo.start()
+
+    def detener(self) -> None:
+        self._detener.set()
+        if self._hilo:
+            self._hilo.join(timeout=5)
+            self._hilo = None
+
+
+programador = ProgramadorTransiciones()
+
+
+__all__ = [
+    "ProgramadorTransiciones",
+    "programador",
+]
@@ -0,0 +1,358 @@
+"""Vectorized batch scoring for SeleccionIA.
+
+Mirrors :meth:`SeleccionIA.calcular_puntaje_estudiante` and
+:meth:`SeleccionIA.razones_descarte` over NumPy arrays. Every operation is
+applied in the same order as the scalar path so results are bit-identical.
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import TYPE_CHECKING, Dict, List, NamedTuple, Sequence, Tuple
+
+import numpy as np
+from flask import current_app
+from sqlalchemy import delete, func, insert, or_, select, update
+
+from ..extensions import db
+from ..models import (
+    ConfiguracionIA,
+    Convocatoria,
+    EstadoPostulacion,
+    EvaluacionAspirante,
+    Postulacion,
+    Usuario,
+)
+from ..utils.time import utc_now_naive
+from .descartes import registrar_descartes
+
+
+# (column, scale, weight attribute, detail key) in the order the scalar path adds them.
+COMPONENTES = (
+    ("semestre", 10.0, "peso_semestre", "puntaje_semestre"),
+    ("promedio", 5.0, "peso_promedio", "puntaje_promedio"),
+    ("horas", 20.0, "peso_horas", "puntaje_horas"),
+)
+
+TAMANO_LOTE_ESCRITURA = 500
+
+# States the weights still decide; SELECTED/REJECTED/ARCHIVED are final and never re-scored.
+# PENDING rows belong to the evaluation job, which also checks requisitos, logs descartes and
+# notifies the student; re-scoring them first would make that job skip them.
+ESTADOS_RECALCULABLES = (EstadoPostulacion.ELIGIBLE, EstadoPostulacion.INELIGIBLE)
+
+if TYPE_CHECKING:  # pragma: no cover
+    from ..models import Trabajo
+
+
+class Caracteristicas(NamedTuple):
+    """Scoring inputs for N postulaciones; missing values are NaN."""
+
+    postulacion_ids: np.ndarray
+    estudiante_ids: np.ndarray
+    convocatoria_ids: np.ndarray
+    semestre: np.ndarray
+    promedio: np.ndarray
+    horas: np.ndarray
+    min_semestre_req: np.ndarray
+    min_promedio_req: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.postulacion_ids)
+
+    def filtrar(self, mascara: np.ndarray) -> "Caracteristicas":
+        return Caracteristicas(*(columna[mascara] for columna in self))
+
+
+class ResultadoLote(NamedTuple):
+    puntaje: np.ndarray
+    componentes: Dict[str, np.ndarray]
+    bajo_semestre: np.ndarray
+    bajo_promedio: np.ndarray
+
+    @property
+    def elegible(self) -> np.ndarray:
+        return ~(self.bajo_semestre | self.bajo_promedio)
+
+
+def _parsear_semestres(valores: Sequence) -> np.ndarray:
+    """``int(str(semestre))`` per distinct value, NaN when it does not parse."""
+    convertidos: Dict[object, float] = {}
+    for valor in set(valores):
+        try:
+            convertidos[valor] = float(int(str(valor))) if valor is not None else np.nan
+        except (TypeError, ValueError):
+            convertidos[valor] = np.nan
+    return np.fromiter((convertidos[valor] for valor in valores), dtype=np.float64, count=len(valores))
+
+
+def construir_caracteristicas(filas: Sequence[Tuple]) -> Caracteristicas:
+    """Build arrays from ``(postulacion_id, estudiante_id, convocatoria_id, semestre, promedio, horas,
+    min_semestre_req, min_promedio_req)`` rows."""
+    columnas = tuple(zip(*filas)) if filas else ((),) * 8
+    postulaciones, estudiantes, convocatorias, semestres, promedios, horas, semestres_req, promedios_req = columnas
+    return Caracteristicas(
+        postulacion_ids=np.asarray(postulaciones, dtype=np.int64),
+        estudiante_ids=np.asarray(estudiantes, dtype=np.int64),
+        convocatoria_ids=np.asarray(convocatorias, dtype=np.int64),
+        semestre=_parsear_semestres(semestres),
+        promedio=np.asarray(promedios, dtype=np.float64),
+        horas=np.asarray(horas, dtype=np.float64),
+        min_semestre_req=np.asarray(semestres_req, dtype=np.float64),
+        min_promedio_req=np.asarray(promedios_req, dtype=np.float64),
+    )
+
+
+def cargar_caracteristicas(*condiciones) -> Caracteristicas:
+    """Fetch the scoring inputs of every postulación matching ``condiciones`` in one query."""
+    filas = db.session.execute(
+        select(
+            Postulacion.id,
+            Usuario.id,
+            Postulacion.convocatoria_id,
+            Usuario.semestre,
+            Usuario.promedio,
+            Usuario.horas_disponibles,
+            Convocatoria.min_semestre_req,
+            Convocatoria.min_promedio_req,
+        )
+        .join(Usuario, Postulacion.estudiante_id == Usuario.id)
+        .join(Convocatoria, Postulacion.convocatoria_id == Convocatoria.id)
+        .where(*condiciones)
+        .order_by(Postulacion.id)
+    ).all()
+    return construir_caracteristicas(filas)
+
+
+def puntuar(caracteristicas: Caracteristicas, configuracion: ConfiguracionIA) -> ResultadoLote:
+    """Clamp-and-weight formula and minimum thresholds as array operations."""
+    puntaje = np.zeros(len(caracteristicas), dtype=np.float64)
+    componentes: Dict[str, np.ndarray] = {}
+    for columna, escala, peso, clave in COMPONENTES:
+        valores = getattr(caracteristicas, columna)
+        componente = np.clip(valores / escala, 0, 1) * getattr(configuracion, peso) * 100
+        componentes[clave] = componente
+        puntaje = puntaje + np.where(np.isnan(componente), 0.0, componente)
+
+    semestre = np.nan_to_num(caracteristicas.semestre, nan=0.0)
+    promedio = np.nan_to_num(caracteristicas.promedio, nan=0.0)
+    return ResultadoLote(
+        puntaje=puntaje,
+        componentes=componentes,
+        bajo_semestre=semestre < configuracion.min_semestre,
+        bajo_promedio=promedio < configuracion.min_promedio,
+    )
+
+
+def cumple_convocatoria(caracteristicas: Caracteristicas) -> np.ndarray:
+    """Array form of ``razones_umbrales``: the convocatoria's own minimums (NaN means no minimum)."""
+    semestre = np.nan_to_num(caracteristicas.semestre, nan=0.0)
+    promedio = np.nan_to_num(caracteristicas.promedio, nan=0.0)
+    # Comparisons against NaN are False, so a missing minimum never fails.
+    return ~((semestre < caracteristicas.min_semestre_req) | (promedio < caracteristicas.min_promedio_req))
+
+
+def detalles_fila(resultado: ResultadoLote, indice: int) -> Dict[str, float]:
+    detalles: Dict[str, float] = {}
+    for _, _, _, clave in COMPONENTES:
+        valor = resultado.componentes[clave][indice]
+        if not np.isnan(valor):
+            detalles[clave] = float(valor)
+    detalles["puntaje_total"] = float(resultado.puntaje[indice])
+    return detalles
+
+
+def razones_fila(
+    caracteristicas: Caracteristicas, resultado: ResultadoLote, configuracion: ConfiguracionIA, indice: int
+) -> List[str]:
+    razones: List[str] = []
+    if resultado.bajo_semestre[indice]:
+        semestre = caracteristicas.semestre[indice]
+        semestre_val = 0 if np.isnan(semestre) else int(semestre)
+        razones.append(f"Semestre mínimo requerido: {configuracion.min_semestre}, estudiante: {semestre_val}")
+    if resultado.bajo_promedio[indice]:
+        promedio = caracteristicas.promedio[indice]
+        # ``promedio or 0.0`` in the scalar path also maps -0.0 to 0.0.
+        promedio_val = 0.0 if np.isnan(promedio) or promedio == 0 else float(promedio)
+        razones.append(f"Promedio mínimo requerido: {configuracion.min_promedio}, estudiante: {promedio_val}")
+    return razones
+
+
+def _en_lotes(valores: Sequence, tamano: int = TAMANO_LOTE_ESCRITURA):
+    for inicio in range(0, len(valores), tamano):
+        yield valores[inicio : inicio + tamano]
+
+
+def guardar_resultados(
+    caracteristicas: Caracteristicas, resultado: ResultadoLote, configuracion: ConfiguracionIA
+) -> List[Dict]:
+    """Bulk-write estado/puntaje and upsert EvaluacionAspirante rows; returns the descartes.
+
+    Ineligible rows lose their puntaje and evaluation, as on the scalar path.
+    Uses ORM bulk UPDATE/INSERT by primary key, so objects already in the
+    session are not refreshed. The caller commits.
+    """
+    elegible = resultado.elegible
+    ids = caracteristicas.postulacion_ids.tolist()
+    puntajes = resultado.puntaje.tolist()
+
+    cambios: List[Dict] = []
+    descartados: List[Dict] = []
+    evaluaciones: Dict[int, Dict] = {}
+    for indice, postulacion_id in enumerate(ids):
+        if elegible[indice]:
+            cambios.append(
+                {
+                    "id": postulacion_id,
+                    "estado": EstadoPostulacion.ELIGIBLE,
+                    "puntaje": puntajes[indice],
+                    "resultado": "pre-seleccionado",
+                    "config_version": configuracion.version,
+                }
+            )
+            evaluaciones[postulacion_id] = {
+                "puntaje": puntajes[indice],
+                "resultado": "pre-seleccionado",
+                "detalles": detalles_fila(resultado, indice),
+            }
+        else:
+            razones = razones_fila(caracteristicas, resultado, configuracion, indice)
+            cambios.append(
+                {
+                    "id": postulacion_id,
+                    "estado": EstadoPostulacion.INELIGIBLE,
+                    "puntaje": None,
+                    "resultado": None,
+                    "razones_rechazo": "; ".join(razones),
+                    "config_version": configuracion.version,
+                }
+            )
+            descartados.append(
+                {
+                    "postulacion_id": postulacion_id,
+                    "estudiante_id": int(caracteristicas.estudiante_ids[indice]),
+                    "convocatoria_id": int(caracteristicas.convocatoria_ids[indice]),
+                    "razones": razones,
+                }
+            )
+
+    for lote in _en_lotes(cambios):
+        db.session.execute(update(Postulacion), lote)
+    for lote in _en_lotes([descarte["postulacion_id"] for descarte in descartados]):
+        db.session.execute(delete(EvaluacionAspirante).where(EvaluacionAspirante.postulacion_id.in_(lote)))
+
+    existentes: Dict[int, int] = {}
+    for lote in _en_lotes(list(evaluaciones)):
+        existentes.update(
+            db.session.execute(
+                select(EvaluacionAspirante.postulacion_id, EvaluacionAspirante.id).where(
+                    EvaluacionAspirante.postulacion_id.in_(lote)
+                )
+            ).all()
+        )
+    now = utc_now_naive()
+    actualizar = [{"id": existentes[pid], **datos} for pid, datos in evaluaciones.items() if pid in existentes]
+    crear = [
+        {"postulacion_id": pid, "created_at": now, "updated_at": now, **datos}
+        for pid, datos in evaluaciones.items()
+        if pid not in existentes
+    ]
+    for lote in _en_lotes(actualizar):
+        db.session.execute(update(EvaluacionAspirante), lote)
+    for lote in _en_lotes(crear):
+        db.session.execute(insert(EvaluacionAspirante), lote)
+    return descartados
+
+
+def evaluar_en_lote(configuracion: ConfiguracionIA, *condiciones) -> Tuple[Caracteristicas, ResultadoLote, List[Dict]]:
+    """Load, score and persist every postulación matching ``condiciones``. The caller commits."""
+    caracteristicas = cargar_caracteristicas(*condiciones)
+    resultado = puntuar(caracteristicas, configuracion)
+    descartados = guardar_resultados(caracteristicas, resultado, configuracion)
+    return caracteristicas, resultado, descartados
+
+
+def condicion_desactualizada(version: int):
+    """Non-final, non-preassigned postulaciones last scored with a configuration older than ``version``."""
+    return (
+        Postulacion.estado.in_(ESTADOS_RECALCULABLES),
+        Postulacion.preasignada.is_(False),
+        or_(Postulacion.config_version.is_(None), Postulacion.config_version < version),
+    )
+
+
+def recalcular_puntajes(trabajo: "Trabajo") -> None:
+    """Re-score stale postulaciones in id-ordered chunks, committing after each one.
+
+    Rows that fail the convocatoria's own minimums do not depend on the
+    weights; they are only stamped with the new version. ELIGIBLE rows the
+    new configuration rejects are logged as descartes. The job stops early
+    when the configuration moves past ``trabajo.parametros["version"]``
+    because the job queued for the newer version covers the same rows.
+    """
+    version = int((trabajo.parametros or {})["version"])
+    tamano_lote = current_app.config["RECALCULO_TAMANO_LOTE"]
+    condiciones = condicion_desactualizada(version)
+    trabajo.total = db.session.scalar(select(func.count()).select_from(Postulacion).where(*condiciones))
+    trabajo.procesados = 0
+    db.session.commit()
+
+    ultimo_id = 0
+    while True:
+        configuracion = db.session.scalars(select(ConfiguracionIA).order_by(ConfiguracionIA.id)).first()
+        if configuracion.version != version:
+            trabajo.parametros = {**trabajo.parametros, "reemplazado_por": configuracion.version}
+            db.session.commit()
+            return
+        ids = db.session.scalars(
+            select(Postulacion.id)
+            .where(Postulacion.id > ultimo_id, *condiciones)
+            .order_by(Postulacion.id)
+            .limit(tamano_lote)
+        ).all()
+        if not ids:
+            return
+        ultimo_id = ids[-1]
+
+        caracteristicas = cargar_caracteristicas(Postulacion.id.in_(ids))
+        cumple = cumple_convocatoria(caracteristicas)
+        candidatas = caracteristicas.filtrar(cumple)
+        elegibles_antes = set(
+            db.session.scalars(
+                select(Postulacion.id).where(
+                    Postulacion.id.in_(candidatas.postulacion_ids.tolist()),
+                    Postulacion.estado == EstadoPostulacion.ELIGIBLE,
+                )
+            )
+        )
+        descartados = guardar_resultados(candidatas, puntuar(candidatas, configuracion), configuracion)
+        # Rows that were already INELIGIBLE were logged when they were first rejected.
+        por_convocatoria: Dict[int, List[Dict]] = defaultdict(list)
+        for descarte in descartados:
+            if descarte["postulacion_id"] in elegibles_antes:
+                por_convocatoria[descarte["convocatoria_id"]].append(descarte)
+        for convocatoria_id, nuevos in por_convocatoria.items():
+            registrar_descartes(convocatoria_id, nuevos)
+        sin_cambios = caracteristicas.postulacion_ids[~cumple].tolist()
+        if sin_cambios:
+            db.session.execute(
+                update(Postulacion).where(Postulacion.id.in_(sin_cambios)).values(config_version=version)
+            )
+        trabajo.procesados += len(ids)
+        db.session.commit()
+
+
+__all__ = [
+    "Caracteristicas",
+    "ESTADOS_RECALCULABLES",
+    "ResultadoLote",
+    "cargar_caracteristicas",
+    "condicion_desactualizada",
+    "construir_caracteristicas",
+    "cumple_convocatoria",
+    "detalles_fila",
+    "evaluar_en_lote",
+    "guardar_resultados",
+    "puntuar",
+    "razones_fila",
+    "recalcular_puntajes",
+]
@@ -0,0 +1,159 @@
+"""Read-only what-if scoring of candidate ConfiguracionIA values."""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+from sqlalchemy import select
+
+from ..extensions import db
+from ..models import ConfiguracionIA, Convocatoria, EstadoConvocatoria, EstadoPostulacion, Postulacion, Usuario
+from ..utils.time import utc_now_naive
+from .puntuacion import ESTADOS_RECALCULABLES, Caracteristicas, cargar_caracteristicas, cumple_convocatoria, puntuar
+
+
+CAMPOS_CONFIGURACION = ("min_semestre", "min_promedio", "peso_semestre", "peso_promedio", "peso_horas")
+TOP_K_DEFECTO = 10
+TOP_K_MAXIMO = 100
+
+
+def leer_valores_configuracion(data: Dict) -> Dict[str, float]:
+    """Validated ConfiguracionIA values present in ``data``; raises ``ValueError`` on bad input."""
+    valores: Dict[str, float] = {}
+    for campo in CAMPOS_CONFIGURACION:
+        if campo in data and data[campo] is not None:
+            try:
+                valor = float(data[campo])
+            except (ValueError, TypeError):
+                raise ValueError(f"Valor inválido para {campo}") from None
+            valores[campo] = int(valor) if campo == "min_semestre" else valor
+    return valores
+
+
+def configuracion_candidata(actual: ConfiguracionIA, valores: Dict[str, float]) -> ConfiguracionIA:
+    """Transient copy of ``actual`` with ``valores`` applied; never added to the session."""
+    candidata = ConfiguracionIA(**{campo: getattr(actual, campo) for campo in CAMPOS_CONFIGURACION})
+    for campo, valor in valores.items():
+        setattr(candidata, campo, valor)
+    return candidata
+
+
+def cargar_instantanea(
+    convocatoria_ids: Optional[Iterable[int]] = None, now: Optional[datetime] = None
+) -> Caracteristicas:
+    """Features of every postulación the weights still decide in the active convocatorias."""
+    now = now or utc_now_naive()
+    activas = select(Convocatoria.id).where(Convocatoria.condicion_estado(EstadoConvocatoria.ACTIVE, now))
+    if convocatoria_ids is not None:
+        activas = activas.where(Convocatoria.id.in_(list(convocatoria_ids)))
+    return cargar_caracteristicas(
+        Postulacion.convocatoria_id.in_(activas),
+        # Pending postulaciones are scored with the live weights as soon as they are evaluated.
+        Postulacion.estado.in_((EstadoPostulacion.PENDING, *ESTADOS_RECALCULABLES)),
+        Postulacion.preasignada.is_(False),
+    )
+
+
+def _posiciones(caracteristicas: Caracteristicas, puntaje: np.ndarray, elegible: np.ndarray) -> np.ndarray:
+    """1-based position of each eligible row inside its convocatoria ranking; 0 for ineligible rows.
+
+    Same order as the ranking endpoint: puntaje descending, then oldest id.
+    """
+    posiciones = np.zeros(len(caracteristicas), dtype=np.int64)
+    filas = np.flatnonzero(elegible)
+    if not len(filas):
+        return posiciones
+    orden = filas[
+        np.lexsort(
+            (caracteristicas.postulacion_ids[filas], -puntaje[filas], caracteristicas.convocatoria_ids[filas])
+        )
+    ]
+    convocatorias = caracteristicas.convocatoria_ids[orden]
+    inicio_grupo = np.r_[0, np.flatnonzero(np.diff(convocatorias)) + 1]
+    tamanos = np.diff(np.r_[inicio_grupo, len(orden)])
+    posiciones[orden] = np.arange(len(orden)) - np.repeat(inicio_grupo, tamanos) + 1
+    return posiciones
+
+
+def simular(
+    actual: ConfiguracionIA,
+    candidata: ConfiguracionIA,
+    caracteristicas: Caracteristicas,
+    top_k: int = TOP_K_DEFECTO,
+) -> List[Dict]:
+    """Compare ``candidata`` against ``actual`` for every convocatoria in ``caracteristicas``."""
+    cumple = cumple_convocatoria(caracteristicas)
+    resultado_actual = puntuar(caracteristicas, actual)
+    resultado_nuevo = puntuar(caracteristicas, candidata)
+    elegible_actual = cumple & resultado_actual.elegible
+    elegible_nuevo = cumple & resultado_nuevo.elegible
+    posicion_actual = _posiciones(caracteristicas, resultado_actual.puntaje, elegible_actual)
+    posicion_nueva = _posiciones(caracteristicas, resultado_nuevo.puntaje, elegible_nuevo)
+
+    # Rows grouped by convocatoria once, so each group below is a slice instead of a full-array mask.
+    orden = np.argsort(caracteristicas.convocatoria_ids, kind="stable")
+    convocatorias, inicios = np.unique(caracteristicas.convocatoria_ids[orden], return_index=True)
+    limites = np.r_[inicios[1:], len(orden)]
+
+    filas_top: Dict[int, np.ndarray] = {}
+    resumen: List[Dict] = []
+    for convocatoria_id, inicio, fin in zip(convocatorias.tolist(), inicios.tolist(), limites.tolist()):
+        grupo = orden[inicio:fin]
+        antes, despues = elegible_actual[grupo], elegible_nuevo[grupo]
+        ambos = antes & despues
+        cambio = np.abs(posicion_nueva[grupo][ambos] - posicion_actual[grupo][ambos])
+        top_actual = antes & (posicion_actual[grupo] <= top_k)
+        top_nuevo = despues & (posicion_nueva[grupo] <= top_k)
+        filas = grupo[top_nuevo]
+        filas_top[convocatoria_id] = filas[np.argsort(posicion_nueva[filas])]
+        resumen.append(
+            {
+                "convocatoria_id": convocatoria_id,
+                "postulaciones": len(grupo),
+                "elegibles_actual": int(antes.sum()),
+                "elegibles_simulado": int(despues.sum()),
+                "nuevos_ineligibles": int((antes & ~despues).sum()),
+                "nuevos_elegibles": int((~antes & despues).sum()),
+                "cambios_posicion": {
+                    "comparables": int(ambos.sum()),
+                    "movidos": int((cambio > 0).sum()),
+                    "promedio_absoluto": float(cambio.mean()) if len(cambio) else 0.0,
+                    "maximo": int(cambio.max()) if len(cambio) else 0,
+                    "entran_top": int((top_nuevo & ~top_actual).sum()),
+                    "salen_top": int((top_actual & ~top_nuevo).sum()),
+                },
+            }
+        )
+
+    estudiante_ids = {
+        int(caracteristicas.estudiante_ids[fila]) for filas in filas_top.values() for fila in filas
+    }
+    nombres: Dict[int, str] = {}
+    if estudiante_ids:
+        consulta = select(Usuario.id, Usuario.nombre).where(Usuario.id.in_(estudiante_ids))
+        nombres = dict(db.session.execute(consulta).all())
+    for item in resumen:
+        item["top"] = [
+            {
+                "postulacion_id": int(caracteristicas.postulacion_ids[fila]),
+                "estudiante_id": int(caracteristicas.estudiante_ids[fila]),
+                "estudiante": nombres.get(int(caracteristicas.estudiante_ids[fila])),
+                "puntaje": float(resultado_nuevo.puntaje[fila]),
+                "posicion": int(posicion_nueva[fila]),
+                "posicion_actual": int(posicion_actual[fila]) or None,
+            }
+            for fila in filas_top[item["convocatoria_id"]]
+        ]
+    return resumen
+
+
+__all__ = [
+    "CAMPOS_CONFIGURACION",
+    "TOP_K_DEFECTO",
+    "TOP_K_MAXIMO",
+    "cargar_instantanea",
+    "configuracion_candidata",
+    "leer_valores_configuracion",
+    "simular",
+]
@@ -0,0 +1,257 @@
+"""Database-backed background job queue."""
+from __future__ import annotations
+
+import os
+import socket
+import threading
+import uuid
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from flask import Flask
+from sqlalchemy import or_, select, update
+
+from ..extensions import db
+from ..models import EstadoTrabajo, Trabajo
+from ..utils.time import utc_now_naive
+from .evaluacion import evaluacion_fallida, procesar_postulacion
+from .puntuacion import recalcular_puntajes
+
+
+TRABAJO_RECALCULAR_PUNTAJES = "recalcular_puntajes"
+TRABAJO_EVALUAR_POSTULACION = "evaluar_postulacion"
+
+Manejador = Callable[[Trabajo], None]
+
+
+class ColaTrabajos:
+    """Runs ``Trabajo`` rows in a pool of daemon threads, oldest first.
+
+    Jobs are claimed with a conditional UPDATE, so several threads and
+    processes can poll the same table without running a job twice. Handlers
+    receive the claimed ``Trabajo`` and may commit as they go to report
+    progress. A failed job goes back to PENDING with exponential backoff
+    until it has used ``max_intentos`` attempts; handlers must therefore be
+    safe to re-run. A RUNNING job whose ``started_at`` is older than
+    ``WORKER_LEASE_SECONDS`` belongs to a dead process and is requeued the
+    same way. When the attempts run out, the failure handler registered for
+    the job type runs in the transaction that marks the job FAILED.
+    """
+
+    def __init__(self) -> None:
+        self._app: Flask | None = None
+        self._manejadores: Dict[str, Manejador] = {}
+        self._al_fallar: Dict[str, Manejador] = {}
+        self._detener = threading.Event()
+        self._despertar = threading.Event()
+        self._hilos: List[threading.Thread] = []
+        self.propietario = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.intervalo_sondeo = 5.0
+        self.hilos = 1
+        self.max_intentos = 1
+        self.espera_reintento = 10.0
+        self.duracion_concesion = 900.0
+
+    def init_app(self, app: Flask) -> None:
+        self._app = app
+        self.intervalo_sondeo = float(app.config.get("WORKER_POLL_SECONDS", 5))
+        self.hilos = max(1, int(app.config.get("WORKER_THREADS", 1)))
+        self.max_intentos = max(1, int(app.config.get("WORKER_MAX_ATTEMPTS", 1)))
+        self.espera_reintento = float(app.config.get("WORKER_RETRY_SECONDS", 10))
+        self.duracion_concesion = float(app.config.get("WORKER_LEASE_SECONDS", 900))
+        app.extensions["cola_trabajos"] = self
+        if app.config.get("WORKER_ENABLED") and not app.config.get("TESTING"):
+            self.iniciar()
+
+    def registrar(self, tipo: str, manejador: Manejador, al_fallar: Optional[Manejador] = None) -> None:
+        self._manejadores[tipo] = manejador
+        if al_fallar is not None:
+            self._al_fallar[tipo] = al_fallar
+
+    # ------------------------------------------------------------------
+    # Queue
+    # ------------------------------------------------------------------
+    def encolar(
+        self,
+        tipo: str,
+        parametros: Optional[Dict] = None,
+        creado_por_id: Optional[int] = None,
+        max_intentos: Optional[int] = None,
+    ) -> Trabajo:
+        """Add a pending job. The caller commits and then calls :meth:`notificar`."""
+        if tipo not in self._manejadores:
+            raise ValueError(f"Tipo de trabajo desconocido: {tipo}")
+        trabajo = Trabajo(
+            tipo=tipo,
+            parametros=parametros or {},
+            creado_por_id=creado_por_id,
+            max_intentos=max_intentos or self.max_intentos,
+        )
+        db.session.add(trabajo)
+        db.session.flush()
+        return trabajo
+
+    def notificar(self) -> None:
+        """Wake the worker so a freshly committed job starts without waiting for the next poll."""
+        self._despertar.set()
+
+    def reclamar(self) -> Optional[Trabajo]:
+        while True:
+            now = utc_now_naive()
+            trabajo_id = db.session.scalar(
+                select(Trabajo.id)
+                .where(
+                    Trabajo.estado == EstadoTrabajo.PENDING,
+                    or_(Trabajo.disponible_en.is_(None), Trabajo.disponible_en <= now),
+                )
+                .order_by(Trabajo.id)
+                .limit(1)
+            )
+            if trabajo_id is None:
+                return None
+            resultado = db.session.execute(
+                update(Trabajo)
+                .where(Trabajo.id == trabajo_id, Trabajo.estado == EstadoTrabajo.PENDING)
+                .values(
+                    estado=EstadoTrabajo.RUNNING,
+                    propietario=self.propietario,
+                    started_at=now,
+                    intentos=Trabajo.intentos + 1,
+                )
+                .execution_options(synchronize_session=False)
+            )
+            db.session.commit()
+            if resultado.rowcount:
+                return db.session.get(Trabajo, trabajo_id, populate_existing=True)
+
+    def _reintentar(self, trabajo: Trabajo, now: datetime) -> None:
+        trabajo.estado = EstadoTrabajo.PENDING
+        trabajo.propietario = None
+        espera = self.espera_reintento * 2 ** (max(trabajo.intentos, 1) - 1)
+        trabajo.disponible_en = now + timedelta(seconds=espera)
+
+    def _fallar(self, trabajo: Trabajo, now: datetime) -> None:
+        trabajo.estado = EstadoTrabajo.FAILED
+        trabajo.finished_at = now
+        al_fallar = self._al_fallar.get(trabajo.tipo)
+        if al_fallar is None:
+            return
+        try:
+            with db.session.begin_nested():
+                al_fallar(trabajo)
+        except Exception:
+            # The job is still recorded as FAILED; the handler's own error only goes to the log.
+            if self._app is not None:
+                self._app.logger.exception("Error notificando el fallo del trabajo %s", trabajo.id)
+
+    def ejecutar(self, trabajo: Trabajo) -> None:
+        trabajo_id = trabajo.id
+        try:
+            self._manejadores[trabajo.tipo](trabajo)
+        except Exception as exc:
+            db.session.rollback()
+            if self._app is not None:
+                self._app.logger.exception("Error ejecutando el trabajo %s", trabajo_id)
+            trabajo = db.session.get(Trabajo, trabajo_id, populate_existing=True)
+            trabajo.error = str(exc) or exc.__class__.__name__
+            if trabajo.intentos < (trabajo.max_intentos or 1):
+                self._reintentar(trabajo, utc_now_naive())
+            else:
+                self._fallar(trabajo, utc_now_naive())
+        else:
+            trabajo.estado = EstadoTrabajo.DONE
+            trabajo.finished_at = utc_now_naive()
+        db.session.commit()
+
+    def recuperar_abandonados(self, now: Optional[datetime] = None) -> int:
+        """Requeue (or fail, if out of attempts) RUNNING jobs whose lease expired; returns how many."""
+        now = now or utc_now_naive()
+        vencimiento = now - timedelta(seconds=self.duracion_concesion)
+        ids = db.session.scalars(
+            select(Trabajo.id).where(Trabajo.estado == EstadoTrabajo.RUNNING, Trabajo.started_at < vencimiento)
+        ).all()
+        recuperados = 0
+        for trabajo_id in ids:
+            # Another worker may recover the same row; only the one whose UPDATE matches proceeds.
+            tomado = db.session.execute(
+                update(Trabajo)
+                .where(
+                    Trabajo.id == trabajo_id,
+                    Trabajo.estado == EstadoTrabajo.RUNNING,
+                    Trabajo.started_at < vencimiento,
+                )
+                .values(started_at=now, propietario=self.propietario)
+                .execution_options(synchronize_session=False)
+            )
+            if not tomado.rowcount:
+                db.session.rollback()
+                continue
+            trabajo = db.session.get(Trabajo, trabajo_id, populate_existing=True)
+            trabajo.error = "El proceso que ejecutaba el trabajo dejó de responder"
+            if trabajo.intentos < (trabajo.max_intentos or 1):
+                self._reintentar(trabajo, now)
+            else:
+                self._fallar(trabajo, now)
+            db.session.commit()
+            recuperados += 1
+        return recuperados
+
+    def ejecutar_pendientes(self, limite: Optional[int] = None) -> int:
+        """Run pending jobs in the calling thread; returns how many ran."""
+        self.recuperar_abandonados()
+        ejecutados = 0
+        while limite is None or ejecutados < limite:
+            trabajo = self.reclamar()
+            if trabajo is None:
+                break
+            self.ejecutar(trabajo)
+            ejecutados += 1
+        return ejecutados
+
+    # ------------------------------------------------------------------
+    # Worker thread
+    # ------------------------------------------------------------------
+    def _bucle(self) -> None:
+        assert self._app is not None
+        while not self._detener.is_set():
+            with self._app.app_context():
+                try:
+                    self.ejecutar_pendientes()
+                except Exception:  # pragma: no cover - logging path
+                    self._app.logger.exception("Error procesando la cola de trabajos")
+                    db.session.rollback()
+                finally:
+                    db.session.remove()
+            self._despertar.wait(self.intervalo_sondeo)
+            self._despertar.clear()
+
+    def iniciar(self) -> None:
+        if any(hilo.is_alive() for hilo in self._hilos):
+            return
+        self._detener.clear()
+        self._hilos = [
+            threading.Thread(target=self._bucle, name=f"cola-trabajos-{indice}", daemon=True)
+            for indice in range(self.hilos)
+        ]
+        for hilo in self._hilos:
+            hilo.start()
+
+    def detener(self) -> None:
+        self._detener.set()
+        self._despertar.set()
+        for hilo in self._hilos:
+            hilo.join(timeout=5)
+        self._hilos = []
+
+
+cola_trabajos = ColaTrabajos()
+cola_trabajos.registrar(TRABAJO_RECALCULAR_PUNTAJES, recalcular_puntajes)
+cola_trabajos.registrar(TRABAJO_EVALUAR_POSTULACION, procesar_postulacion, al_fallar=evaluacion_fallida)
+
+
+__all__ = [
+    "ColaTrabajos",
+    "TRABAJO_EVALUAR_POSTULACION",
+    "TRABAJO_RECALCULAR_PUNTAJES",
+    "cola_trabajos",
+]
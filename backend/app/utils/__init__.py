@@ -1,5 +1,15 @@
 """Utility helpers."""
 
-from .time import COL_TZ, to_colombia, to_utc, utc_now_naive
+from .pagination import codificar_cursor, decodificar_cursor, leer_limite
+from .time import COL_TZ, serializar_fecha, to_colombia, to_utc, utc_now_naive
 
-__all__ = ["COL_TZ", "to_colombia", "to_utc", "utc_now_naive"]
+__all__ = [
+    "COL_TZ",
+    "codificar_cursor",
+    "decodificar_cursor",
+    "leer_limite",
+    "serializar_fecha",
+    "to_colombia",
+    "to_utc",
+    "utc_now_naive",
+]
@@ -0,0 +1,91 @@
+"""Min-cost flow over integer costs with shortest augmenting paths and node potentials."""
+from __future__ import annotations
+
+import heapq
+from typing import Dict, List, Optional, Tuple
+
+
+class FlujoCostoMinimo:
+    """Residual graph stored as parallel lists; edge ``e`` and its reverse are ``e`` and ``e ^ 1``.
+
+    Flow is pushed one unit at a time from any node with :meth:`enviar_unidad`.
+    ``potencial`` must keep every residual edge at a non-negative reduced
+    cost; callers that add edges after earlier pushes raise the potential of
+    the new edge's origin first.
+    """
+
+    def __init__(self, nodos: int) -> None:
+        self.nodos = nodos
+        self.adyacentes: List[List[int]] = [[] for _ in range(nodos)]
+        self.destino: List[int] = []
+        self.capacidad: List[int] = []
+        self.costo: List[int] = []
+        self.potencial: List[int] = [0] * nodos
+
+    def agregar_arista(self, origen: int, destino: int, capacidad: int, costo: int) -> int:
+        indice = len(self.destino)
+        self.adyacentes[origen].append(indice)
+        self.destino.append(destino)
+        self.capacidad.append(capacidad)
+        self.costo.append(costo)
+        self.adyacentes[destino].append(indice + 1)
+        self.destino.append(origen)
+        self.capacidad.append(0)
+        self.costo.append(-costo)
+        return indice
+
+    def flujo(self, arista: int) -> int:
+        """Units currently sent along ``arista`` (the residual capacity of its reverse)."""
+        return self.capacidad[arista ^ 1]
+
+    def enviar_unidad(self, origen: int, sumidero: int) -> Optional[int]:
+        """Push one unit along the cheapest residual path and return its cost.
+
+        Dijkstra on reduced costs stops once ``sumidero`` is settled, so only
+        nodes closer than the sink are visited. Shifting the potentials of
+        those nodes by ``distancia - distancia(sumidero)`` keeps every reduced
+        cost non-negative without touching the rest of the graph. Returns
+        ``None`` when the sink is unreachable.
+        """
+        destino, capacidad, costo, potencial = self.destino, self.capacidad, self.costo, self.potencial
+        distancia: Dict[int, int] = {origen: 0}
+        padre: Dict[int, int] = {}
+        definitivos: Dict[int, int] = {}
+        cola: List[Tuple[int, int]] = [(0, origen)]
+        while cola:
+            actual, nodo = heapq.heappop(cola)
+            if nodo in definitivos:
+                continue
+            definitivos[nodo] = actual
+            if nodo == sumidero:
+                break
+            base = actual + potencial[nodo]
+            for arista in self.adyacentes[nodo]:
+                if capacidad[arista] <= 0:
+                    continue
+                vecino = destino[arista]
+                if vecino in definitivos:
+                    continue
+                candidato = base + costo[arista] - potencial[vecino]
+                if vecino not in distancia or candidato < distancia[vecino]:
+                    distancia[vecino] = candidato
+                    padre[vecino] = arista
+                    heapq.heappush(cola, (candidato, vecino))
+        if sumidero not in definitivos:
+            return None
+
+        limite = definitivos[sumidero]
+        costo_camino = limite + potencial[sumidero] - potencial[origen]
+        for nodo, valor in definitivos.items():
+            potencial[nodo] += valor - limite
+
+        nodo = sumidero
+        while nodo != origen:
+            arista = padre[nodo]
+            capacidad[arista] -= 1
+            capacidad[arista ^ 1] += 1
+            nodo = destino[arista ^ 1]
+        return costo_camino
+
+
+__all__ = ["FlujoCostoMinimo"]
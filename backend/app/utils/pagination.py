@@ -0,0 +1,54 @@
+"""Keyset pagination helpers."""
+from __future__ import annotations
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence
+
+
+def codificar_cursor(valores: Sequence[Any]) -> str:
+    """Encode the sort key of the last row of a page as an opaque cursor."""
+    serializables = [v.isoformat() if isinstance(v, datetime) else v for v in valores]
+    crudo = json.dumps(serializables, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(crudo).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor: str, tipos: Sequence[type]) -> List[Any]:
+    """Decode a cursor produced by :func:`codificar_cursor`.
+
+    ``tipos`` lists the expected type of each component; ``datetime`` values
+    are parsed from ISO 8601. Raises ``ValueError`` for malformed cursors.
+    """
+    try:
+        relleno = "=" * (-len(cursor) % 4)
+        valores = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+    except (ValueError, TypeError) as exc:
+        raise ValueError("Cursor inválido") from exc
+    if not isinstance(valores, list) or len(valores) != len(tipos):
+        raise ValueError("Cursor inválido")
+    resultado: List[Any] = []
+    try:
+        for valor, tipo in zip(valores, tipos):
+            if valor is None:
+                resultado.append(None)
+            elif tipo is datetime:
+                resultado.append(datetime.fromisoformat(valor))
+            else:
+                resultado.append(tipo(valor))
+    except (ValueError, TypeError) as exc:
+        raise ValueError("Cursor inválido") from exc
+    return resultado
+
+
+def leer_limite(raw: Optional[str], por_defecto: int, maximo: int) -> int:
+    """Parse a ``limit`` query parameter, clamped to ``[1, maximo]``."""
+    if raw in (None, ""):
+        return por_defecto
+    limite = int(raw)
+    if limite < 1:
+        raise ValueError("limit debe ser positivo")
+    return min(limite, maximo)
+
+
+__all__ = ["codificar_cursor", "decodificar_cursor", "leer_limite"]
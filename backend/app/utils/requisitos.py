@@ -0,0 +1,42 @@
+"""Parsing of free-text convocatoria requirements."""
+from __future__ import annotations
+
+import re
+from typing import Optional, Tuple
+
+
+PATRON_SEMESTRE = re.compile(r"semestre[s]?\s*(?:mínimo|minimo|mayor a)?\s*(\d+)", re.IGNORECASE)
+PATRON_PROMEDIO = re.compile(r"promedio\s*(?:mínimo|minimo|mayor a)?\s*(\d+(?:[\.,]\d+)?)", re.IGNORECASE)
+
+
+def _normalizar_numero(valor: Optional[str]) -> Optional[float]:
+    if valor is None:
+        return None
+    try:
+        return float(str(valor).replace(",", "."))
+    except (TypeError, ValueError):
+        return None
+
+
+def _extraer_patron_numero(texto: str, patron: re.Pattern) -> Optional[float]:
+    match = patron.search(texto)
+    if not match:
+        return None
+    for group in match.groups():
+        numero = _normalizar_numero(group)
+        if numero is not None:
+            return numero
+    return None
+
+
+def compilar_requisitos(texto: Optional[str]) -> Tuple[Optional[int], Optional[float]]:
+    """Extract ``(semestre mínimo, promedio mínimo)`` from a requirements text."""
+    if not texto:
+        return None, None
+    texto = texto.lower()
+    semestre = _extraer_patron_numero(texto, PATRON_SEMESTRE)
+    promedio = _extraer_patron_numero(texto, PATRON_PROMEDIO)
+    return (int(semestre) if semestre is not None else None), promedio
+
+
+__all__ = ["compilar_requisitos"]
@@ -2,6 +2,8 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Optional, Tuple
 from zoneinfo import ZoneInfo
 
 
@@ -27,3 +29,20 @@ def to_utc(dt: datetime | None) -> datetime | None:
     if dt.tzinfo is None:
         return dt.replace(tzinfo=timezone.utc)
     return dt.astimezone(timezone.utc)
+
+
+@lru_cache(maxsize=16384)
+def _serializar_fecha(dt: datetime) -> Tuple[str, str]:
+    dt_utc = dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt.astimezone(timezone.utc)
+    return dt_utc.astimezone(COL_TZ).isoformat(), dt_utc.isoformat()
+
+
+def serializar_fecha(dt: datetime | None) -> Tuple[Optional[str], Optional[str]]:
+    """Return ``(iso_colombia, iso_utc)`` for a timestamp, memoized per value.
+
+    Stored timestamps are immutable per row version, so repeated listings
+    reuse the formatted strings instead of converting time zones again.
+    """
+    if not dt:
+        return None, None
+    return _serializar_fecha(dt)
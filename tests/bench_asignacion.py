@@ -0,0 +1,70 @@
+"""Micro-benchmark del solver de asignación global frente a la asignación voraz.
+
+Ejecutar con ``python -m tests.bench_asignacion`` desde la raíz del repositorio.
+"""
+from __future__ import annotations
+
+import os
+import random
+import sys
+import time
+from collections import Counter
+
+ROOT_DIR = os.path.dirname(os.path.dirname(__file__))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from backend.app.services.asignacion import Candidata, resolver_asignacion
+
+
+ESTUDIANTES = 5_000
+CONVOCATORIAS = 300
+POSTULACIONES_POR_ESTUDIANTE = 3
+
+
+def construir_instancia():
+    azar = random.Random(19)
+    cupos_convocatoria = {cid: azar.randint(1, 6) for cid in range(1, CONVOCATORIAS + 1)}
+    cupos_estudiante = {eid: azar.choice((0, 1, 1, 2, 3)) for eid in range(1, ESTUDIANTES + 1)}
+    candidatas = []
+    for eid in cupos_estudiante:
+        base = azar.uniform(40, 90)
+        for cid in azar.sample(range(1, CONVOCATORIAS + 1), POSTULACIONES_POR_ESTUDIANTE):
+            candidatas.append(Candidata(len(candidatas) + 1, eid, cid, round(base + azar.uniform(-5, 5), 4)))
+    return candidatas, cupos_convocatoria, cupos_estudiante
+
+
+def voraz(candidatas, cupos_convocatoria, cupos_estudiante):
+    usados_c, usados_e, elegidas = Counter(), Counter(), []
+    for c in sorted(candidatas, key=lambda c: -c.puntaje):
+        if usados_c[c.convocatoria_id] < cupos_convocatoria[c.convocatoria_id] and usados_e[
+            c.estudiante_id
+        ] < cupos_estudiante[c.estudiante_id]:
+            usados_c[c.convocatoria_id] += 1
+            usados_e[c.estudiante_id] += 1
+            elegidas.append(c)
+    return elegidas
+
+
+def main() -> None:
+    candidatas, cupos_convocatoria, cupos_estudiante = construir_instancia()
+    inicio = time.perf_counter()
+    elegidas = resolver_asignacion(candidatas, cupos_convocatoria, cupos_estudiante)
+    duracion = time.perf_counter() - inicio
+
+    por_convocatoria = Counter(c.convocatoria_id for c in elegidas)
+    por_estudiante = Counter(c.estudiante_id for c in elegidas)
+    assert all(n <= cupos_convocatoria[cid] for cid, n in por_convocatoria.items()), "Cupos excedidos"
+    assert all(n <= cupos_estudiante[eid] for eid, n in por_estudiante.items()), "Horas excedidas"
+
+    referencia = voraz(candidatas, cupos_convocatoria, cupos_estudiante)
+    total, total_voraz = sum(c.puntaje for c in elegidas), sum(c.puntaje for c in referencia)
+    assert total >= total_voraz - 1e-6, "El óptimo no puede quedar por debajo del voraz"
+    print(f"Postulaciones: {len(candidatas)}  cupos: {sum(cupos_convocatoria.values())}")
+    print(f"Asignadas:     {len(elegidas)} (voraz: {len(referencia)})")
+    print(f"Puntaje total: {total:.2f} (voraz: {total_voraz:.2f})")
+    print(f"Tiempo solver: {duracion * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Micro-benchmark del puntaje vectorizado frente al cálculo por estudiante.
+
+Ejecutar con ``python -m tests.bench_puntuacion`` desde la raíz del repositorio.
+"""
+from __future__ import annotations
+
+import os
+import random
+import sys
+import timeit
+
+ROOT_DIR = os.path.dirname(os.path.dirname(__file__))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from backend.app.models import ConfiguracionIA, Usuario
+from backend.app.services.ia import SeleccionIA
+from backend.app.services.puntuacion import construir_caracteristicas, detalles_fila, razones_fila
+
+
+FILAS = 100_000
+REPETICIONES = 3
+
+
+def construir_estudiantes() -> list[Usuario]:
+    azar = random.Random(7)
+    semestres = [None, "abc", "0", "-1"] + [str(n) for n in range(1, 13)]
+    return [
+        Usuario(
+            id=i + 1,
+            semestre=azar.choice(semestres),
+            promedio=None if azar.random() < 0.02 else round(azar.uniform(-0.5, 5.5), 2),
+            horas_disponibles=None if azar.random() < 0.02 else azar.randint(-2, 30),
+        )
+        for i in range(FILAS)
+    ]
+
+
+def main() -> None:
+    servicio = SeleccionIA(
+        ConfiguracionIA(min_semestre=3, min_promedio=3.2, peso_semestre=0.35, peso_promedio=0.55, peso_horas=0.1)
+    )
+    estudiantes = construir_estudiantes()
+    filas = [(e.id, e.id, 1, e.semestre, e.promedio, e.horas_disponibles, None, None) for e in estudiantes]
+
+    caracteristicas = construir_caracteristicas(filas)
+    resultado = servicio.puntuar_lote(caracteristicas)
+    for indice, estudiante in enumerate(estudiantes):
+        puntaje, detalles = servicio.calcular_puntaje_estudiante(estudiante)
+        assert puntaje == resultado.puntaje[indice], "El puntaje cambió"
+        assert detalles == detalles_fila(resultado, indice), "Los detalles cambiaron"
+        razones = servicio.razones_descarte(estudiante)
+        assert razones == razones_fila(caracteristicas, resultado, servicio.configuracion, indice)
+
+    def escalar():
+        for estudiante in estudiantes:
+            servicio.calcular_puntaje_estudiante(estudiante)
+            servicio.razones_descarte(estudiante)
+
+    anterior = min(timeit.repeat(escalar, number=1, repeat=REPETICIONES))
+    construccion = min(timeit.repeat(lambda: construir_caracteristicas(filas), number=1, repeat=REPETICIONES))
+    kernel = min(timeit.repeat(lambda: servicio.puntuar_lote(caracteristicas), number=1, repeat=REPETICIONES))
+    print(f"Postulaciones: {FILAS}")
+    print(f"Por estudiante:        {anterior * 1000:.1f} ms")
+    print(f"Arreglos desde filas:  {construccion * 1000:.1f} ms")
+    print(f"Kernel vectorizado:    {kernel * 1000:.1f} ms")
+    print(f"Aceleración (kernel):  {anterior / kernel:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
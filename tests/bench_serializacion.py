@@ -0,0 +1,106 @@
+"""Micro-benchmark de Convocatoria.to_dict frente a la serialización anterior.
+
+Ejecutar con ``python -m tests.bench_serializacion`` desde la raíz del repositorio.
+"""
+from __future__ import annotations
+
+import os
+import sys
+import timeit
+from datetime import datetime, timedelta, timezone
+
+ROOT_DIR = os.path.dirname(os.path.dirname(__file__))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from backend.app.models import Convocatoria, EstadoConvocatoria
+from backend.app.utils.time import COL_TZ
+
+
+FILAS = 2000
+REPETICIONES = 5
+
+
+def to_dict_anterior(conv: Convocatoria) -> dict:
+    """Copia de la implementación previa, que convertía zonas horarias en cada llamada."""
+
+    def serialize_dt(dt):
+        if not dt:
+            return None, None
+        if dt.tzinfo is None:
+            dt_utc = dt.replace(tzinfo=timezone.utc)
+        else:
+            dt_utc = dt.astimezone(timezone.utc)
+        dt_col = dt_utc.astimezone(COL_TZ)
+        return dt_col.isoformat(), dt_utc.isoformat()
+
+    fa_local, fa_utc = serialize_dt(conv.fecha_apertura)
+    fc_local, fc_utc = serialize_dt(conv.fecha_cierre)
+    created_local, created_utc = serialize_dt(conv.created_at)
+    updated_local, updated_utc = serialize_dt(conv.updated_at)
+    archivada_local, _ = serialize_dt(conv.archivada_at)
+    return {
+        "id": conv.id,
+        "curso": conv.curso,
+        "semestre": conv.semestre,
+        "requisitos": conv.requisitos,
+        "cupos": conv.cupos,
+        "fecha_apertura": fa_local,
+        "fecha_cierre": fc_local,
+        "fecha_apertura_utc": fa_utc,
+        "fecha_cierre_utc": fc_utc,
+        "estado": conv.estado.value if conv.estado else None,
+        "creado_por_id": conv.creado_por_id,
+        "created_at": created_local,
+        "created_at_utc": created_utc,
+        "updated_at": updated_local,
+        "updated_at_utc": updated_utc,
+        "archivada": conv.archivada,
+        "archivada_at": archivada_local,
+    }
+
+
+def construir_filas() -> list[Convocatoria]:
+    base = datetime(2025, 1, 1, 12, 0, 0)
+    filas = []
+    for i in range(FILAS):
+        momento = base + timedelta(minutes=i)
+        filas.append(
+            Convocatoria(
+                id=i + 1,
+                curso=f"Curso {i}",
+                semestre="2025-1",
+                requisitos="Semestre mínimo 4, promedio mínimo 3.5",
+                fecha_apertura=momento + timedelta(days=1),
+                fecha_cierre=momento + timedelta(days=10),
+                estado=EstadoConvocatoria.SCHEDULED,
+                creado_por_id=1,
+                created_at=momento,
+                updated_at=momento,
+                archivada=False,
+                cupos=1 + i % 3,
+            )
+        )
+    return filas
+
+
+def main() -> None:
+    filas = construir_filas()
+    for conv in filas:
+        nuevo = conv.to_dict()
+        anterior = to_dict_anterior(conv)
+        nuevo.pop("estado")
+        anterior.pop("estado")
+        assert nuevo == anterior, "La serialización cambió"
+
+    anterior = min(timeit.repeat(lambda: [to_dict_anterior(c) for c in filas], number=1, repeat=REPETICIONES))
+    ahora = datetime.now(timezone.utc).replace(tzinfo=None)
+    nuevo = min(timeit.repeat(lambda: [c.to_dict(ahora) for c in filas], number=1, repeat=REPETICIONES))
+    print(f"Filas: {FILAS}")
+    print(f"to_dict anterior: {anterior * 1000:.1f} ms")
+    print(f"to_dict actual:   {nuevo * 1000:.1f} ms")
+    print(f"Aceleración:      {anterior / nuevo:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,7 @@ from datetime import UTC, datetime, timedelta
 from backend.app import create_app
 from backend.app.extensions import db
 from backend.app.models import Convocatoria, EstadoConvocatoria, EstadoPostulacion, Postulacion
+from backend.app.services.programador import programador
 from backend.app.utils.time import utc_now_naive
 
 
@@ -138,10 +139,8 @@ class HistoriasUsuarioTestCase(unittest.TestCase):
         convoc_arch_db.fecha_cierre = utc_now_naive() - timedelta(days=1)
         convoc_arch_db.estado = EstadoConvocatoria.CLOSED
         db.session.commit()
-        self.client.get(
-            "/api/convocatorias",
-            headers=self._auth_headers(self.coordinator_token),
-        )
+        programador.ejecutar_ciclo()
+        db.session.expire_all()
         convoc_arch_db = db.session.get(Convocatoria, convocatoria_archivo_id)
         self.assertTrue(convoc_arch_db.archivada)
 
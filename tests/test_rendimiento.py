@@ -0,0 +1,1517 @@
+"""Pruebas de los subsistemas de rendimiento (programador, caché, lotes)."""
+from __future__ import annotations
+
+import base64
+import hashlib
+import io
+import itertools
+import json
+import random
+import unittest
+from collections import Counter
+from contextlib import contextmanager
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import event, text, update
+from sqlalchemy.exc import IntegrityError
+
+from backend.app import create_app
+from backend.app.extensions import db
+from backend.app.models import (
+    CargaArchivo,
+    ConfiguracionIA,
+    Convocatoria,
+    EstadoConvocatoria,
+    EstadoPostulacion,
+    EvaluacionAspirante,
+    Notificacion,
+    Postulacion,
+    ReporteDescartes,
+    RespuestaIdempotente,
+    Trabajo,
+    Usuario,
+)
+from backend.app.services.almacenamiento import CLAVE_CUARENTENA, migrar_soportes_base64, obtener_almacen
+from backend.app.services.asignacion import Candidata, resolver_asignacion
+from backend.app.services.cache import EXTENSION_ELEGIBILIDAD, obtener_cache
+from backend.app.services.cargas import purgar_cargas
+from backend.app.services.convocatorias import semestre_numerico
+from backend.app.services.descartes import migrar_reportes_legados, registrar_descartes, reporte_descartes
+from backend.app.services.ia import SeleccionIA, obtener_servicio_ia
+from backend.app.services.mantenimiento import ejecutar_mantenimiento
+from backend.app.services.puntuacion import evaluar_en_lote
+from backend.app.services.programador import ProgramadorTransiciones
+from backend.app.services.trabajos import ColaTrabajos, cola_trabajos
+from backend.app.utils.time import utc_now_naive
+
+
+class RendimientoTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.app = create_app("testing")
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        self.client = self.app.test_client()
+        self.coordinador = Usuario.query.filter_by(correo="coordinador@udem.edu.co").first()
+
+    def tearDown(self) -> None:
+        db.session.remove()
+        self.app_context.pop()
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+    def _login(self, correo: str, password: str = "123456") -> str:
+        response = self.client.post(
+            "/api/auth/login",
+            json={"correo": correo, "password": password},
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.get_json()["access_token"]
+
+    def _auth_headers(self, token: str) -> dict[str, str]:
+        return {"Authorization": f"Bearer {token}"}
+
+    @contextmanager
+    def _capturar_sql(self):
+        sentencias: list[str] = []
+
+        def registrar(conn, cursor, statement, parameters, context, executemany):
+            sentencias.append(statement)
+
+        event.listen(db.engine, "before_cursor_execute", registrar)
+        try:
+            yield sentencias
+        finally:
+            event.remove(db.engine, "before_cursor_execute", registrar)
+
+    def _convocatoria(self, curso: str, apertura=None, cierre=None, **extra) -> Convocatoria:
+        convocatoria = Convocatoria(
+            curso=curso,
+            semestre=extra.pop("semestre", "2025-1"),
+            requisitos=extra.pop("requisitos", "Semestre mínimo 4, promedio mínimo 3.5"),
+            fecha_apertura=apertura,
+            fecha_cierre=cierre,
+            creado_por_id=self.coordinador.id,
+            **extra,
+        )
+        db.session.add(convocatoria)
+        db.session.commit()
+        return convocatoria
+
+    # ------------------------------------------------------------------
+    # Programador de transiciones
+    # ------------------------------------------------------------------
+    def test_programador_aplica_solo_transiciones_vencidas(self) -> None:
+        now = utc_now_naive()
+        por_abrir = self._convocatoria("Por abrir", now - timedelta(hours=1), now + timedelta(days=1))
+        por_archivar = self._convocatoria("Por archivar", now - timedelta(days=3), now - timedelta(hours=1))
+        futura = self._convocatoria("Futura", now + timedelta(seconds=30), now + timedelta(days=2))
+
+        programador = ProgramadorTransiciones()
+        programador.init_app(self.app)
+        programador.ejecutar_ciclo(now)
+        db.session.expire_all()
+
+        self.assertEqual(db.session.get(Convocatoria, por_abrir.id).estado, EstadoConvocatoria.ACTIVE)
+        archivada = db.session.get(Convocatoria, por_archivar.id)
+        self.assertTrue(archivada.archivada)
+        self.assertEqual(archivada.estado, EstadoConvocatoria.ARCHIVED)
+        self.assertFalse(db.session.get(Convocatoria, futura.id).archivada)
+        self.assertEqual(programador.proxima_transicion(), futura.fecha_apertura)
+
+        # Al vencer la apertura el heap dispara la actualización sin refrescar.
+        programador.ejecutar_ciclo(futura.fecha_apertura + timedelta(seconds=1))
+        db.session.expire_all()
+        self.assertEqual(db.session.get(Convocatoria, futura.id).estado, EstadoConvocatoria.ACTIVE)
+
+    def test_programador_un_solo_lider(self) -> None:
+        lider = ProgramadorTransiciones()
+        otro = ProgramadorTransiciones()
+        lider.init_app(self.app)
+        otro.init_app(self.app)
+        now = utc_now_naive()
+        self.assertTrue(lider.adquirir_liderazgo(now))
+        self.assertFalse(otro.adquirir_liderazgo(now))
+        self.assertTrue(otro.adquirir_liderazgo(now + timedelta(seconds=lider.duracion_candado + 1)))
+
+    def test_listados_no_archivan(self) -> None:
+        now = utc_now_naive()
+        vencida = self._convocatoria("Vencida", now - timedelta(days=3), now - timedelta(hours=1))
+        response = self.client.get("/api/convocatorias/activas")
+        self.assertEqual(response.status_code, 200)
+        db.session.expire_all()
+        self.assertFalse(db.session.get(Convocatoria, vencida.id).archivada)
+
+    # ------------------------------------------------------------------
+    # Estado calculado en SQL
+    # ------------------------------------------------------------------
+    def test_estado_sql_coincide_con_python(self) -> None:
+        now = utc_now_naive()
+        antes, despues = now - timedelta(days=1), now + timedelta(days=1)
+        fechas = [None, antes, despues]
+        for apertura in fechas:
+            for cierre in fechas:
+                for archivada in (False, True):
+                    self._convocatoria(
+                        f"Combinación {apertura} {cierre} {archivada}",
+                        apertura,
+                        cierre,
+                        archivada=archivada,
+                        estado=EstadoConvocatoria.DRAFT,
+                    )
+
+        filas = db.session.query(Convocatoria, Convocatoria.estado_en(now)).all()
+        for convocatoria, estado_sql in filas:
+            self.assertEqual(estado_sql, convocatoria.estado_en(now))
+
+        for estado in EstadoConvocatoria:
+            ids_sql = {
+                c.id for c in Convocatoria.query.filter(Convocatoria.condicion_estado(estado, now)).all()
+            }
+            ids_python = {c.id for c, _ in filas if c.estado_en(now) == estado}
+            self.assertEqual(ids_sql, ids_python, estado)
+
+    # ------------------------------------------------------------------
+    # Paginación por cursor
+    # ------------------------------------------------------------------
+    def test_listado_paginado_por_cursor(self) -> None:
+        creadas = [
+            self._convocatoria(f"Cálculo {i}", semestre="2025-2" if i % 2 else "2025-1") for i in range(5)
+        ]
+        self._convocatoria("Física 1", semestre="2025-2")
+
+        vistos: list[int] = []
+        params = {"limit": 2, "curso": "Cálculo"}
+        while True:
+            response = self.client.get("/api/convocatorias", query_string=params)
+            self.assertEqual(response.status_code, 200)
+            pagina = response.get_json()
+            self.assertLessEqual(len(pagina), 2)
+            vistos.extend(item["id"] for item in pagina)
+            siguiente = response.headers.get("X-Next-Cursor")
+            if not siguiente:
+                break
+            params["cursor"] = siguiente
+        self.assertEqual(vistos, [c.id for c in reversed(creadas)])
+
+        # Sin limit ni cursor se devuelve la lista completa en el orden de siempre.
+        self.app.config["CONVOCATORIAS_PAGE_SIZE"] = 2
+        response = self.client.get("/api/convocatorias", query_string={"curso": "Cálculo"})
+        self.assertEqual([item["id"] for item in response.get_json()], [c.id for c in creadas])
+        self.assertNotIn("X-Next-Cursor", response.headers)
+        response = self.client.get("/api/convocatorias", headers={"Origin": "http://otro.example"})
+        self.assertIn("X-Next-Cursor", response.headers.get("Access-Control-Expose-Headers", ""))
+
+        response = self.client.get(
+            "/api/convocatorias",
+            query_string={"semestre": "2025-2", "curso": "Cálculo", "orden": "antiguas"},
+        )
+        self.assertEqual([item["id"] for item in response.get_json()], [creadas[1].id, creadas[3].id])
+
+        response = self.client.get("/api/convocatorias", query_string={"cursor": "no-es-un-cursor"})
+        self.assertEqual(response.status_code, 400)
+
+    # ------------------------------------------------------------------
+    # Caché de respuestas
+    # ------------------------------------------------------------------
+    def test_cache_respuestas_versionada(self) -> None:
+        now = utc_now_naive()
+        convocatoria = self._convocatoria("Redes", now - timedelta(hours=1), now + timedelta(minutes=2))
+
+        primera = self.client.get("/api/convocatorias/activas")
+        self.assertEqual(primera.headers["X-Cache"], "MISS")
+        segunda = self.client.get("/api/convocatorias/activas")
+        self.assertEqual(segunda.headers["X-Cache"], "HIT")
+        self.assertEqual(primera.get_json(), segunda.get_json())
+        self.assertEqual(self.client.get("/api/convocatorias/activas?lang=en").headers["X-Cache"], "MISS")
+
+        # La entrada expira en el próximo cierre programado.
+        entrada = next(iter(obtener_cache()._entradas.values()))
+        self.assertEqual(entrada.expira_en, convocatoria.fecha_cierre)
+
+        token = self._login("coordinador@udem.edu.co")
+        response = self.client.patch(
+            f"/api/convocatorias/{convocatoria.id}",
+            headers=self._auth_headers(token),
+            json={"curso": "Redes de computadores"},
+        )
+        self.assertEqual(response.status_code, 200)
+        tercera = self.client.get("/api/convocatorias/activas")
+        self.assertEqual(tercera.headers["X-Cache"], "MISS")
+        self.assertEqual(tercera.get_json()[0]["curso"], "Redes de computadores")
+
+    # ------------------------------------------------------------------
+    # Importación masiva
+    # ------------------------------------------------------------------
+    def test_importacion_masiva_ndjson_y_csv(self) -> None:
+        token = self._login("coordinador@udem.edu.co")
+        apertura = (datetime.now(UTC) + timedelta(days=1)).isoformat()
+        cierre = (datetime.now(UTC) + timedelta(days=5)).isoformat()
+        pasado = (datetime.now(UTC) - timedelta(days=1)).isoformat()
+        filas = [
+            {"curso": "Importada 1", "semestre": "2025-1", "requisitos": "Semestre mínimo 2"},
+            {"semestre": "2025-1", "requisitos": "Sin curso"},
+            {"curso": "Importada 2", "semestre": "2025-1", "requisitos": "R", "fecha_apertura": pasado},
+            {"curso": "Importada 3", "semestre": "2025-1", "requisitos": "R", "fecha_apertura": cierre, "fecha_cierre": apertura},
+            {"curso": "Importada 4", "semestre": "2025-1", "requisitos": "R", "fecha_apertura": apertura, "fecha_cierre": cierre},
+        ]
+        cuerpo = "\n".join(json.dumps(f) for f in filas) + "\nno es json\n"
+        response = self.client.post(
+            "/api/convocatorias/importar",
+            headers=self._auth_headers(token),
+            data=cuerpo.encode(),
+            content_type="application/x-ndjson",
+        )
+        self.assertEqual(response.status_code, 201)
+        reporte = response.get_json()
+        self.assertEqual(reporte["creadas"], 2)
+        self.assertEqual(
+            [(e["linea"], e["msg"]) for e in reporte["errores"]],
+            [
+                (2, "Campo obligatorio faltante: curso"),
+                (3, "fecha_apertura no puede estar en el pasado"),
+                (4, "fecha_cierre debe ser posterior a fecha_apertura"),
+                (6, "JSON inválido"),
+            ],
+        )
+        programada = db.session.get(Convocatoria, reporte["ids"][1])
+        self.assertEqual(programada.estado, EstadoConvocatoria.SCHEDULED)
+
+        csv_cuerpo = (
+            "curso,semestre,requisitos,fecha_apertura,fecha_cierre\n"
+            f"Desde CSV,2025-2,\"Semestre mínimo 3, promedio mínimo 3.0\",{apertura},{cierre}\n"
+            ",2025-2,Falta curso,,\n"
+        )
+        response = self.client.post(
+            "/api/convocatorias/importar",
+            headers=self._auth_headers(token),
+            data=csv_cuerpo.encode(),
+            content_type="text/csv",
+        )
+        self.assertEqual(response.status_code, 201)
+        reporte = response.get_json()
+        self.assertEqual(reporte["creadas"], 1)
+        self.assertEqual(reporte["errores"], [{"linea": 3, "msg": "Campo obligatorio faltante: curso"}])
+        creada = db.session.get(Convocatoria, reporte["ids"][0])
+        self.assertEqual(creada.requisitos, "Semestre mínimo 3, promedio mínimo 3.0")
+
+        # Codificación o comillas inválidas se reportan como error de fila, no como 500.
+        ndjson_latin1 = json.dumps(filas[0]).encode() + b"\n" + '{"curso": "Año"}\n'.encode("latin-1")
+        csv_latin1 = "curso,semestre,requisitos\nAño,2025-2,R\n".encode("latin-1")
+        csv_comillas = b'curso,semestre,requisitos\n"Sin cierre,2025-2,R\n'
+        for cuerpo, tipo, esperado in (
+            (ndjson_latin1, "application/x-ndjson", (201, [(2, "El contenido no está codificado en UTF-8")])),
+            (csv_latin1, "text/csv", (400, [(2, "El contenido no está codificado en UTF-8")])),
+            (csv_comillas, "text/csv", (400, [(2, "CSV inválido: unexpected end of data")])),
+        ):
+            response = self.client.post(
+                "/api/convocatorias/importar", headers=self._auth_headers(token), data=cuerpo, content_type=tipo
+            )
+            errores = [(e["linea"], e["msg"]) for e in response.get_json()["errores"]]
+            self.assertEqual((response.status_code, errores), esperado)
+
+    # ------------------------------------------------------------------
+    # Búsqueda de texto completo
+    # ------------------------------------------------------------------
+    def test_busqueda_texto_completo(self) -> None:
+        now = utc_now_naive()
+        activa = self._convocatoria(
+            "Cálculo Diferencial", now - timedelta(hours=1), now + timedelta(days=1), requisitos="Semestre mínimo 3"
+        )
+        programada = self._convocatoria(
+            "Física Mecánica", now + timedelta(days=1), now + timedelta(days=3), requisitos="Haber aprobado cálculo"
+        )
+        self._convocatoria("Programación", requisitos="Promedio mínimo 4.0")
+
+        def buscar(**params):
+            response = self.client.get("/api/convocatorias/buscar", query_string=params)
+            self.assertEqual(response.status_code, 200)
+            return [item["id"] for item in response.get_json()]
+
+        # El curso pesa más que los requisitos y se ignoran las tildes.
+        self.assertEqual(buscar(q="calc"), [activa.id, programada.id])
+        self.assertEqual(buscar(q="calc", estado="programada"), [programada.id])
+        self.assertEqual(buscar(q="fisica meca"), [programada.id])
+
+        token = self._login("coordinador@udem.edu.co")
+        self.client.patch(
+            f"/api/convocatorias/{programada.id}",
+            headers=self._auth_headers(token),
+            json={"requisitos": "Semestre mínimo 2"},
+        )
+        self.assertEqual(buscar(q="calc"), [activa.id])
+        self.assertEqual(self.client.get("/api/convocatorias/buscar").status_code, 400)
+
+    # ------------------------------------------------------------------
+    # Requisitos compilados
+    # ------------------------------------------------------------------
+    def test_requisitos_compilados_al_escribir(self) -> None:
+        exigente = self._convocatoria("Exigente", requisitos="Semestre mínimo 6 y promedio mínimo 4,2")
+        libre = self._convocatoria("Libre", requisitos="Disponibilidad en las tardes")
+        self.assertEqual((exigente.min_semestre_req, exigente.min_promedio_req), (6, 4.2))
+        self.assertEqual((libre.min_semestre_req, libre.min_promedio_req), (None, None))
+
+        exigente.requisitos = "Semestre mínimo 3"
+        db.session.commit()
+        self.assertEqual((exigente.min_semestre_req, exigente.min_promedio_req), (3, None))
+
+        elegibles = {
+            c.id for c in Convocatoria.query.filter(Convocatoria.condicion_elegible(2, 5.0)).all()
+        }
+        self.assertIn(libre.id, elegibles)
+        self.assertNotIn(exigente.id, elegibles)
+
+    # ------------------------------------------------------------------
+    # Elegibilidad en lote
+    # ------------------------------------------------------------------
+    def test_elegibilidad_en_lote(self) -> None:
+        now = utc_now_naive()
+        abierta = (now - timedelta(hours=1), now + timedelta(days=1))
+        alcanzable = self._convocatoria("Alcanzable", *abierta, requisitos="Semestre mínimo 3")
+        exigente = self._convocatoria("Exigente", *abierta, requisitos="Semestre mínimo 8, promedio mínimo 4.8")
+        self._convocatoria("Futura", now + timedelta(days=1), now + timedelta(days=2))
+
+        token = self._login("maria@udem.edu.co")
+        response = self.client.get("/api/convocatorias/elegibilidad", headers=self._auth_headers(token))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["X-Cache"], "MISS")
+        data = response.get_json()
+        resultado = {item["convocatoria_id"]: item for item in data["convocatorias"]}
+        self.assertEqual(set(resultado), {alcanzable.id, exigente.id})
+        self.assertTrue(resultado[alcanzable.id]["elegible"])
+        self.assertAlmostEqual(resultado[alcanzable.id]["puntaje_proyectado"], data["puntaje_proyectado"])
+        self.assertFalse(resultado[exigente.id]["elegible"])
+        self.assertEqual(
+            resultado[exigente.id]["razones"],
+            ["Semestre requerido: 8, estudiante: 3", "Promedio requerido: 4.8, estudiante: 4.0"],
+        )
+
+        repetida = self.client.get("/api/convocatorias/elegibilidad", headers=self._auth_headers(token))
+        self.assertEqual(repetida.headers["X-Cache"], "HIT")
+        # Las entradas por estudiante no ocupan el caché de los listados públicos.
+        self.assertEqual(len(obtener_cache(EXTENSION_ELEGIBILIDAD)), 1)
+        self.assertEqual(len(obtener_cache()), 0)
+
+        # Un cambio en el perfil invalida la entrada.
+        self.client.put("/api/auth/profile", headers=self._auth_headers(token), json={"semestre": "9"})
+        actualizada = self.client.get("/api/convocatorias/elegibilidad", headers=self._auth_headers(token))
+        self.assertEqual(actualizada.headers["X-Cache"], "MISS")
+        razones = {i["convocatoria_id"]: i["razones"] for i in actualizada.get_json()["convocatorias"]}
+        self.assertEqual(razones[exigente.id], ["Promedio requerido: 4.8, estudiante: 4.0"])
+
+        coordinador = self._login("coordinador@udem.edu.co")
+        self.assertEqual(
+            self.client.get("/api/convocatorias/elegibilidad", headers=self._auth_headers(coordinador)).status_code,
+            403,
+        )
+
+    # ------------------------------------------------------------------
+    # Almacenamiento de adjuntos
+    # ------------------------------------------------------------------
+    def test_cv_se_guarda_por_hash_y_se_deduplica(self) -> None:
+        now = utc_now_naive()
+        convocatoria = self._convocatoria("Adjuntos", now - timedelta(hours=1), now + timedelta(days=1))
+        contenido = b"%PDF-1.4 hoja de vida compartida"
+        cv_base64 = base64.b64encode(contenido).decode()
+        hash_esperado = hashlib.sha256(contenido).hexdigest()
+
+        for correo in ("estudiante@udem.edu.co", "maria@udem.edu.co"):
+            token = self._login(correo)
+            response = self.client.post(
+                f"/api/convocatorias/{convocatoria.id}/postulaciones",
+                headers=self._auth_headers(token),
+                json={"soportes": {"cvNombre": "cv.pdf", "cvBase64": cv_base64}},
+            )
+            self.assertIn(response.status_code, (201, 202))
+            soportes = response.get_json()["postulacion"]["datos_soportes"]
+            self.assertEqual(soportes, {"cvNombre": "cv.pdf", "cvHash": hash_esperado, "cvSize": len(contenido)})
+
+        almacen = obtener_almacen()
+        self.assertEqual(almacen.ruta(hash_esperado).read_bytes(), contenido)
+        self.assertEqual(len(list(almacen.ruta(hash_esperado).parent.glob(hash_esperado + "*"))), 1)
+
+    def test_migracion_saca_base64_de_la_base_de_datos(self) -> None:
+        now = utc_now_naive()
+        convocatoria = self._convocatoria("Legado", now - timedelta(hours=1), now + timedelta(days=1))
+        estudiante = Usuario.query.filter_by(correo="estudiante@udem.edu.co").first()
+        contenido = b"%PDF-1.4 cv heredado"
+        postulacion = Postulacion(estudiante_id=estudiante.id, convocatoria_id=convocatoria.id)
+        postulacion.adjuntar_soportes(
+            {"cvNombre": "viejo.pdf", "cvBase64": base64.b64encode(contenido).decode(), "cvSize": len(contenido)}
+        )
+        db.session.add(postulacion)
+        # Un adjunto que no decodifica no se pierde: queda en cuarentena.
+        otra = Usuario.query.filter_by(correo="maria@udem.edu.co").first()
+        invalida = Postulacion(estudiante_id=otra.id, convocatoria_id=convocatoria.id)
+        invalida.adjuntar_soportes({"cvNombre": "roto.pdf", "cvBase64": "no es base64!"})
+        db.session.add(invalida)
+        db.session.commit()
+
+        self.assertEqual(migrar_soportes_base64(), 1)
+        db.session.refresh(postulacion)
+        soportes = postulacion.datos_soportes
+        self.assertNotIn("cvBase64", soportes)
+        self.assertEqual(obtener_almacen().ruta(soportes["cvHash"]).read_bytes(), contenido)
+        db.session.refresh(invalida)
+        self.assertEqual(invalida.datos_soportes, {"cvNombre": "roto.pdf", CLAVE_CUARENTENA: "no es base64!"})
+        # Ejecutarla de nuevo no hace nada.
+        self.assertEqual(migrar_soportes_base64(), 0)
+
+    # ------------------------------------------------------------------
+    # Carga de hoja de vida por multipart y por fragmentos
+    # ------------------------------------------------------------------
+    def test_cv_multipart_valida_tamano_y_firma_en_streaming(self) -> None:
+        now = utc_now_naive()
+        convocatoria = self._convocatoria("Multipart", now - timedelta(hours=1), now + timedelta(days=1))
+        url = f"/api/convocatorias/{convocatoria.id}/postulaciones"
+        token = self._login("estudiante@udem.edu.co")
+        self.app.config["CV_MAX_BYTES"] = 1024
+
+        def enviar(contenido: bytes, nombre: str = "cv.pdf", destino: str = url):
+            return self.client.post(
+                destino,
+                headers=self._auth_headers(token),
+                data={"formulario": json.dumps({"comentario": "multipart"}), "cv": (io.BytesIO(contenido), nombre)},
+                content_type="multipart/form-data",
+            )
+
+        # Se corta al cruzar el límite aunque el cuerpo quepa en el margen inicial.
+        self.assertEqual(enviar(b"%PDF-1.4" + b"a" * 4096).status_code, 413)
+        # Cuerpos declarados muy grandes se rechazan sin leerlos.
+        self.assertEqual(enviar(b"%PDF-1.4" + b"a" * 200_000).status_code, 413)
+        # La firma debe coincidir con la extensión.
+        self.assertEqual(enviar(b"MZ\x90\x00ejecutable").status_code, 400)
+        self.assertEqual(enviar(b"%PDF-1.4", "cv.exe").status_code, 400)
+        # Un archivo con contenido pero sin nombre sigue siendo inválido.
+        self.assertEqual(enviar(b"%PDF-1.4", "").status_code, 400)
+
+        contenido = b"%PDF-1.4 hoja de vida"
+        response = enviar(contenido)
+        self.assertIn(response.status_code, (201, 202))
+        postulacion = response.get_json()["postulacion"]
+        self.assertEqual(postulacion["datos_formulario"], {"comentario": "multipart"})
+        self.assertEqual(postulacion["datos_soportes"]["cvHash"], hashlib.sha256(contenido).hexdigest())
+
+        # La parte vacía que envía un formulario sin archivo elegido equivale a no adjuntar CV.
+        otra = self._convocatoria("Multipart sin CV", now - timedelta(hours=1), now + timedelta(days=1))
+        sin_cv = enviar(b"", "", f"/api/convocatorias/{otra.id}/postulaciones")
+        self.assertIn(sin_cv.status_code, (201, 202))
+        self.assertNotIn("cvHash", sin_cv.get_json()["postulacion"]["datos_soportes"] or {})
+
+    def test_cv_carga_reanudable_por_fragmentos(self) -> None:
+        now = utc_now_naive()
+        convocatoria = self._convocatoria("Fragmentos", now - timedelta(hours=1), now + timedelta(days=1))
+        token = self._login("estudiante@udem.edu.co")
+        contenido = b"%PDF-1.4 " + b"x" * 100
+
+        inicio = self.client.post(
+            "/api/postulaciones/cargas",
+            headers=self._auth_headers(token),
+            json={"nombre": "cv.pdf", "tamano": len(contenido)},
+        )
+        self.assertEqual(inicio.status_code, 201)
+        carga_id = inicio.get_json()["id"]
+        url_carga = f"/api/postulaciones/cargas/{carga_id}"
+
+        def fragmento(desde: int, hasta: int):
+            return self.client.put(
+                url_carga,
+                headers={
+                    **self._auth_headers(token),
+                    "Content-Range": f"bytes {desde}-{hasta - 1}/{len(contenido)}",
+                },
+                data=contenido[desde:hasta],
+            )
+
+        self.assertEqual(fragmento(0, 40).get_json()["recibido"], 40)
+        # Un fragmento fuera de orden se rechaza e informa dónde reanudar.
+        desfasado = fragmento(60, 80)
+        self.assertEqual(desfasado.status_code, 409)
+        self.assertEqual(desfasado.get_json()["carga"]["recibido"], 40)
+        estado = self.client.get(url_carga, headers=self._auth_headers(token)).get_json()
+        self.assertFalse(estado["completa"])
+
+        final = fragmento(40, len(contenido)).get_json()
+        self.assertTrue(final["completa"])
+        self.assertEqual(final["hash"], hashlib.sha256(contenido).hexdigest())
+
+        otro = self._login("maria@udem.edu.co")
+        self.assertEqual(self.client.get(url_carga, headers=self._auth_headers(otro)).status_code, 404)
+
+        response = self.client.post(
+            f"/api/convocatorias/{convocatoria.id}/postulaciones",
+            headers=self._auth_headers(token),
+            json={"soportes": {"cargaId": carga_id}},
+        )
+        self.assertIn(response.status_code, (201, 202))
+        self.assertEqual(response.get_json()["postulacion"]["datos_soportes"]["cvSize"], len(contenido))
+
+    def test_cargas_expiran_y_tienen_cupo_por_usuario(self) -> None:
+        self.app.config["CARGAS_MAX_ABIERTAS"] = 2
+        token = self._login("estudiante@udem.edu.co")
+        contenido = b"%PDF-1.4 " + b"z" * 50
+
+        def iniciar():
+            return self.client.post(
+                "/api/postulaciones/cargas",
+                headers=self._auth_headers(token),
+                json={"nombre": "cv.pdf", "tamano": len(contenido)},
+            )
+
+        primera = iniciar().get_json()["id"]
+        self.client.put(
+            f"/api/postulaciones/cargas/{primera}",
+            headers={**self._auth_headers(token), "Content-Range": f"bytes 0-19/{len(contenido)}"},
+            data=contenido[:20],
+        )
+        segunda = iniciar().get_json()["id"]
+        self.assertEqual(iniciar().status_code, 429)
+
+        # Una carga inactiva más allá de la vigencia ya no acepta fragmentos.
+        db.session.execute(
+            update(CargaArchivo)
+            .where(CargaArchivo.id == segunda)
+            .values(updated_at=utc_now_naive() - timedelta(hours=25))
+        )
+        db.session.commit()
+        vencida = self.client.put(
+            f"/api/postulaciones/cargas/{segunda}",
+            headers={**self._auth_headers(token), "Content-Range": f"bytes 0-19/{len(contenido)}"},
+            data=contenido[:20],
+        )
+        self.assertEqual(vencida.status_code, 409)
+
+        # La purga borra cargas, parciales y blobs sin referencias; conserva los usados.
+        almacen = obtener_almacen()
+        huerfano, _ = almacen.guardar(b"%PDF-1.4 sin postulacion")
+        usado, _ = almacen.guardar(b"%PDF-1.4 con postulacion")
+        estudiante = Usuario.query.filter_by(correo="estudiante@udem.edu.co").first()
+        postulacion = Postulacion(estudiante_id=estudiante.id, convocatoria_id=self._convocatoria("Purga").id)
+        postulacion.adjuntar_soportes({"cvNombre": "cv.pdf", "cvHash": usado, "cvSize": 1})
+        db.session.add(postulacion)
+        db.session.commit()
+
+        self.assertEqual(purgar_cargas(utc_now_naive() + timedelta(hours=25)), 2)
+        self.assertEqual(CargaArchivo.query.count(), 0)
+        self.assertFalse(almacen.ruta_parcial(primera).exists())
+        self.assertFalse(almacen.existe(huerfano))
+        self.assertTrue(almacen.existe(usado))
+        self.assertEqual(iniciar().status_code, 201)
+
+    def test_descarga_cv_con_rango_y_etag(self) -> None:
+        now = utc_now_naive()
+        convocatoria = self._convocatoria("Descargas", now - timedelta(hours=1), now + timedelta(days=1))
+        token = self._login("estudiante@udem.edu.co")
+        contenido = b"%PDF-1.4 " + bytes(range(256)) * 4
+        creada = self.client.post(
+            f"/api/convocatorias/{convocatoria.id}/postulaciones",
+            headers=self._auth_headers(token),
+            data={"cv": (io.BytesIO(contenido), "hoja.pdf")},
+            content_type="multipart/form-data",
+        ).get_json()["postulacion"]
+        url = f"/api/convocatorias/{convocatoria.id}/postulaciones/{creada['id']}/cv"
+
+        coordinador = self._login("coordinador@udem.edu.co")
+        response = self.client.get(url, headers=self._auth_headers(coordinador))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, "application/pdf")
+        self.assertEqual(response.data, contenido)
+        etag = response.headers["ETag"]
+        self.assertIn(creada["datos_soportes"]["cvHash"], etag)
+
+        no_modificado = self.client.get(url, headers={**self._auth_headers(coordinador), "If-None-Match": etag})
+        self.assertEqual(no_modificado.status_code, 304)
+        self.assertEqual(no_modificado.data, b"")
+
+        parcial = self.client.get(url, headers={**self._auth_headers(coordinador), "Range": "bytes=0-7"})
+        self.assertEqual(parcial.status_code, 206)
+        self.assertEqual(parcial.data, contenido[:8])
+        self.assertEqual(parcial.headers["Content-Range"], f"bytes 0-7/{len(contenido)}")
+
+        # Igual que en el listado: el estudiante solo ve su propia postulación.
+        self.assertEqual(self.client.get(url, headers=self._auth_headers(token)).status_code, 200)
+        otro = self._login("maria@udem.edu.co")
+        self.assertEqual(self.client.get(url, headers=self._auth_headers(otro)).status_code, 404)
+
+    # ------------------------------------------------------------------
+    # Listados compactos
+    # ------------------------------------------------------------------
+    def test_listado_postulaciones_no_carga_columnas_pesadas(self) -> None:
+        now = utc_now_naive()
+        convocatoria = self._convocatoria("Compacta", now - timedelta(hours=1), now + timedelta(days=1))
+        token = self._login("estudiante@udem.edu.co")
+        creada = self.client.post(
+            f"/api/convocatorias/{convocatoria.id}/postulaciones",
+            headers=self._auth_headers(token),
+            data={"formulario": json.dumps({"comentario": "x" * 2000}), "cv": (io.BytesIO(b"%PDF-1.4 cv"), "cv.pdf")},
+            content_type="multipart/form-data",
+        ).get_json()["postulacion"]
+        coordinador = self._auth_headers(self._login("coordinador@udem.edu.co"))
+        url = f"/api/convocatorias/{convocatoria.id}/postulaciones"
+
+        with self._capturar_sql() as sentencias:
+            compacta = self.client.get(url, headers=coordinador).get_json()["postulaciones"][0]
+        self.assertNotIn("datos_formulario", compacta)
+        self.assertNotIn("datos_soportes", compacta)
+        self.assertFalse([s for s in sentencias if "datos_formulario" in s or "datos_soportes" in s])
+
+        con_soportes = self.client.get(f"{url}?include=soportes", headers=coordinador).get_json()["postulaciones"][0]
+        self.assertEqual(con_soportes["datos_soportes"]["cvNombre"], "cv.pdf")
+        self.assertNotIn("datos_formulario", con_soportes)
+        self.assertEqual(self.client.get(f"{url}?include=todo", headers=coordinador).status_code, 400)
+
+        detalle = self.client.get(f"{url}/{creada['id']}", headers=coordinador).get_json()
+        self.assertEqual(len(detalle["datos_formulario"]["comentario"]), 2000)
+        self.assertEqual(detalle["estudiante"]["correo"], "estudiante@udem.edu.co")
+
+    # ------------------------------------------------------------------
+    # Carga anticipada de relaciones (sin N+1)
+    # ------------------------------------------------------------------
+    def _poblar_postulaciones(self, cantidad: int, prefijo: str) -> Convocatoria:
+        now = utc_now_naive()
+        principal = self._convocatoria(f"{prefijo} principal", now - timedelta(hours=1), now + timedelta(days=1))
+        for indice in range(cantidad):
+            estudiante = Usuario(
+                codigo=f"{prefijo}-{indice}",
+                correo=f"{prefijo.lower()}{indice}@udem.edu.co",
+                nombre=f"Estudiante {prefijo} {indice}",
+                rol="STUDENT",
+                semestre="6",
+                promedio=4.0 + indice / 100,
+            )
+            estudiante.set_password("123456")
+            otra = self._convocatoria(f"{prefijo} {indice}", now - timedelta(hours=1), now + timedelta(days=1))
+            db.session.add(estudiante)
+            db.session.flush()
+            for convocatoria in (principal, otra):
+                postulacion = Postulacion(estudiante_id=estudiante.id, convocatoria_id=convocatoria.id)
+                postulacion.marcar_preasignada(self.coordinador.id)
+                postulacion.marcar_elegible(4.0 + indice / 100, "pre-seleccionado")
+                db.session.add(postulacion)
+        db.session.commit()
+        return principal
+
+    def _consultas_por_lectura(self, convocatoria: Convocatoria, headers: dict[str, str]) -> dict[str, int]:
+        conteos = {}
+        db.session.expire_all()
+        for nombre, url in (
+            ("preasignadas", "/api/postulaciones/preasignadas"),
+            ("ranking", f"/api/convocatorias/{convocatoria.id}/postulaciones?view=ranking"),
+        ):
+            with self._capturar_sql() as sentencias:
+                self.assertEqual(self.client.get(url, headers=headers).status_code, 200)
+            conteos[nombre] = len(sentencias)
+
+        db.session.expire_all()
+        postulaciones = Postulacion.query.filter_by(convocatoria_id=convocatoria.id).all()
+        with self._capturar_sql() as sentencias:
+            obtener_servicio_ia().clasificar_postulaciones(postulaciones)
+        conteos["clasificacion"] = len(sentencias)
+        db.session.rollback()
+        return conteos
+
+    def test_lecturas_usan_cantidad_constante_de_consultas(self) -> None:
+        headers = self._auth_headers(self._login("coordinador@udem.edu.co"))
+        pocas = self._consultas_por_lectura(self._poblar_postulaciones(2, "Pocas"), headers)
+        Postulacion.query.delete()
+        db.session.commit()
+        muchas = self._consultas_por_lectura(self._poblar_postulaciones(12, "Muchas"), headers)
+        self.assertEqual(pocas, muchas)
+
+    # ------------------------------------------------------------------
+    # Ranking paginado e indexado
+    # ------------------------------------------------------------------
+    def test_ranking_paginado_top_y_posicion(self) -> None:
+        convocatoria = self._poblar_postulaciones(12, "Rk")
+        # Un seleccionado sin puntaje va al final; un empate se resuelve por id.
+        sin_puntaje = Postulacion.query.filter_by(convocatoria_id=convocatoria.id).first()
+        sin_puntaje.estado = EstadoPostulacion.SELECTED
+        sin_puntaje.puntaje = None
+        empate = Postulacion.query.filter_by(convocatoria_id=convocatoria.id, puntaje=4.05).first()
+        empate.puntaje = 4.06
+        db.session.commit()
+
+        esperado = sorted(
+            Postulacion.query.filter_by(convocatoria_id=convocatoria.id).all(),
+            key=lambda p: (p.puntaje is None, -(p.puntaje or 0), p.id),
+        )
+        headers = self._auth_headers(self._login("coordinador@udem.edu.co"))
+        url = f"/api/convocatorias/{convocatoria.id}/postulaciones?view=ranking"
+
+        top = self.client.get(f"{url}&top=3", headers=headers)
+        self.assertNotIn("X-Next-Cursor", top.headers)
+        self.assertEqual(
+            [(i["posicion"], i["postulacion"]["id"]) for i in top.get_json()["ranking"]],
+            [(1, esperado[0].id), (2, esperado[1].id), (3, esperado[2].id)],
+        )
+
+        vistos, siguiente = [], f"{url}&limit=5"
+        while siguiente:
+            pagina = self.client.get(siguiente, headers=headers)
+            self.assertEqual(pagina.status_code, 200)
+            vistos.extend((i["posicion"], i["postulacion"]["id"]) for i in pagina.get_json()["ranking"])
+            cursor = pagina.headers.get("X-Next-Cursor")
+            siguiente = f"{url}&limit=5&cursor={cursor}" if cursor else None
+        self.assertEqual(vistos, [(n, p.id) for n, p in enumerate(esperado, start=1)])
+
+        # Sin top, limit ni cursor llega el ranking completo aunque supere el tamaño de página.
+        self.app.config["RANKING_PAGE_SIZE"] = 5
+        completo = self.client.get(url, headers=headers)
+        self.assertNotIn("X-Next-Cursor", completo.headers)
+        self.assertEqual([i["postulacion"]["id"] for i in completo.get_json()["ranking"]], [p.id for p in esperado])
+
+        # Posición del estudiante sin materializar el ranking completo.
+        token = self._login("rk5@udem.edu.co")
+        with self._capturar_sql() as sentencias:
+            posicion = self.client.get(
+                f"/api/convocatorias/{convocatoria.id}/ranking/posicion", headers=self._auth_headers(token)
+            ).get_json()
+        propia = next(p for p in esperado if p.estudiante.correo == "rk5@udem.edu.co")
+        self.assertEqual(posicion["posicion"], esperado.index(propia) + 1)
+        self.assertEqual(posicion["total"], len(esperado))
+        self.assertEqual(len([s for s in sentencias if "count(" in s.lower()]), 2)
+
+    # ------------------------------------------------------------------
+    # Puntaje vectorizado
+    # ------------------------------------------------------------------
+    def test_puntaje_en_lote_coincide_con_el_escalar(self) -> None:
+        convocatoria = self._poblar_postulaciones(6, "Vec")
+        variantes = [("2", 4.5, 10), ("x", 3.9, None), (None, None, 25), ("9", 2.0, 0), ("7", 4.8, 12), ("12", 5.0, 40)]
+        postulaciones = Postulacion.query.filter_by(convocatoria_id=convocatoria.id).order_by(Postulacion.id).all()
+        for postulacion, (semestre, promedio, horas) in zip(postulaciones, variantes):
+            postulacion.estudiante.semestre = semestre
+            postulacion.estudiante.promedio = promedio
+            postulacion.estudiante.horas_disponibles = horas
+        servicio = obtener_servicio_ia()
+        servicio.configuracion.min_semestre = 3
+        servicio.configuracion.min_promedio = 3.0
+        db.session.commit()
+
+        esperado = {}
+        for postulacion in postulaciones:
+            puntaje, detalles = servicio.calcular_puntaje_estudiante(postulacion.estudiante)
+            esperado[postulacion.id] = (puntaje, detalles, servicio.razones_descarte(postulacion.estudiante))
+
+        # Dos pasadas: la segunda actualiza las evaluaciones en vez de duplicarlas.
+        for _ in range(2):
+            _, _, descartados = evaluar_en_lote(servicio.configuracion, Postulacion.convocatoria_id == convocatoria.id)
+            db.session.commit()
+        db.session.expire_all()
+
+        self.assertEqual({d["postulacion_id"] for d in descartados}, {p for p, e in esperado.items() if e[2]})
+        for postulacion in Postulacion.query.filter_by(convocatoria_id=convocatoria.id):
+            puntaje, detalles, razones = esperado[postulacion.id]
+            evaluaciones = EvaluacionAspirante.query.filter_by(postulacion_id=postulacion.id).all()
+            if razones:
+                self.assertEqual(postulacion.estado, EstadoPostulacion.INELIGIBLE)
+                self.assertEqual(postulacion.razones_rechazo, "; ".join(razones))
+                self.assertEqual(evaluaciones, [])
+            else:
+                self.assertEqual(postulacion.estado, EstadoPostulacion.ELIGIBLE)
+                self.assertEqual(postulacion.puntaje, puntaje)
+                self.assertEqual(len(evaluaciones), 1)
+                self.assertEqual(evaluaciones[0].detalles, detalles)
+
+
+    # ------------------------------------------------------------------
+    # Recálculo incremental de puntajes
+    # ------------------------------------------------------------------
+    def test_recalculo_incremental_al_cambiar_pesos(self) -> None:
+        now = utc_now_naive()
+        convocatoria = self._convocatoria("Recalculo", now - timedelta(hours=1), now + timedelta(days=1))
+        perfiles = [("6", 4.5, 10), ("8", 3.8, 20), ("2", 4.9, 5), ("5", 3.6, 0), ("9", 4.7, 12), ("7", 4.1, 8)]
+        postulaciones = []
+        for indice, (semestre, promedio, horas) in enumerate(perfiles):
+            estudiante = Usuario(
+                codigo=f"REC-{indice}",
+                correo=f"rec{indice}@udem.edu.co",
+                nombre=f"Estudiante Recalculo {indice}",
+                rol="STUDENT",
+                semestre=semestre,
+                promedio=promedio,
+                horas_disponibles=horas,
+            )
+            estudiante.set_password("123456")
+            db.session.add(estudiante)
+            db.session.flush()
+            postulacion = Postulacion(estudiante_id=estudiante.id, convocatoria_id=convocatoria.id, config_version=1)
+            postulacion.marcar_elegible(1.0, "pre-seleccionado")
+            db.session.add(postulacion)
+            postulaciones.append(postulacion)
+        postulaciones[2].marcar_ineligible("Semestre requerido: 4, estudiante: 2")
+        postulaciones[4].marcar_seleccionado()
+        postulaciones[5].marcar_preasignada(self.coordinador.id)
+        db.session.commit()
+        self.app.config["RECALCULO_TAMANO_LOTE"] = 2
+
+        headers = self._auth_headers(self._login("coordinador@udem.edu.co"))
+        respuesta = self.client.put("/api/ia/config", json={"peso_horas": 0.4}, headers=headers)
+        self.assertEqual(respuesta.status_code, 200)
+        datos = respuesta.get_json()
+        self.assertEqual(datos["version"], 2)
+        self.assertEqual(datos["trabajo"]["estado"], "pendiente")
+
+        # Reenviar los mismos valores no crea versión ni trabajo.
+        repetida = self.client.put("/api/ia/config", json={"peso_horas": 0.4}, headers=headers).get_json()
+        self.assertEqual(repetida["version"], 2)
+        self.assertIsNone(repetida["trabajo"])
+
+        self.assertEqual(cola_trabajos.ejecutar_pendientes(), 1)
+        progreso = self.client.get(f"/api/ia/trabajos/{datos['trabajo']['id']}", headers=headers).get_json()
+        self.assertEqual(progreso["estado"], "completado")
+        self.assertEqual((progreso["total"], progreso["procesados"], progreso["progreso"]), (4, 4, 1.0))
+
+        db.session.expire_all()
+        servicio = obtener_servicio_ia()
+        for postulacion in postulaciones[:2] + postulaciones[3:4]:
+            puntaje, _ = servicio.calcular_puntaje_estudiante(postulacion.estudiante)
+            self.assertEqual(postulacion.estado, EstadoPostulacion.ELIGIBLE)
+            self.assertEqual(postulacion.puntaje, puntaje)
+            self.assertEqual(postulacion.config_version, 2)
+        # Los umbrales de la convocatoria no dependen de los pesos: solo se marca la versión.
+        self.assertEqual(postulaciones[2].estado, EstadoPostulacion.INELIGIBLE)
+        self.assertEqual(postulaciones[2].config_version, 2)
+        for postulacion in postulaciones[4:]:
+            self.assertEqual(postulacion.config_version, 1)
+            self.assertEqual(postulacion.puntaje, 1.0)
+
+        # Una versión más nueva reemplaza al trabajo anterior que aún no empezó.
+        for peso in (0.3, 0.2):
+            self.client.put("/api/ia/config", json={"peso_horas": peso}, headers=headers)
+        trabajos = Trabajo.query.order_by(Trabajo.id.desc()).limit(2).all()
+        self.assertEqual(cola_trabajos.ejecutar_pendientes(), 2)
+        db.session.expire_all()
+        self.assertEqual(trabajos[1].parametros["reemplazado_por"], 4)
+        self.assertEqual(trabajos[1].procesados, 0)
+        self.assertEqual(trabajos[0].procesados, 4)
+        self.assertEqual(self.client.get("/api/ia/trabajos/999", headers=headers).status_code, 404)
+
+        # Un mínimo más alto vuelve no elegibles a filas antes elegibles: sin puntaje viejo y con descarte.
+        ids = [postulacion.id for postulacion in postulaciones]
+        self.assertEqual(EvaluacionAspirante.query.filter(EvaluacionAspirante.postulacion_id.in_(ids)).count(), 3)
+        self.client.put("/api/ia/config", json={"min_promedio": 4.0}, headers=headers)
+        self.assertEqual(cola_trabajos.ejecutar_pendientes(), 1)
+        db.session.expire_all()
+        for postulacion in (postulaciones[1], postulaciones[3]):
+            self.assertEqual(postulacion.estado, EstadoPostulacion.INELIGIBLE)
+            self.assertIsNone(postulacion.puntaje)
+            self.assertIn("Promedio mínimo requerido", postulacion.razones_rechazo)
+        self.assertEqual(postulaciones[0].estado, EstadoPostulacion.ELIGIBLE)
+        self.assertEqual(
+            [e.postulacion_id for e in EvaluacionAspirante.query.filter(EvaluacionAspirante.postulacion_id.in_(ids))],
+            [postulaciones[0].id],
+        )
+        reporte = reporte_descartes(convocatoria.id, utc_now_naive().strftime("%Y-%m"))
+        self.assertEqual(reporte["total"], 2)
+        self.assertEqual(reporte["por_motivo"], [{"motivo": "Promedio mínimo requerido", "total": 2}])
+
+        # Volver a recalcular filas ya descartadas no las registra de nuevo.
+        self.client.put("/api/ia/config", json={"peso_horas": 0.5}, headers=headers)
+        self.assertEqual(cola_trabajos.ejecutar_pendientes(), 1)
+        self.assertEqual(reporte_descartes(convocatoria.id, utc_now_naive().strftime("%Y-%m"))["total"], 2)
+
+    # ------------------------------------------------------------------
+    # Simulación de pesos
+    # ------------------------------------------------------------------
+    def test_simulacion_de_pesos_sin_escrituras(self) -> None:
+        now = utc_now_naive()
+        abierta = self._convocatoria("Simulacion", now - timedelta(hours=1), now + timedelta(days=1))
+        cerrada = self._convocatoria("Simulacion cerrada", now - timedelta(days=3), now - timedelta(days=1))
+        perfiles = [("6", 4.5, 2), ("9", 3.7, 20), ("5", 4.9, 0), ("8", 3.6, 15), ("7", 4.2, 10), ("2", 4.8, 20)]
+        for indice, (semestre, promedio, horas) in enumerate(perfiles):
+            estudiante = Usuario(
+                codigo=f"SIM-{indice}",
+                correo=f"sim{indice}@udem.edu.co",
+                nombre=f"Estudiante Simulacion {indice}",
+                rol="STUDENT",
+                semestre=semestre,
+                promedio=promedio,
+                horas_disponibles=horas,
+            )
+            estudiante.set_password("123456")
+            db.session.add(estudiante)
+            db.session.flush()
+            for convocatoria in (abierta, cerrada):
+                postulacion = Postulacion(estudiante_id=estudiante.id, convocatoria_id=convocatoria.id)
+                postulacion.marcar_elegible(1.0, "pre-seleccionado")
+                db.session.add(postulacion)
+        db.session.commit()
+
+        servicio = obtener_servicio_ia()
+        valores = {"peso_semestre": 0.1, "peso_promedio": 0.2, "peso_horas": 0.7, "min_promedio": 3.8}
+
+        def ranking(seleccion: SeleccionIA, minimo_promedio: float) -> list[tuple[float, int]]:
+            filas = []
+            for postulacion in Postulacion.query.filter_by(convocatoria_id=abierta.id):
+                estudiante = postulacion.estudiante
+                if semestre_numerico(estudiante) < 4 or (estudiante.promedio or 0.0) < minimo_promedio:
+                    continue
+                puntaje, _ = seleccion.calcular_puntaje_estudiante(estudiante)
+                filas.append((-puntaje, postulacion.id))
+            return sorted(filas)
+
+        actual = ranking(servicio, max(3.5, servicio.configuracion.min_promedio))
+        headers = self._auth_headers(self._login("coordinador@udem.edu.co"))
+        with self._capturar_sql() as sentencias:
+            respuesta = self.client.post("/api/ia/simulacion", json={**valores, "top": 3}, headers=headers)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertFalse([s for s in sentencias if s.lstrip().upper().startswith(("INSERT", "UPDATE", "DELETE"))])
+
+        datos = respuesta.get_json()
+        self.assertEqual([c["convocatoria_id"] for c in datos["convocatorias"]], [abierta.id])
+        resumen = datos["convocatorias"][0]
+        campos = ("min_semestre", "min_promedio", "peso_semestre", "peso_promedio", "peso_horas")
+        candidata = ConfiguracionIA(**{campo: getattr(servicio.configuracion, campo) for campo in campos})
+        for campo, valor in valores.items():
+            setattr(candidata, campo, valor)
+        simulado = ranking(SeleccionIA(candidata), 3.8)
+        self.assertGreater(len(actual), len(simulado))
+
+        self.assertEqual([fila["postulacion_id"] for fila in resumen["top"]], [pid for _, pid in simulado[:3]])
+        self.assertEqual([fila["posicion"] for fila in resumen["top"]], [1, 2, 3])
+        posiciones_actuales = {pid: posicion for posicion, (_, pid) in enumerate(actual, start=1)}
+        for fila in resumen["top"]:
+            self.assertEqual(fila["posicion_actual"], posiciones_actuales.get(fila["postulacion_id"]))
+        self.assertEqual(resumen["elegibles_actual"], len(actual))
+        self.assertEqual(resumen["elegibles_simulado"], len(simulado))
+        self.assertEqual(resumen["nuevos_ineligibles"], len(actual) - len(simulado))
+        self.assertEqual(resumen["cambios_posicion"]["comparables"], len(simulado))
+
+        # La configuración real no cambió.
+        self.assertEqual(obtener_servicio_ia().configuracion.peso_horas, servicio.configuracion.peso_horas)
+        self.assertEqual(obtener_servicio_ia().configuracion.version, 1)
+        invalida = self.client.post("/api/ia/simulacion", json={"peso_horas": "x"}, headers=headers)
+        self.assertEqual(invalida.status_code, 400)
+
+    # ------------------------------------------------------------------
+    # Asignación global de monitores
+    # ------------------------------------------------------------------
+    def test_asignacion_optima_contra_fuerza_bruta(self) -> None:
+        azar = random.Random(19)
+        for _ in range(40):
+            candidatas = []
+            for pid in range(azar.randint(1, 11)):
+                candidatas.append(Candidata(pid, azar.randint(1, 4), azar.randint(1, 3), float(azar.randint(0, 60))))
+            cupos_estudiante = {eid: azar.randint(0, 2) for eid in range(1, 5)}
+            cupos_convocatoria = {cid: azar.randint(0, 2) for cid in range(1, 4)}
+
+            def valida(subconjunto) -> bool:
+                por_estudiante = Counter(c.estudiante_id for c in subconjunto)
+                por_convocatoria = Counter(c.convocatoria_id for c in subconjunto)
+                parejas = Counter((c.estudiante_id, c.convocatoria_id) for c in subconjunto)
+                return (
+                    all(n <= cupos_estudiante[e] for e, n in por_estudiante.items())
+                    and all(n <= cupos_convocatoria[c] for c, n in por_convocatoria.items())
+                    and all(n == 1 for n in parejas.values())
+                )
+
+            optimo = max(
+                sum(c.puntaje for c in subconjunto)
+                for tamano in range(len(candidatas) + 1)
+                for subconjunto in itertools.combinations(candidatas, tamano)
+                if valida(subconjunto)
+            )
+            elegidas = resolver_asignacion(candidatas, cupos_convocatoria, cupos_estudiante)
+            self.assertTrue(valida(elegidas))
+            self.assertEqual(sum(c.puntaje for c in elegidas), optimo)
+
+    def test_propuesta_de_asignacion_y_confirmacion(self) -> None:
+        now = utc_now_naive()
+        apertura, cierre = now - timedelta(hours=1), now + timedelta(days=1)
+        calculo = self._convocatoria("Calculo", apertura, cierre, semestre="2031-1", cupos=1)
+        fisica = self._convocatoria("Fisica", apertura, cierre, semestre="2031-1", cupos=2)
+        otra = self._convocatoria("Otro periodo", apertura, cierre, semestre="2031-2", cupos=5)
+        # (horas, {convocatoria: puntaje}); con 4 horas por monitoría, 6 horas permiten una sola.
+        perfiles = [
+            (6, {calculo: 90.0, fisica: 85.0}),
+            (12, {calculo: 80.0, fisica: 70.0, otra: 99.0}),
+            (8, {fisica: 60.0}),
+            (None, {fisica: 95.0}),
+        ]
+        postulaciones = {}
+        for indice, (horas, puntajes) in enumerate(perfiles):
+            estudiante = Usuario(
+                codigo=f"ASG-{indice}",
+                correo=f"asg{indice}@udem.edu.co",
+                nombre=f"Estudiante Asignacion {indice}",
+                rol="STUDENT",
+                horas_disponibles=horas,
+            )
+            estudiante.set_password("123456")
+            db.session.add(estudiante)
+            db.session.flush()
+            for convocatoria, puntaje in puntajes.items():
+                postulacion = Postulacion(estudiante_id=estudiante.id, convocatoria_id=convocatoria.id)
+                postulacion.marcar_elegible(puntaje, "pre-seleccionado")
+                db.session.add(postulacion)
+                db.session.flush()
+                postulaciones[(indice, convocatoria.id)] = postulacion.id
+        db.session.commit()
+
+        headers = self._auth_headers(self._login("coordinador@udem.edu.co"))
+        respuesta = self.client.post("/api/asignaciones/propuestas", json={"periodo": "2031-1"}, headers=headers)
+        self.assertEqual(respuesta.status_code, 201)
+        propuesta = respuesta.get_json()
+        # Óptimo (235): 0→Física y 1→Cálculo+Física; el voraz toma 0→Cálculo y se queda en 220.
+        esperado = {postulaciones[(0, fisica.id)], postulaciones[(1, calculo.id)], postulaciones[(1, fisica.id)]}
+        self.assertEqual({a["postulacion_id"] for a in propuesta["asignaciones"]}, esperado)
+        self.assertEqual(propuesta["puntaje_total"], 85.0 + 80.0 + 70.0)
+        self.assertEqual(propuesta["estado"], "borrador")
+
+        obsoleta = self.client.post("/api/asignaciones/propuestas", json={"periodo": "2031-1"}, headers=headers)
+        confirmada = self.client.post(f"/api/asignaciones/propuestas/{propuesta['id']}/confirmar", headers=headers)
+        self.assertEqual(confirmada.status_code, 200)
+        self.assertEqual(confirmada.get_json()["seleccionadas"], 3)
+        db.session.expire_all()
+        seleccionadas = {p.id for p in Postulacion.query.filter_by(estado=EstadoPostulacion.SELECTED)}
+        self.assertEqual(seleccionadas, esperado)
+        self.assertEqual(Notificacion.query.filter(Notificacion.titulo.like("Has sido seleccionado%")).count(), 3)
+
+        repetida = self.client.post(f"/api/asignaciones/propuestas/{propuesta['id']}/confirmar", headers=headers)
+        self.assertEqual(repetida.status_code, 400)
+        conflicto = self.client.post(
+            f"/api/asignaciones/propuestas/{obsoleta.get_json()['id']}/confirmar", headers=headers
+        )
+        self.assertEqual(conflicto.status_code, 409)
+        db.session.expire_all()
+        self.assertEqual(Postulacion.query.filter_by(estado=EstadoPostulacion.SELECTED).count(), 3)
+
+        # Los cupos y las horas ya ocupadas se descuentan en la siguiente propuesta.
+        siguiente = self.client.post("/api/asignaciones/propuestas", json={"periodo": "2031-1"}, headers=headers)
+        self.assertEqual(siguiente.get_json()["asignaciones"], [])
+
+    # ------------------------------------------------------------------
+    # Decisiones en lote
+    # ------------------------------------------------------------------
+    def test_decisiones_en_lote(self) -> None:
+        convocatoria = self._poblar_postulaciones(4, "LOTE")
+        ids = [
+            p.id for p in Postulacion.query.filter_by(convocatoria_id=convocatoria.id).order_by(Postulacion.id)
+        ]
+        ajena = Postulacion.query.filter(Postulacion.convocatoria_id != convocatoria.id).first()
+        headers = self._auth_headers(self._login("coordinador@udem.edu.co"))
+        decisiones = [
+            {"postulacion_id": ids[0], "decision": "selected"},
+            {"postulacion_id": ids[1], "decision": "not_selected", "comentario": "Cupo lleno"},
+            {"postulacion_id": ids[2], "decision": "SELECTED", "comentario": "Buen perfil"},
+            {"postulacion_id": ids[3], "decision": "tal vez"},
+            {"postulacion_id": ids[0], "decision": "not_selected"},
+            {"postulacion_id": ajena.id, "decision": "selected"},
+            {"decision": "selected"},
+        ]
+        url = f"/api/convocatorias/{convocatoria.id}/postulaciones/decisiones"
+        with self._capturar_sql() as sentencias:
+            respuesta = self.client.patch(url, json={"decisiones": decisiones}, headers=headers)
+        self.assertEqual(respuesta.status_code, 200)
+        cuerpo = respuesta.get_json()
+        self.assertEqual((cuerpo["aplicadas"], cuerpo["errores"]), (3, 4))
+        self.assertEqual(
+            [r["ok"] for r in cuerpo["resultados"]], [True, True, True, False, False, False, False]
+        )
+        self.assertEqual(cuerpo["resultados"][1]["estado"], EstadoPostulacion.NOT_SELECTED.value)
+        self.assertEqual(cuerpo["resultados"][5]["msg"], "Postulación no encontrada")
+        # Una sola sentencia de escritura por tabla, sin importar el tamaño del lote.
+        self.assertEqual(sum(1 for s in sentencias if s.startswith("UPDATE postulacion")), 1)
+        self.assertEqual(sum(1 for s in sentencias if s.startswith("INSERT INTO notificacion")), 1)
+
+        db.session.expire_all()
+        seleccionada, rechazada, comentada, intacta = (db.session.get(Postulacion, pid) for pid in ids)
+        self.assertEqual((seleccionada.estado, seleccionada.resultado), (EstadoPostulacion.SELECTED, "seleccionado"))
+        self.assertEqual(rechazada.estado, EstadoPostulacion.NOT_SELECTED)
+        self.assertEqual(rechazada.razones_rechazo, "Cupo lleno")
+        self.assertEqual(comentada.razones_rechazo, "Buen perfil")
+        self.assertEqual(intacta.estado, EstadoPostulacion.ELIGIBLE)
+        notificaciones = Notificacion.query.filter(
+            Notificacion.usuario_id.in_([rechazada.estudiante_id, comentada.estudiante_id])
+        ).all()
+        mensajes = {n.usuario_id: n.mensaje for n in notificaciones}
+        self.assertTrue(mensajes[rechazada.estudiante_id].endswith("Motivo: Cupo lleno"))
+        self.assertTrue(mensajes[comentada.estudiante_id].endswith("Observaciones: Buen perfil"))
+
+        vacia = self.client.patch(url, json={"decisiones": []}, headers=headers)
+        self.assertEqual(vacia.status_code, 400)
+
+    # ------------------------------------------------------------------
+    # Evaluación asíncrona de postulaciones
+    # ------------------------------------------------------------------
+    def test_postulacion_asincrona_se_evalua_en_la_cola(self) -> None:
+        self.app.config["POSTULACIONES_ASINCRONAS"] = True
+        now = utc_now_naive()
+        convocatoria = self._convocatoria("Asincrona", now - timedelta(hours=1), now + timedelta(days=1))
+        estudiante = Usuario.query.filter_by(correo="estudiante@udem.edu.co").first()
+        headers = self._auth_headers(self._login("estudiante@udem.edu.co"))
+
+        respuesta = self.client.post(
+            f"/api/convocatorias/{convocatoria.id}/postulaciones",
+            json={"formulario": {"comentario": "Quiero participar"}},
+            headers=headers,
+        )
+        self.assertEqual(respuesta.status_code, 202)
+        cuerpo = respuesta.get_json()
+        self.assertEqual(cuerpo["postulacion"]["estado"], EstadoPostulacion.PENDING.value)
+        self.assertEqual(cuerpo["trabajo"]["estado"], "pendiente")
+        self.assertEqual(Notificacion.query.filter_by(usuario_id=estudiante.id).count(), 0)
+        self.assertEqual(EvaluacionAspirante.query.count(), 0)
+
+        self.assertEqual(cola_trabajos.ejecutar_pendientes(), 1)
+        db.session.expire_all()
+        postulacion = db.session.get(Postulacion, cuerpo["postulacion"]["id"])
+        self.assertEqual(postulacion.estado, EstadoPostulacion.ELIGIBLE)
+        self.assertIsNotNone(postulacion.puntaje)
+        self.assertEqual(EvaluacionAspirante.query.filter_by(postulacion_id=postulacion.id).count(), 1)
+        self.assertEqual(Notificacion.query.filter_by(usuario_id=estudiante.id).count(), 1)
+        self.assertEqual(db.session.get(Trabajo, cuerpo["trabajo"]["id"]).estado.value, "completado")
+
+        # Repetir el trabajo (p. ej. tras un reintento) no vuelve a evaluar ni a notificar.
+        repetido = cola_trabajos.encolar("evaluar_postulacion", {"postulacion_id": postulacion.id})
+        db.session.commit()
+        cola_trabajos.ejecutar_pendientes()
+        db.session.expire_all()
+        self.assertEqual(db.session.get(Trabajo, repetido.id).estado.value, "completado")
+        self.assertEqual(Notificacion.query.filter_by(usuario_id=estudiante.id).count(), 1)
+
+    def test_recalculo_no_se_adelanta_a_la_evaluacion_pendiente(self) -> None:
+        self.app.config["POSTULACIONES_ASINCRONAS"] = True
+        now = utc_now_naive()
+        convocatoria = self._convocatoria("Carrera", now - timedelta(hours=1), now + timedelta(days=1))
+        estudiante_id = Usuario.query.filter_by(correo="estudiante@udem.edu.co").first().id
+        respuesta = self.client.post(
+            f"/api/convocatorias/{convocatoria.id}/postulaciones",
+            json={"formulario": {}},
+            headers=self._auth_headers(self._login("estudiante@udem.edu.co")),
+        )
+        postulacion_id = respuesta.get_json()["postulacion"]["id"]
+
+        # Un recálculo de pesos corre entre el encolado y la evaluación.
+        version = ConfiguracionIA.query.first().version
+        recalculo = cola_trabajos.encolar("recalcular_puntajes", {"version": version})
+        db.session.commit()
+        cola_trabajos.ejecutar(recalculo)
+        db.session.expire_all()
+        self.assertEqual(db.session.get(Postulacion, postulacion_id).estado, EstadoPostulacion.PENDING)
+
+        self.assertEqual(cola_trabajos.ejecutar_pendientes(), 1)
+        db.session.expire_all()
+        self.assertEqual(db.session.get(Postulacion, postulacion_id).estado, EstadoPostulacion.ELIGIBLE)
+        self.assertEqual(EvaluacionAspirante.query.filter_by(postulacion_id=postulacion_id).count(), 1)
+        self.assertEqual(Notificacion.query.filter_by(usuario_id=estudiante_id).count(), 1)
+
+    def test_trabajos_abandonados_se_recuperan_y_el_fallo_final_se_notifica(self) -> None:
+        now = utc_now_naive()
+        convocatoria = self._convocatoria("Abandonos", now - timedelta(hours=1), now + timedelta(days=1))
+        trabajos = {}
+        for correo, intentos in (("estudiante@udem.edu.co", 2), ("maria@udem.edu.co", 1)):
+            estudiante = Usuario.query.filter_by(correo=correo).first()
+            postulacion = Postulacion(estudiante_id=estudiante.id, convocatoria_id=convocatoria.id)
+            postulacion.esperar_validacion()
+            db.session.add(postulacion)
+            db.session.flush()
+            trabajo = cola_trabajos.encolar(
+                "evaluar_postulacion", {"postulacion_id": postulacion.id}, max_intentos=intentos
+            )
+            trabajos[correo] = (trabajo.id, postulacion.id, estudiante.id)
+        db.session.commit()
+
+        # Ambos trabajos quedan en curso en un proceso que muere antes de terminar.
+        while cola_trabajos.reclamar() is not None:
+            pass
+        Trabajo.query.update({Trabajo.started_at: now - timedelta(hours=1)})
+        db.session.commit()
+
+        self.assertEqual(cola_trabajos.ejecutar_pendientes(), 0)
+        db.session.expire_all()
+        trabajo_id, postulacion_id, _ = trabajos["estudiante@udem.edu.co"]
+        self.assertEqual(db.session.get(Trabajo, trabajo_id).estado.value, "pendiente")
+        Trabajo.query.filter_by(id=trabajo_id).update({Trabajo.disponible_en: None})
+        db.session.commit()
+        self.assertEqual(cola_trabajos.ejecutar_pendientes(), 1)
+        self.assertEqual(db.session.get(Postulacion, postulacion_id).estado, EstadoPostulacion.ELIGIBLE)
+
+        # Sin intentos restantes: el trabajo falla y la postulación queda marcada y notificada.
+        trabajo_id, postulacion_id, estudiante_id = trabajos["maria@udem.edu.co"]
+        self.assertEqual(db.session.get(Trabajo, trabajo_id).estado.value, "fallido")
+        postulacion = db.session.get(Postulacion, postulacion_id)
+        self.assertEqual((postulacion.estado, postulacion.resultado), (EstadoPostulacion.PENDING, "evaluacion_fallida"))
+        destinatarios = {n.usuario_id for n in Notificacion.query.all()}
+        self.assertTrue({estudiante_id, convocatoria.creado_por_id} <= destinatarios)
+
+    def test_cola_reintenta_con_espera_y_falla_al_agotar_intentos(self) -> None:
+        cola = ColaTrabajos()
+        cola.init_app(self.app)
+        fallos = Counter()
+
+        def inestable(trabajo: Trabajo) -> None:
+            fallos[trabajo.id] += 1
+            if fallos[trabajo.id] <= trabajo.parametros["fallos"]:
+                raise RuntimeError(f"fallo {fallos[trabajo.id]}")
+
+        cola.registrar("inestable", inestable)
+        recuperable = cola.encolar("inestable", {"fallos": 1}, max_intentos=2)
+        perdido = cola.encolar("inestable", {"fallos": 5}, max_intentos=2)
+        db.session.commit()
+
+        self.assertEqual(cola.ejecutar_pendientes(), 2)
+        db.session.expire_all()
+        for trabajo_id in (recuperable.id, perdido.id):
+            trabajo = db.session.get(Trabajo, trabajo_id)
+            self.assertEqual(trabajo.estado.value, "pendiente")
+            self.assertEqual(trabajo.error, "fallo 1")
+            self.assertGreater(trabajo.disponible_en, utc_now_naive())
+        # La espera evita reintentar de inmediato.
+        self.assertEqual(cola.ejecutar_pendientes(), 0)
+
+        Trabajo.query.update({Trabajo.disponible_en: utc_now_naive() - timedelta(seconds=1)})
+        db.session.commit()
+        self.assertEqual(cola.ejecutar_pendientes(), 2)
+        db.session.expire_all()
+        self.assertEqual(db.session.get(Trabajo, recuperable.id).estado.value, "completado")
+        perdido = db.session.get(Trabajo, perdido.id)
+        self.assertEqual((perdido.estado.value, perdido.intentos, perdido.error), ("fallido", 2, "fallo 2"))
+
+    # ------------------------------------------------------------------
+    # Idempotencia y unicidad sin carreras
+    # ------------------------------------------------------------------
+    def test_idempotency_key_y_unicidad_de_postulaciones(self) -> None:
+        now = utc_now_naive()
+        convocatoria = self._convocatoria("Idempotente", now - timedelta(hours=1), now + timedelta(days=1))
+        estudiante = Usuario.query.filter_by(correo="estudiante@udem.edu.co").first()
+        headers = self._auth_headers(self._login("estudiante@udem.edu.co"))
+        url = f"/api/convocatorias/{convocatoria.id}/postulaciones"
+        cuerpo = {"formulario": {"comentario": "Primera vez"}}
+
+        primera = self.client.post(url, json=cuerpo, headers={**headers, "Idempotency-Key": "clave-1"})
+        self.assertEqual(primera.status_code, 201)
+        with self._capturar_sql() as sentencias:
+            repetida = self.client.post(url, json=cuerpo, headers={**headers, "Idempotency-Key": "clave-1"})
+        self.assertEqual(repetida.status_code, primera.status_code)
+        self.assertEqual(repetida.headers.get("Idempotent-Replayed"), "true")
+        self.assertEqual(repetida.get_json(), primera.get_json())
+        self.assertFalse(any(s.startswith("INSERT INTO postulacion") for s in sentencias))
+        self.assertEqual(Notificacion.query.filter_by(usuario_id=estudiante.id).count(), 1)
+
+        # La misma clave en otra ruta es un error del cliente.
+        otra_ruta = self.client.post(
+            f"/api/convocatorias/{convocatoria.id}/inscripciones",
+            json={},
+            headers={**headers, "Idempotency-Key": "clave-1"},
+        )
+        self.assertEqual(otra_ruta.status_code, 422)
+
+        # Sin clave, el índice único parcial detecta el duplicado y devuelve la fila existente.
+        duplicada = self.client.post(url, json=cuerpo, headers=headers)
+        self.assertEqual(duplicada.status_code, 409)
+        self.assertEqual(duplicada.get_json()["postulacion"]["id"], primera.get_json()["postulacion"]["id"])
+        self.assertEqual(
+            Postulacion.query.filter_by(estudiante_id=estudiante.id, convocatoria_id=convocatoria.id).count(), 1
+        )
+        with self.assertRaises(IntegrityError):
+            db.session.add(Postulacion(estudiante_id=estudiante.id, convocatoria_id=convocatoria.id))
+            db.session.flush()
+        db.session.rollback()
+
+        # Una preasignación vigente también bloquea la postulación del estudiante.
+        maria = Usuario.query.filter_by(correo="maria@udem.edu.co").first()
+        preasignada = self.client.post(
+            "/api/postulaciones/preasignadas",
+            json={"convocatoria_id": convocatoria.id, "estudiante_id": maria.id},
+            headers=self._auth_headers(self._login("coordinador@udem.edu.co")),
+        ).get_json()
+        competidora = self.client.post(url, json=cuerpo, headers=self._auth_headers(self._login("maria@udem.edu.co")))
+        self.assertEqual(competidora.status_code, 409)
+        self.assertEqual(competidora.get_json()["postulacion"]["id"], preasignada["id"])
+
+        # Sin el índice (duplicados heredados) la consulta previa sigue evitando duplicados.
+        db.session.execute(text("DROP INDEX uq_postulacion_activa"))
+        db.session.commit()
+        self.app.extensions["unicidad_postulacion"] = False
+        self.assertEqual(self.client.post(url, json=cuerpo, headers=headers).status_code, 409)
+        self.assertEqual(
+            Postulacion.query.filter_by(estudiante_id=estudiante.id, convocatoria_id=convocatoria.id).count(), 1
+        )
+
+        # Una reserva en curso responde 409 a la solicitud concurrente sin ejecutar la vista.
+        db.session.add(
+            RespuestaIdempotente(usuario_id=estudiante.id, clave="clave-2", ruta=f"POST {url}", created_at=now)
+        )
+        db.session.commit()
+        en_curso = self.client.post(url, json=cuerpo, headers={**headers, "Idempotency-Key": "clave-2"})
+        self.assertEqual(en_curso.status_code, 409)
+        self.assertNotIn("postulacion", en_curso.get_json())
+
+        inscripcion_url = f"/api/convocatorias/{convocatoria.id}/inscripciones"
+        self.assertEqual(self.client.post(inscripcion_url, json={}, headers=headers).status_code, 201)
+        repetida = self.client.post(inscripcion_url, json={}, headers=headers)
+        self.assertEqual(repetida.status_code, 409)
+        self.assertIn("inscripcion", repetida.get_json())
+
+        # El mantenimiento borra las respuestas guardadas más antiguas que el TTL.
+        vigencia = timedelta(hours=self.app.config["IDEMPOTENCIA_TTL_HORAS"])
+        resultado = ejecutar_mantenimiento(now + vigencia + timedelta(minutes=1))
+        self.assertEqual(resultado["respuestas_idempotentes"], 2)
+        self.assertEqual(RespuestaIdempotente.query.filter_by(usuario_id=estudiante.id).count(), 0)
+
+    # ------------------------------------------------------------------
+    # Registro de descartes
+    # ------------------------------------------------------------------
+    def test_descartes_se_anexan_y_agregan_por_motivo(self) -> None:
+        now = utc_now_naive()
+        convocatoria = self._convocatoria("Descartes", now - timedelta(hours=1), now + timedelta(days=1))
+        convocatoria_id = convocatoria.id
+        estudiante_id = Usuario.query.filter_by(correo="maria@udem.edu.co").first().id
+
+        def descarte(*razones):
+            return {"postulacion_id": None, "estudiante_id": estudiante_id, "razones": list(razones)}
+
+        registrar_descartes(convocatoria.id, [descarte("Promedio mínimo requerido: 3.5, estudiante: 3.1")], now)
+        db.session.commit()
+        with self._capturar_sql() as sentencias:
+            reporte = registrar_descartes(
+                convocatoria_id,
+                [
+                    descarte(
+                        "Promedio mínimo requerido: 3.5, estudiante: 3.0",
+                        "Semestre requerido: 4, estudiante: 3",
+                    ),
+                    descarte("No cumple requisitos de la convocatoria"),
+                ],
+                now,
+            )
+            db.session.commit()
+        self.assertEqual(reporte.total, 3)
+        # Anexar no lee ni reescribe lo ya registrado.
+        self.assertFalse(any(s.lstrip().startswith("SELECT") for s in sentencias))
+        self.assertFalse(any(s.startswith("UPDATE") for s in sentencias))
+        self.assertEqual(sum(1 for s in sentencias if s.startswith("INSERT INTO descarte_razon")), 1)
+
+        headers = self._auth_headers(self._login("coordinador@udem.edu.co"))
+        with self._capturar_sql() as sentencias:
+            respuesta = self.client.get(f"/api/convocatorias/{convocatoria_id}/postulaciones", headers=headers)
+        datos = respuesta.get_json()["reporte_descartes"]
+        self.assertEqual(datos["total"], 3)
+        self.assertEqual(
+            datos["por_motivo"],
+            [
+                {"motivo": "Promedio mínimo requerido", "total": 2},
+                {"motivo": "No cumple requisitos de la convocatoria", "total": 1},
+                {"motivo": "Semestre requerido", "total": 1},
+            ],
+        )
+        recientes = datos["contenido"]["descartados"]
+        self.assertEqual(len(recientes), 3)
+        self.assertEqual(recientes[0]["razones"], ["No cumple requisitos de la convocatoria"])
+        # Descartes recientes y sus razones: dos consultas, sin importar el tamaño del reporte.
+        self.assertEqual(sum(1 for s in sentencias if "FROM descarte_razon" in s), 1)
+        self.assertEqual(sum(1 for s in sentencias if "FROM descarte " in s or "FROM descarte\n" in s), 1)
+
+        # Los reportes guardados como JSON pasan al registro al arrancar.
+        legado = ReporteDescartes(
+            convocatoria_id=convocatoria_id,
+            periodo="2020-01",
+            contenido={
+                "descartados": {
+                    "total_descartados": 2,
+                    "detalle": [descarte("Semestre requerido: 4, estudiante: 2"), descarte("Sin cupos")],
+                }
+            },
+        )
+        db.session.add(legado)
+        db.session.commit()
+        self.assertEqual(migrar_reportes_legados(), 1)
+        migrado = reporte_descartes(convocatoria_id, "2020-01")
+        self.assertEqual(migrado["total"], 2)
+        self.assertEqual({m["motivo"] for m in migrado["por_motivo"]}, {"Semestre requerido", "Sin cupos"})
+        self.assertEqual(migrar_reportes_legados(), 0)
+
+    def test_opciones_preasignadas_typeahead(self) -> None:
+        headers = self._auth_headers(self._login("coordinador@udem.edu.co"))
+        self._convocatoria("Álgebra Lineal")
+        self._convocatoria("Cálculo Integral")
+
+        def opciones(**params):
+            response = self.client.get("/api/postulaciones/preasignadas/opciones", headers=headers, query_string=params)
+            self.assertEqual(response.status_code, 200)
+            return response.get_json()
+
+        def nombres(**params):
+            return [item["nombre"] for item in opciones(tipo="estudiantes", **params)["estudiantes"]]
+
+        # Prefijos de nombre, código o correo, sin tildes ni mayúsculas.
+        self.assertEqual(nombres(q="maria gonz"), ["María González"])
+        self.assertEqual(nombres(q="perez"), ["Juan Pérez"])
+        self.assertEqual(nombres(q="USTUD-00"), ["Carlos Rodríguez", "Juan Pérez", "María González"])
+        self.assertEqual(nombres(q="carlos@udem"), ["Carlos Rodríguez"])
+        self.assertEqual(nombres(q="coordinador"), [])
+
+        # Registros compactos, en páginas por cursor sin solapamiento.
+        primera = opciones(tipo="estudiantes", limit=2)
+        self.assertEqual(set(primera["estudiantes"][0]), {"id", "nombre", "codigo", "correo"})
+        self.assertEqual(len(primera["estudiantes"]), 2)
+        cursor = primera["siguiente"]["estudiantes"]
+        segunda = opciones(tipo="estudiantes", limit=2, cursor=cursor)
+        self.assertEqual([e["nombre"] for e in segunda["estudiantes"]], ["María González"])
+        self.assertIsNone(segunda["siguiente"]["estudiantes"])
+
+        ambas = opciones(q="calc", limit=100)
+        self.assertEqual([c["curso"] for c in ambas["convocatorias"]], ["Cálculo Integral"])
+        self.assertEqual(set(ambas["convocatorias"][0]), {"id", "curso", "semestre", "archivada"})
+        self.assertEqual(ambas["estudiantes"], [])
+
+        url = "/api/postulaciones/preasignadas/opciones"
+        self.assertEqual(self.client.get(url, headers=headers, query_string={"tipo": "otros"}).status_code, 400)
+        self.assertEqual(self.client.get(url, headers=headers, query_string={"cursor": cursor}).status_code, 400)
+        with self._capturar_sql() as sentencias:
+            opciones(tipo="estudiantes", q="juan")
+        self.assertEqual(sum("usuario_fts" in sql for sql in sentencias), 1)
+
+
+    def test_preasignadas_paginadas_con_tablas_relacionadas(self) -> None:
+        headers = self._auth_headers(self._login("coordinador@udem.edu.co"))
+        principal = self._poblar_postulaciones(5, "Pre")
+        otra = Postulacion.query.filter(Postulacion.convocatoria_id != principal.id).first()
+        otra.convocatoria.semestre = "2024-2"
+        otra.marcar_seleccionado()
+        otra_id, coordinador_id = otra.id, self.coordinador.id
+        db.session.commit()
+        esperadas = [
+            p.id
+            for p in Postulacion.query.filter_by(preasignada=True)
+            .order_by(Postulacion.created_at.desc(), Postulacion.id.desc())
+            .all()
+        ]
+
+        def pagina(**params):
+            response = self.client.get("/api/postulaciones/preasignadas", headers=headers, query_string=params)
+            self.assertEqual(response.status_code, 200)
+            return response.get_json()
+
+        # Las páginas no se solapan y cuestan lo mismo sin importar su tamaño.
+        vistas, consultas, cursor = [], [], None
+        while True:
+            db.session.expire_all()
+            with self._capturar_sql() as sentencias:
+                datos = pagina(limit=4, **({"cursor": cursor} if cursor else {}))
+            consultas.append(len(sentencias))
+            vistas.extend(item["id"] for item in datos["items"])
+            cursor = datos["siguiente"]
+            if not cursor:
+                break
+        self.assertEqual(vistas, esperadas)
+        self.assertEqual(len(set(consultas)), 1)
+
+        # Cada usuario y convocatoria viaja una sola vez, en la tabla aparte.
+        datos = pagina(convocatoria_id=principal.id)
+        self.assertEqual(len(datos["items"]), 5)
+        self.assertNotIn("estudiante", datos["items"][0])
+        self.assertEqual(list(datos["convocatorias"]), [str(principal.id)])
+        self.assertEqual(len(datos["usuarios"]), 6)
+        self.assertEqual(datos["usuarios"][str(coordinador_id)]["correo"], "coordinador@udem.edu.co")
+
+        self.assertEqual([i["id"] for i in pagina(estado="selected")["items"]], [otra_id])
+        self.assertEqual([i["id"] for i in pagina(semestre="2024-2")["items"]], [otra_id])
+        url = "/api/postulaciones/preasignadas"
+        self.assertEqual(self.client.get(url, headers=headers, query_string={"estado": "x"}).status_code, 400)
+        self.assertEqual(self.client.get(url, headers=headers, query_string={"cursor": "x"}).status_code, 400)
+
+
+if __name__ == "__main__":  # pragma: no cover - ejecución manual
+    unittest.main()